@@ -30,27 +30,112 @@ Example - Command Line:
         '--retry': [('5',)]
     }
 """
-import argparse
-import ast
-import json
-from pprint import pprint
+# Only what `BashMap.fromcmd` needs is imported up front. The modules used by the command line, batch
+# parsing and the other conversions are imported by the functions that use them, so neither importing
+# this module nor parsing a single command pays for them.
+import itertools
+import os
+import sys
 
-from model.argument_doublylinkedlist import ArgumentDoublyLinkedList
+from model.argumentarray import ArgumentArray
 from splitter import bashsplit
 from parser import bashparse
-from utils.cachedproperty import cached_property
+from utils.instrumentation import instrumentation
+
+
+# Marks a view that hasn't been loaded yet.
+_missing = object()
 
 
 class BashMap(dict):
+    """An argument dictionary. The simple views of it, such as `simpleoptions`, are loaded on first use and kept
+    until a key is set, deleted or updated. A key's list of argument groups should be replaced rather than changed
+    in place for the views to notice.
+
+    A BashMap can be read, views included, from many threads at once. Like a dict, it must not be mutated while
+    other threads read it.
+
+    A map created with `fromcmd(cmd, spans=True)` also locates its arguments in the cmd. Its `spans` are keyed and
+    grouped like the map, and hold (start, end) offsets instead of strings. Each option's group starts with the
+    offsets of the option itself, followed by those of its option-arguments. The spans are dropped once the map is
+    mutated.
+    """
+    # The loaded views keyed by name, or None until one is loaded after the last mutation.
+    _views = None
+    # The source offsets of the arguments, or None unless the map was created in span mode and hasn't been mutated since.
+    spans = None
 
     def __init__(self, *args, **kwargs):
         super(BashMap, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super(BashMap, self).__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super(BashMap, self).__delitem__(key)
+        self._invalidate()
+
+    def __ior__(self, other):
+        self._invalidate()
+        return super(BashMap, self).__ior__(other)
+
+    def pop(self, *args):
+        self._invalidate()
+        return super(BashMap, self).pop(*args)
+
+    def popitem(self):
+        self._invalidate()
+        return super(BashMap, self).popitem()
+
+    def clear(self):
+        self._invalidate()
+        super(BashMap, self).clear()
+
+    def update(self, *args, **kwargs):
+        self._invalidate()
+        super(BashMap, self).update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._invalidate()
+        return super(BashMap, self).setdefault(key, default)
+
+    def _invalidate(self):
+        """Drops the loaded views and the spans, which no longer describe the map once it is mutated.
+        """
+        self._views = None
+        if self.spans is not None:
+            self.spans = None
+
+    def _view(self, name, load):
+        """Returns a view, loading it if it hasn't been loaded since the last mutation.
+
+        Arguments:
+            name {str} -- The name of the view.
+            load {callable} -- Loads the view.
+
+        Returns:
+            object -- The view.
+        """
+        # The dictionary is published before the view is loaded, so a mutation that resets it while the view loads
+        # can only leave the view in a dictionary that is already discarded.
+        views = self._views
+        if views is None:
+            views = self._views = {}
+        view = views.get(name, _missing)
+        if view is _missing:
+            # Threads that load the view at the same time all get the one that was stored first.
+            view = views.setdefault(name, load())
+        return view
     
     @classmethod
-    def fromcmd(cls, cmd, limitoverrides=None):
+    def fromcmd(cls, cmd, limitoverrides=None, strict=True, cache=None, profiles=None, spans=False):
         """Converts a Bash cmd into an argument dictionary. Accepts a limit overrides dictionary
         that allows for setting the upper limit of how many `option-arguments` an `option` can
         receive in a single call.
+
+        Accepts a LimitProfiles registry, from which the limits override dictionary for the cmd's
+        utility is picked automatically, and a ParseCache so that repeated cmds are only parsed once.
         
         Example:
             >>> BashMap.fromcmd('curl -s -SP8080 www.github.com www.pypi.org --basic --retry 5')
@@ -69,18 +154,251 @@ class BashMap(dict):
         
         Keyword Arguments:
             limitOverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+            cache {ParseCache} -- The cache to look the cmd up in and store its argument dictionary in. (default: {None})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. Takes lower precedence than limitoverrides. (default: {None})
+            spans {bool} -- Locates every argument in the cmd and stores the offsets in the map's `spans`. Bypasses the cache. (default: {False})
 
         Returns:
             [dict] -- The resulting argument dictionary.
         """
         if limitoverrides is None:
             limitoverrides = {}
+        if spans:
+            args, offsets = bashsplit.split_spans(cmd, strict=strict, profiles=profiles, limitoverrides=limitoverrides)
+            argarray = ArgumentArray.from_cmd(args)
+            bashmap = cls(bashparse.parse(argarray, limitoverrides, profiles))
+            bashmap.spans = bashparse.locate(argarray, offsets, limitoverrides, profiles)
+            return bashmap
+        if cache is not None:
+            key = cache.key(cmd, limitoverrides, strict, profiles)
+            argdict = cache.get(key)
+            if argdict is None:
+                argdict = cls.fromcmd(cmd, limitoverrides, strict, profiles=profiles)
+                cache.put(key, argdict)
+            return cls(argdict)
+        if instrumentation.enabled:
+            return cls(_parse_instrumented(cmd, limitoverrides, strict, profiles))
         # Split the Bash cmd into a list of string arguments.
-        args = bashsplit.split(cmd)
-        # Convert args into linked list
-        arglinkedlist = ArgumentDoublyLinkedList.from_cmd(args)
-        # Parse the arguments in the linked list
-        return cls(bashparse.parse(arglinkedlist, limitoverrides))
+        args = bashsplit.split(cmd, strict=strict, profiles=profiles, limitoverrides=limitoverrides)
+        # Convert args into an argument array
+        argarray = ArgumentArray.from_cmd(args)
+        # Parse the arguments in the argument array
+        return cls(bashparse.parse(argarray, limitoverrides, profiles))
+
+    @classmethod
+    def fromcompound(cls, cmd, limitoverrides=None, strict=True, profiles=None):
+        """Converts a compound Bash cmd, whose commands are joined by control operators such as pipes, `&&`, `||` and
+        `;`, into the argument dictionary of each command. The cmd is split into its commands while it is tokenized,
+        in a single pass.
+
+        Example:
+            >>> BashMap.fromcompound('cat f | grep x && curl -s url')
+            [
+                CommandLink(bashmap={'utility': [('cat',)], 'operands': [('f',)]}, operator='|'),
+                CommandLink(bashmap={'utility': [('grep',)], 'operands': [('x',)]}, operator='&&'),
+                CommandLink(bashmap={'utility': [('curl',)], '-s': [('url',)]}, operator=None)
+            ]
+
+        Arguments:
+            cmd {string} -- The compound Bash cmd.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. Takes lower precedence than limitoverrides. (default: {None})
+
+        Raises:
+            ValueError: The cmd can't be tokenized, or a control operator is missing a command.
+
+        Returns:
+            [list of CommandLinks] -- Each command's argument dictionary and the control operator following it, in order.
+        """
+        from model.commandlink import CommandLink
+        if limitoverrides is None:
+            limitoverrides = {}
+        return [CommandLink(cls(bashparse.parse(ArgumentArray.from_cmd(args), limitoverrides, profiles)), operator)
+                for args, operator in bashsplit.split_compound(cmd, strict=strict, profiles=profiles, limitoverrides=limitoverrides)]
+
+    @classmethod
+    def fromcmds(cls, cmds, limitoverrides=None, workers=None, chunksize=256, ordered=True, strict=True, profiles=None, executor='process'):
+        """Converts many Bash cmds into argument dictionaries, fanning the work out over a pool of
+        worker processes or threads in chunks. The cmds are read lazily, so the input can be a
+        generator over a file of any size.
+
+        Starting the workers and sending them the cmds costs more than parsing short cmds does, so
+        a pool only pays off for large batches, with no more workers than there are CPUs to run
+        them. A batch that fits in one chunk is parsed in the calling thread.
+
+        Worker threads share the caller's profiles and instrumentation instead of copying them. They
+        only run in parallel on a free-threaded build of Python, but they start instantly and don't
+        pickle the cmds or their results.
+
+        A cmd that can't be parsed doesn't stop the batch. Its result holds the `ValueError` that
+        was raised instead of an argument dictionary.
+
+        Example:
+            >>> for result in BashMap.fromcmds(['curl -s www.github.com', 'curl -s-S'], workers=2):
+            ...     print(result)
+            BatchResult(index=0, bashmap={'utility': [('curl',)], '-s': [('www.github.com',)]}, error=None)
+            BatchResult(index=1, bashmap=None, error=ValueError('Argument "-s-S" is invalid syntax.'))
+
+        Arguments:
+            cmds {iterable of strings} -- The Bash cmds.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            workers {int} -- The number of workers. Parses in the calling thread if 1, or if the cmds fit in one chunk. (default: {the number of CPUs the process may run on})
+            chunksize {int} -- The number of cmds sent to a worker at a time. (default: {256})
+            ordered {bool} -- Yields the results in input order. Otherwise yields each chunk as soon as it is done. (default: {True})
+            strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. Sent to each worker process once. (default: {None})
+            executor {str} -- The kind of worker, 'process' or 'thread'. (default: {'process'})
+
+        Raises:
+            ValueError: The executor is unknown.
+
+        Yields:
+            BatchResult -- The index of the cmd in the input, and its argument dictionary or error.
+        """
+        if executor not in ('process', 'thread'):
+            raise ValueError('executor must be "process" or "thread", got {!r}.'.format(executor))
+        if limitoverrides is None:
+            limitoverrides = {}
+        if workers is None:
+            from utils.cpucount import cpucount
+            workers = cpucount()
+        chunks = _chunk(cmds, chunksize)
+        if workers > 1:
+            # A batch that fits in one chunk is parsed faster than a pool can be started.
+            head = list(itertools.islice(chunks, 2))
+            if len(head) < 2:
+                workers = 1
+            chunks = itertools.chain(head, chunks)
+
+        if workers <= 1:
+            for start, chunk in chunks:
+                yield from _parse_chunk(cls, start, chunk, limitoverrides, strict, profiles)
+            return
+
+        import collections
+        import concurrent.futures
+
+        if executor == 'thread':
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+            submit = lambda start, chunk: pool.submit(_parse_threaded_chunk, cls, start, chunk, limitoverrides, strict, profiles)
+        else:
+            initargs = (profiles, instrumentation.enabled, instrumentation.track_allocations)
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+            submit = lambda start, chunk: pool.submit(_parse_pooled_chunk, cls, start, chunk, limitoverrides, strict)
+        with pool:
+            # Keeps a bounded number of chunks in flight so the input is never read all at once.
+            pending = collections.deque()
+            for start, chunk in itertools.islice(chunks, workers * 2):
+                pending.append(submit(start, chunk))
+            while pending:
+                if ordered:
+                    done = pending.popleft()
+                else:
+                    done = next(concurrent.futures.as_completed(pending))
+                    pending.remove(done)
+                for start, chunk in itertools.islice(chunks, 1):
+                    pending.append(submit(start, chunk))
+                results, stats = done.result()
+                if stats:
+                    instrumentation.merge(stats)
+                yield from results
+
+    @classmethod
+    def fromtokens(cls, tokens, offsets, limitoverrides=None, profiles=None):
+        """Converts a corpus of already tokenized Bash cmds into argument dictionaries in bulk, classifying the
+        tokens of every cmd at once with NumPy. Requires the numpy package.
+
+        Example:
+            >>> BashMap.fromtokens(['curl', '-s', 'www.github.com', 'ls', '-l'], [0, 3, 5])
+            [{'utility': [('curl',)], '-s': [('www.github.com',)]}, {'utility': [('ls',)], '-l': [()]}]
+
+        Arguments:
+            tokens {sequence of strings} -- The tokens of every cmd, one cmd after the other.
+            offsets {sequence of ints} -- The index of each cmd's first token, followed by the number of tokens.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+        Returns:
+            [list of BashMaps] -- The argument dictionary of each cmd, in order.
+        """
+        from parser import bulkparse
+        return [cls(argdict) for argdict in bulkparse.parse(tokens, offsets, limitoverrides, profiles)]
+
+    @classmethod
+    def fromhistory(cls, path, format=None, limitoverrides=None, workers=None, chunksize=1 << 22, strict=True, profiles=None):
+        """Converts every cmd of a bash or zsh history file into an argument dictionary. The file is memory-mapped
+        and parsed in chunks by a pool of worker processes, and the entries are yielded in file order.
+
+        Example:
+            >>> for entry in BashMap.fromhistory('~/.zsh_history'):
+            ...     print(entry)
+            HistoryEntry(offset=0, timestamp=1700000000, duration=0, command='ls -l', bashmap={'utility': [('ls',)], '-l': [()]}, error=None)
+
+        Arguments:
+            path {str} -- The path of the history file.
+
+        Keyword Arguments:
+            format {str} -- The history format, 'bash' or 'zsh'. Detected from the start of the file if None. (default: {None})
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            workers {int} -- The number of worker processes. Parses in the calling process if 1. (default: {the number of CPUs the process may run on})
+            chunksize {int} -- The approximate number of bytes parsed by a worker at a time. (default: {4 MiB})
+            strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+        Yields:
+            HistoryEntry -- The byte offset, timestamp and duration of each entry, and its cmd with its argument dictionary or error.
+        """
+        from utils import history
+        return history.read(path, cls, format, limitoverrides, workers, chunksize, strict, profiles)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decodes an argument dictionary encoded by `to_bytes`.
+
+        Arguments:
+            data {bytes} -- The encoded argument dictionary.
+
+        Raises:
+            ValueError: The data isn't a valid encoded argument dictionary.
+
+        Returns:
+            BashMap -- The argument dictionary.
+        """
+        from model import bashmapcodec
+        return cls(bashmapcodec.decode(data))
+
+    def to_bytes(self):
+        """Encodes the argument dictionary in a compact binary form, with a string table for the keys and values and
+        varint lengths.
+
+        Returns:
+            bytes -- The encoded argument dictionary.
+        """
+        from model import bashmapcodec
+        return bashmapcodec.encode(self)
+
+    def __reduce__(self):
+        # Pickles only the arguments and spans. The loaded views are derived from them and rebuilt on demand.
+        if self.spans is None:
+            return (type(self), (dict(self),))
+        return (type(self), (dict(self),), {'spans': self.spans})
+
+    def freeze(self):
+        """Converts the argument dictionary into an immutable, hashable FrozenBashMap with interned keys and values.
+
+        Returns:
+            FrozenBashMap -- The frozen argument dictionary.
+        """
+        from model.frozenbashmap import FrozenBashMap
+        return FrozenBashMap.frombashmap(self)
 
     @property
     def utility(self):
@@ -91,14 +409,14 @@ class BashMap(dict):
         """        
         return self['utility']
 
-    @cached_property
+    @property
     def simpleutility(self):
-        """A cached property that returns the utility as a string.
+        """A view of the utility as a string, loaded on first use and kept until the map is mutated.
         
         Returns:
             str -- The utility name.
         """        
-        return self.utility[0][0]
+        return self._view('simpleutility', lambda: self.utility[0][0])
 
     @property
     def operands(self):
@@ -109,14 +427,14 @@ class BashMap(dict):
         """        
         return self['operands']
     
-    @cached_property
+    @property
     def simpleoperands(self):
-        """A cached property that returns the operands as a list of strings.
+        """A view of the operands as a list of strings, loaded on first use and kept until the map is mutated.
         
         Returns:
             str list -- The operands.
         """        
-        return self.load_simpleoperands()
+        return self._view('simpleoperands', self.load_simpleoperands)
 
     def load_simpleoperands(self):
         """Loads the operands as a list of strings.
@@ -126,14 +444,14 @@ class BashMap(dict):
         """        
         return list(operand for operandtuple in self.operands for operand in operandtuple)
     
-    @cached_property
+    @property
     def simpleoptions(self):
-        """A cached property that returns the options as a list of strings.
+        """A view of the options as a list of strings, loaded on first use and kept until the map is mutated.
         
         Returns:
             str list -- The options.
         """        
-        return self.load_simpleoptions()
+        return self._view('simpleoptions', self.load_simpleoptions)
     
     def load_simpleoptions(self):
         """Loads the options as a list of strings.
@@ -143,14 +461,15 @@ class BashMap(dict):
         """        
         return list(arg for arg in self.keys() if arg[0] == '-')
 
-    @cached_property
+    @property
     def allsimpleoptionargs(self):
-        """A cached property that returns all of the options in the dictionary as a list of strings.
+        """A view of all of the option-arguments in the dictionary as a list of strings, loaded on first use and kept
+        until the map is mutated.
         
         Returns:
-            str list -- Every option in the dictionary.
+            str list -- Every option-argument in the dictionary.
         """        
-        return self.loadall_simpleoptionargs()
+        return self._view('allsimpleoptionargs', self.loadall_simpleoptionargs)
 
     def loadall_simpleoptionargs(self):
         """Loads all option-arguments in the dictionary as a list of strings.
@@ -187,7 +506,112 @@ class BashMap(dict):
         return arg_groups
 
 
+def _chunk(cmds, chunksize):
+    """Splits the cmds into chunks of consecutive cmds.
+
+    Arguments:
+        cmds {iterable of strings} -- The Bash cmds.
+        chunksize {int} -- The maximum number of cmds in a chunk.
+
+    Yields:
+        tuple -- The index of the chunk's first cmd and the list of cmds in the chunk.
+    """
+    cmds = iter(cmds)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(cmds, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _init_worker(profiles, instrument, track_allocations):
+    """Sets up a worker process of `BashMap.fromcmds`. Stores the registry of limits override dictionaries, so it
+    isn't sent along with every chunk, and mirrors the parent's instrumentation settings.
+
+    Arguments:
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility.
+        instrument {bool} -- Records stage measurements in the worker.
+        track_allocations {bool} -- Records the bytes allocated by each stage.
+    """
+    global _worker_profiles
+    _worker_profiles = profiles
+    instrumentation.reset()
+    if instrument:
+        instrumentation.enable(track_allocations)
+    else:
+        instrumentation.disable()
+
+
+_worker_profiles = None
+
+
+def _parse_chunk(cls, start, cmds, limitoverrides, strict, profiles=None):
+    """Converts a chunk of Bash cmds into argument dictionaries. Runs inside the worker processes of
+    `BashMap.fromcmds`.
+
+    Arguments:
+        cls {type} -- The BashMap class to create.
+        start {int} -- The index of the chunk's first cmd in the batch.
+        cmds {list of strings} -- The Bash cmds.
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+        strict {bool} -- Checks every argument for invalid syntax.
+
+    Keyword Arguments:
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {the worker's registry})
+
+    Returns:
+        [list of BatchResults] -- The result for each cmd, in order.
+    """
+    from model.batchresult import BatchResult
+    if profiles is None:
+        profiles = _worker_profiles
+    results = []
+    for index, cmd in enumerate(cmds, start):
+        try:
+            results.append(BatchResult(index, cls.fromcmd(cmd, limitoverrides, strict, profiles=profiles), None))
+        except ValueError as error:
+            results.append(BatchResult(index, None, error))
+    return results
+
+
+def _parse_pooled_chunk(cls, start, cmds, limitoverrides, strict):
+    """Converts a chunk of Bash cmds into argument dictionaries inside a worker process, and hands back the stage
+    measurements recorded while doing so.
+
+    Returns:
+        tuple -- The list of BatchResults, and the StageStats recorded for the chunk keyed by stage.
+    """
+    results = _parse_chunk(cls, start, cmds, limitoverrides, strict)
+    stats = instrumentation.stats()
+    instrumentation.reset()
+    return results, stats
+
+
+def _parse_threaded_chunk(cls, start, cmds, limitoverrides, strict, profiles):
+    """Converts a chunk of Bash cmds into argument dictionaries inside a worker thread. The thread records its
+    stage measurements straight into the shared instrumentation registry, so there are none to hand back.
+
+    Returns:
+        tuple -- The list of BatchResults, and None.
+    """
+    return _parse_chunk(cls, start, cmds, limitoverrides, strict, profiles), None
+
+
+def _parse_instrumented(cmd, limitoverrides, strict, profiles):
+    """Runs the stages of `BashMap.fromcmd`, recording each one in the instrumentation registry.
+
+    Returns:
+        dict -- The argument dictionary.
+    """
+    args = instrumentation.measure('split', None, bashsplit.split, cmd, strict, profiles, limitoverrides)
+    argarray = instrumentation.measure('array', len(args), ArgumentArray.from_cmd, args)
+    return instrumentation.measure('parse', len(args), bashparse.parse, argarray, limitoverrides, profiles)
+
+
 def _set_up_argumentparser():
+    import argparse
     epilog = """
 Example:
 
@@ -198,34 +622,270 @@ Example:
         '-P': [('8080',)],
         'operands': [('www.github.com'), ('www.pypi.org')]
     }
+
+Example - Batch:
+
+    $ bashmap --batch ~/.bash_history
+    {"utility": [["ls"]], "-l": [[]]}
+    {"utility": [["curl"]], "-s": [["www.github.com"]]}
+
+Example - Daemon:
+
+    $ bashmap --serve &
+    $ bashmap --connect "curl -s www.github.com"
+    {'utility': [('curl',)], '-s': [('www.github.com',)]}
     """
     parser = argparse.ArgumentParser(
         description="Converts a Bash command into an argument dictionary.",
         epilog=epilog,
         formatter_class=argparse.RawDescriptionHelpFormatter)
-    parser.add_argument('command', help="The Bash command to convert into an argument dictionary.")
+    parser.add_argument('command', nargs='?', help="The Bash command to convert into an argument dictionary. With --batch, the file to read commands from. '-' reads commands from stdin.")
     parser.add_argument('-l', '--limit-overrides', help="The limits override dictionary indicating how many option-arguments an option can receive.")
-    parser.add_argument('-j', '--json', action='store_true', help="Prints the argument dictionary in JSON.")
+    parser.add_argument('-P', '--profiles', help="A JSON or TOML file of limits override dictionaries keyed by utility.")
+    parser.add_argument('-j', '--json', action='store_true', help="Prints the argument dictionary in JSON. Same as --format json.")
+    parser.add_argument('-f', '--format', choices=('repr', 'json', 'jsonl', 'binary'), help="The output format. binary writes varint length-prefixed records. (default: repr, or jsonl with --batch)")
     parser.add_argument('-p', '--pretty', action='store_true', help="Pretty prints the argument dictionary.")
+    parser.add_argument('-C', '--compound', action='store_true', help="Splits the command on control operators such as | && || ; and prints a list of the argument dictionaries of its commands.")
+    parser.add_argument('-b', '--batch', action='store_true', help="Reads one command per line and prints one argument dictionary per line.")
+    parser.add_argument('-H', '--history', choices=('auto', 'bash', 'zsh'), help="Reads the commands of the bash or zsh history file given as the command, and prints one JSON object with each entry's offset, timestamp and argument dictionary per line.")
+    parser.add_argument('-0', '--null', action='store_true', help="With --batch, reads NUL-delimited commands instead of lines.")
+    parser.add_argument('-k', '--keep-going', action='store_true', help="With --batch, prints an error object for a malformed command instead of stopping.")
+    parser.add_argument('-s', '--stats', action='store_true', help="Prints the time spent in each parsing stage to stderr when done.")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="With --batch, the number of worker processes to parse with. (default: 1)")
+    parser.add_argument('--serve', action='store_true', help="Runs a daemon that parses the commands sent to it over a Unix domain socket.")
+    parser.add_argument('-c', '--connect', action='store_true', help="Forwards the command to the daemon, parsing it in-process if no daemon is running.")
+    parser.add_argument('--socket', help="The daemon's socket path. (default: $BASHMAP_SOCKET, or bashmap.sock in $XDG_RUNTIME_DIR)")
     return parser    
 
 
-def main():
-    args = _set_up_argumentparser().parse_args()
+def _format(bashmap, outputformat, pretty):
+    """Formats the argument dictionary for printing.
 
-    limit_overrides = ast.literal_eval(args.limit_overrides) if args.limit_overrides else dict()
-    bashmap = BashMap.fromcmd(args.command, limitoverrides=limit_overrides)
+    Arguments:
+        bashmap {BashMap} -- The argument dictionary.
+        outputformat {str} -- The text output format: repr, json or jsonl.
+        pretty {bool} -- Spreads the argument dictionary over multiple lines. Ignored for jsonl.
 
-    if args.json:
-        if args.pretty:
-            print(json.dumps(bashmap, indent=2))
+    Returns:
+        str -- The formatted argument dictionary.
+    """
+    if outputformat in ('json', 'jsonl'):
+        import json
+    if outputformat == 'jsonl':
+        return json.dumps(bashmap)
+    elif outputformat == 'json':
+        if pretty:
+            return json.dumps(bashmap, indent=2)
         else:
-            print(json.dumps(bashmap))
+            return json.dumps(bashmap)
     else:
-        if args.pretty:
-            pprint(bashmap, width=1)
+        if pretty:
+            from pprint import pformat
+            return pformat(bashmap, width=1)
         else:
-            print(bashmap)
+            return str(bashmap)
+
+
+def _format_compound(links, outputformat, pretty):
+    """Formats the commands of a compound command for printing.
+
+    Arguments:
+        links {list of CommandLinks} -- The argument dictionary of each command and the operator following it.
+        outputformat {str} -- The text output format: repr, json or jsonl.
+        pretty {bool} -- Spreads the list over multiple lines. Ignored for jsonl.
+
+    Returns:
+        str -- The formatted list.
+    """
+    if outputformat == 'repr':
+        if pretty:
+            from pprint import pformat
+            return pformat(links)
+        return str(links)
+    import json
+    objects = [{'bashmap': link.bashmap, 'operator': link.operator} for link in links]
+    return json.dumps(objects, indent=2 if pretty and outputformat == 'json' else None)
+
+
+def _read_cmds(stream, delimiter):
+    """Reads the delimited commands from a stream, skipping blank ones.
+
+    Arguments:
+        stream {file} -- The text stream to read from.
+        delimiter {str} -- The character that ends each command.
+
+    Yields:
+        str -- The commands.
+    """
+    if delimiter == '\n':
+        records = (line.rstrip('\r\n') for line in stream)
+    else:
+        records = _read_records(stream, delimiter)
+    for record in records:
+        if record.strip():
+            yield record
+
+
+def _read_records(stream, delimiter, blocksize=1 << 16):
+    """Reads the records ended by delimiter from a stream in blocks.
+
+    Arguments:
+        stream {file} -- The text stream to read from.
+        delimiter {str} -- The character that ends each record.
+
+    Keyword Arguments:
+        blocksize {int} -- The number of characters to read at a time. (default: {65536})
+
+    Yields:
+        str -- The records.
+    """
+    remainder = ''
+    for block in iter(lambda: stream.read(blocksize), ''):
+        records = (remainder + block).split(delimiter)
+        remainder = records.pop()
+        yield from records
+    if remainder:
+        yield remainder
+
+
+def _run_batch(args, outputformat, limit_overrides, profiles):
+    """Converts every command read from the input into an argument dictionary and prints each one on its own line,
+    or as its own record in binary output.
+
+    Arguments:
+        args {argparse.Namespace} -- The command line arguments.
+        outputformat {str} -- The output format: repr, json, jsonl or binary.
+        limit_overrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility, or None.
+
+    Returns:
+        int -- The exit status.
+    """
+    import json
+    from model import bashmapcodec
+
+    stream = sys.stdin if args.command == '-' else open(args.command, newline='' if args.null else None)
+    with stream:
+        cmds, batch = itertools.tee(_read_cmds(stream, '\0' if args.null else '\n'))
+        results = BashMap.fromcmds(batch, limitoverrides=limit_overrides, workers=args.workers, profiles=profiles)
+        binary = outputformat == 'binary'
+        out = sys.stdout.buffer if binary else sys.stdout
+        for cmd, result in zip(cmds, results):
+            if result.error is None:
+                argdict = result.bashmap
+            elif args.keep_going:
+                argdict = {'command': [(cmd,)], 'error': [(str(result.error),)]} if binary else {'command': cmd, 'error': str(result.error)}
+            else:
+                out.flush()
+                print('bashmap: command {}: {}'.format(result.index + 1, result.error), file=sys.stderr)
+                return 1
+            if binary:
+                bashmapcodec.write(out, argdict)
+            else:
+                out.write(_format(argdict, outputformat, False) if result.error is None else json.dumps(argdict))
+                out.write('\n')
+    return 0
+
+
+def _parse_connected(cmd, limit_overrides, profiles, path):
+    """Converts a Bash command into an argument dictionary on the daemon, or in-process if no daemon is running.
+
+    Arguments:
+        cmd {string} -- The Bash command.
+        limit_overrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility, used when parsing in-process.
+        path {str} -- The daemon's socket path, or None for the default.
+
+    Returns:
+        BashMap -- The argument dictionary.
+    """
+    from server.parseclient import ParseClient
+    try:
+        with ParseClient(path) as client:
+            return BashMap(client.parse(cmd, limit_overrides))
+    except OSError:
+        return BashMap.fromcmd(cmd, limitoverrides=limit_overrides, profiles=profiles)
+
+
+def _run_history(args, limit_overrides, profiles):
+    """Converts every command of a history file into an argument dictionary and prints each entry as a line of JSON.
+
+    Arguments:
+        args {argparse.Namespace} -- The command line arguments.
+        limit_overrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility, or None.
+
+    Returns:
+        int -- The exit status.
+    """
+    import json
+    historyformat = None if args.history == 'auto' else args.history
+    for entry in BashMap.fromhistory(args.command, historyformat, limit_overrides, args.workers, profiles=profiles):
+        record = {'offset': entry.offset, 'timestamp': entry.timestamp, 'duration': entry.duration}
+        if entry.error is None:
+            record['bashmap'] = entry.bashmap
+        elif args.keep_going:
+            record.update(command=entry.command, error=str(entry.error))
+        else:
+            sys.stdout.flush()
+            print('bashmap: offset {}: {}'.format(entry.offset, entry.error), file=sys.stderr)
+            return 1
+        print(json.dumps(record))
+    return 0
+
+
+def main():
+    argumentparser = _set_up_argumentparser()
+    args = argumentparser.parse_args()
+
+    limit_overrides = dict()
+    if args.limit_overrides:
+        import ast
+        limit_overrides = ast.literal_eval(args.limit_overrides)
+    profiles = None
+    if args.profiles:
+        from parser.limitprofiles import LimitProfiles
+        profiles = LimitProfiles.fromfile(args.profiles)
+
+    if args.serve:
+        from server import parseclient, parseserver
+        parseserver.serve(args.socket or parseclient.default_path(), profiles)
+        sys.exit(0)
+    if args.command is None:
+        argumentparser.error('the following arguments are required: command')
+
+    if args.stats:
+        instrumentation.enable()
+
+    batch = args.batch or args.command == '-'
+    outputformat = args.format or ('json' if args.json else 'jsonl' if batch else 'repr')
+
+    if args.compound and (batch or outputformat == 'binary'):
+        argumentparser.error('--compound supports neither --batch nor binary output')
+
+    if args.history:
+        status = _run_history(args, limit_overrides, profiles)
+    elif args.compound:
+        print(_format_compound(BashMap.fromcompound(args.command, limit_overrides, profiles=profiles), outputformat, args.pretty))
+        status = 0
+    elif batch:
+        status = _run_batch(args, outputformat, limit_overrides, profiles)
+    else:
+        if args.connect:
+            bashmap = _parse_connected(args.command, limit_overrides, profiles, args.socket)
+        else:
+            bashmap = BashMap.fromcmd(args.command, limitoverrides=limit_overrides, profiles=profiles)
+        if outputformat == 'binary':
+            from model import bashmapcodec
+            bashmapcodec.write(sys.stdout.buffer, bashmap)
+        else:
+            print(_format(bashmap, outputformat, args.pretty))
+        status = 0
+
+    if args.stats:
+        sys.stdout.flush()
+        print(instrumentation.summary(), file=sys.stderr)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
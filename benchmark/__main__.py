@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""benchmark - Measures every stage of the bashmap pipeline over synthetic corpora.
+
+For each corpus and stage (`split`, `array`, `parse` and the end-to-end `fromcmd`) the suite reports
+throughput in commands and tokens per second, per-command latency percentiles and the peak memory
+allocated while processing the corpus. Results can be saved as a baseline and later compared
+against it, failing when a stage's throughput drops by more than the threshold.
+
+Example:
+    $ python -m benchmark --save benchmark/baseline.json
+    $ python -m benchmark --compare benchmark/baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from bashmap import BashMap
+from benchmark.corpus import CORPORA, generate
+from model.argumentarray import ArgumentArray
+from parser import bashparse
+from splitter import bashsplit
+
+
+STAGES = ('split', 'array', 'parse', 'fromcmd')
+# Commands in the long corpus hold thousands of tokens each, so it gets fewer of them.
+_SIZE_DIVISORS = {'long': 100}
+
+
+def _prepare(corpus):
+    """Runs the corpus through the pipeline once, so each stage can be timed on its own input.
+
+    Returns:
+        dict -- The input of each stage, keyed by stage, as lists of (input, limitoverrides) pairs.
+    """
+    split = [(cmd, limitoverrides) for cmd, limitoverrides in corpus]
+    array = [(bashsplit.split(cmd), limitoverrides) for cmd, limitoverrides in corpus]
+    parse = [(ArgumentArray.from_cmd(args), limitoverrides) for args, limitoverrides in array]
+    return {'split': split, 'array': array, 'parse': parse, 'fromcmd': split}
+
+
+_CALLS = {
+    'split': lambda cmd, limitoverrides: bashsplit.split(cmd),
+    'array': lambda args, limitoverrides: ArgumentArray.from_cmd(args),
+    'parse': lambda argarray, limitoverrides: bashparse.parse(argarray, limitoverrides),
+    'fromcmd': BashMap.fromcmd,
+}
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(stage, inputs, ntokens, repeat):
+    """Measures one stage over its inputs.
+
+    Arguments:
+        stage {str} -- The stage, one of STAGES.
+        inputs {list of tuples} -- The (input, limitoverrides) pairs the stage is called with.
+        ntokens {int} -- The number of tokens in the corpus.
+        repeat {int} -- The number of timed passes over the inputs. The fastest pass is reported.
+
+    Returns:
+        dict -- The throughput, latency percentiles in microseconds and peak memory in bytes.
+    """
+    call = _CALLS[stage]
+    clock = time.perf_counter
+    best = float('inf')
+    latencies = []
+    for _ in range(repeat):
+        passlatencies = []
+        started = clock()
+        for arg, limitoverrides in inputs:
+            before = clock()
+            call(arg, limitoverrides)
+            passlatencies.append(clock() - before)
+        elapsed = clock() - started
+        if elapsed < best:
+            best = elapsed
+            latencies = passlatencies
+
+    tracemalloc.start()
+    try:
+        for arg, limitoverrides in inputs:
+            call(arg, limitoverrides)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'cmds_per_sec': len(inputs) / best,
+        'tokens_per_sec': ntokens / best,
+        'p50_us': _percentile(latencies, 0.50) * 1e6,
+        'p90_us': _percentile(latencies, 0.90) * 1e6,
+        'p99_us': _percentile(latencies, 0.99) * 1e6,
+        'peak_bytes': peak,
+    }
+
+
+def run(corpora, size, seed, repeat):
+    """Runs every stage over every corpus.
+
+    Returns:
+        dict -- The measurements, keyed by corpus and then by stage.
+    """
+    results = {}
+    for name in corpora:
+        corpus = generate(name, max(1, size // _SIZE_DIVISORS.get(name, 1)), seed)
+        inputs = _prepare(corpus)
+        ntokens = sum(len(args) for args, _ in inputs['array'])
+        results[name] = {stage: measure(stage, inputs[stage], ntokens, repeat) for stage in STAGES}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Finds the stages whose throughput dropped below the baseline by more than the threshold.
+
+    Arguments:
+        results {dict} -- The current measurements.
+        baseline {dict} -- The baseline measurements.
+        threshold {float} -- The tolerated relative drop in throughput, such as 0.1 for 10%.
+
+    Returns:
+        [list of tuples] -- The (corpus, stage, baseline, current) throughput of each regression.
+    """
+    regressions = []
+    for name, stages in results.items():
+        for stage, metrics in stages.items():
+            expected = baseline.get(name, {}).get(stage)
+            if expected is None:
+                continue
+            if metrics['tokens_per_sec'] < expected['tokens_per_sec'] * (1 - threshold):
+                regressions.append((name, stage, expected['tokens_per_sec'], metrics['tokens_per_sec']))
+    return regressions
+
+
+def _report(results, baseline=None):
+    header = '{:<12} {:<8} {:>12} {:>14} {:>9} {:>9} {:>9} {:>12}'
+    row = '{:<12} {:<8} {:>12.0f} {:>14.0f} {:>9.1f} {:>9.1f} {:>9.1f} {:>12}'
+    print(header.format('corpus', 'stage', 'cmds/s', 'tokens/s', 'p50 us', 'p90 us', 'p99 us', 'peak KiB'))
+    for name, stages in results.items():
+        for stage, m in stages.items():
+            line = row.format(name, stage, m['cmds_per_sec'], m['tokens_per_sec'], m['p50_us'], m['p90_us'],
+                              m['p99_us'], m['peak_bytes'] // 1024)
+            expected = (baseline or {}).get(name, {}).get(stage)
+            if expected:
+                line += ' {:+7.1%}'.format(m['tokens_per_sec'] / expected['tokens_per_sec'] - 1)
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks every stage of the bashmap pipeline.")
+    parser.add_argument('-c', '--corpus', nargs='+', choices=CORPORA, default=list(CORPORA), help="The corpora to run.")
+    parser.add_argument('-n', '--size', type=int, default=2000, help="The number of commands per corpus. The long corpus uses a hundredth. (default: 2000)")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="The corpus seed. (default: 0)")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="The number of timed passes per stage. (default: 3)")
+    parser.add_argument('--save', metavar='FILE', help="Saves the results as a baseline file.")
+    parser.add_argument('--compare', metavar='FILE', help="Compares the results against a baseline file.")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1, help="The tolerated throughput drop when comparing. (default: 0.1)")
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.size, args.seed, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)['results']
+    _report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            meta = {'size': args.size, 'seed': args.seed, 'python': platform.python_version(), 'machine': platform.machine()}
+            json.dump({'meta': meta, 'results': results}, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, stage, expected, current in regressions:
+            print('REGRESSION {} {}: {:.0f} -> {:.0f} tokens/s'.format(name, stage, expected, current), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
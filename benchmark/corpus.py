@@ -0,0 +1,116 @@
+"""corpus - Generates seeded, synthetic corpora of Bash commands for the benchmarks.
+
+Every corpus is a list of (command, limitoverrides) pairs, so the same seed always produces the
+same commands on every machine.
+
+Example:
+    >>> generate('clusters', 2, seed=0)
+    [('rsync -iOL /var/log/syslog', {}), ('sips -fNzm9263 -TnIu www.pypi.org', {})]
+"""
+import random
+
+
+_UTILITIES = ('curl', 'git', 'kubectl', 'tar', 'grep', 'find', 'docker', 'ssh', 'rsync', 'sips')
+_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_WORDS = ('status', 'pods', 'prod', 'www.github.com', 'www.pypi.org', 'archive.tar.gz', 'main', 'origin',
+          'format', 'jpeg', 'build', 'image:latest', '/var/log/syslog', 'README.md', 'src/', '8080')
+_LONGOPTIONS = ('--retry', '--namespace', '--output', '--header', '--data', '--user', '--force', '--verbose',
+                '--exclude', '--include', '--max-time', '--compressed', '--recursive', '--setProperty')
+
+
+def _word(rnd):
+    return rnd.choice(_WORDS)
+
+
+def _clusters(rnd):
+    """A command with clusters of short options, some ending in a numeric option-argument."""
+    args = [rnd.choice(_UTILITIES)]
+    for _ in range(rnd.randint(1, 3)):
+        cluster = '-' + ''.join(rnd.sample(_LETTERS, rnd.randint(2, 5)))
+        if rnd.random() < 0.5:
+            cluster += str(rnd.randint(1, 65535))
+        args.append(cluster)
+    args.append(_word(rnd))
+    return ' '.join(args), {}
+
+
+def _longoptions(rnd):
+    """A command with long options, most of them followed by an option-argument."""
+    args = [rnd.choice(_UTILITIES)]
+    for _ in range(rnd.randint(2, 6)):
+        args.append(rnd.choice(_LONGOPTIONS))
+        if rnd.random() < 0.8:
+            args.append(_word(rnd))
+    return ' '.join(args), {}
+
+
+def _quoted(rnd):
+    """A command with single-quoted, double-quoted and escaped arguments."""
+    args = [rnd.choice(_UTILITIES)]
+    for _ in range(rnd.randint(2, 5)):
+        args.append(rnd.choice(_LONGOPTIONS))
+        kind = rnd.randint(0, 3)
+        if kind == 0:
+            args.append("'{} {}'".format(_word(rnd), _word(rnd)))
+        elif kind == 1:
+            args.append('"{}=\\"{}\\" $HOME"'.format(_word(rnd), _word(rnd)))
+        elif kind == 2:
+            args.append('{}\\ {}'.format(_word(rnd), _word(rnd)))
+        else:
+            args.append('x"{}"y'.format(_word(rnd)))
+    return ' '.join(args), {}
+
+
+def _infinite(rnd):
+    """A command whose option takes an unlimited number of option-arguments."""
+    option = rnd.choice(_LONGOPTIONS)
+    args = [rnd.choice(_UTILITIES), option]
+    args.extend('file{}.txt'.format(i) for i in range(rnd.randint(5, 50)))
+    args.extend(('-v', _word(rnd)))
+    return ' '.join(args), {option: None, '-v': 0}
+
+
+def _long(rnd):
+    """A machine-generated command with thousands of operands, such as an xargs expansion."""
+    args = ['rm', '-f']
+    args.extend('/tmp/build/{}/{}.o'.format(rnd.randint(0, 99), i) for i in range(rnd.randint(1000, 5000)))
+    return ' '.join(args), {'-f': 0}
+
+
+_GENERATORS = {
+    'clusters': _clusters,
+    'longoptions': _longoptions,
+    'quoted': _quoted,
+    'infinite': _infinite,
+    'long': _long,
+}
+# The mixed corpus leans towards the short, interactive commands found in shell histories.
+_MIXED_WEIGHTS = (('clusters', 30), ('longoptions', 40), ('quoted', 20), ('infinite', 9), ('long', 1))
+
+CORPORA = ('mixed',) + tuple(_GENERATORS)
+
+
+def generate(corpus, size, seed=0):
+    """Generates a corpus of Bash commands.
+
+    Arguments:
+        corpus {str} -- The kind of corpus, one of CORPORA.
+        size {int} -- The number of commands.
+
+    Keyword Arguments:
+        seed {int} -- The random seed. (default: {0})
+
+    Raises:
+        ValueError: The corpus kind is unknown.
+
+    Returns:
+        [list of tuples] -- The (command, limitoverrides) pairs.
+    """
+    rnd = random.Random('{}:{}'.format(corpus, seed))
+    if corpus == 'mixed':
+        names = [name for name, _ in _MIXED_WEIGHTS]
+        weights = [weight for _, weight in _MIXED_WEIGHTS]
+        return [_GENERATORS[rnd.choices(names, weights)[0]](rnd) for _ in range(size)]
+    if corpus not in _GENERATORS:
+        raise ValueError('Unknown corpus "{}". Choose from {}.'.format(corpus, ', '.join(CORPORA)))
+    return [_GENERATORS[corpus](rnd) for _ in range(size)]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""group_benchmark - Measures how parsing scales with the size of a single option-argument group.
+
+Parses `tar -f archive.tar file0 ... fileN` with `-f` allowed infinite option-arguments, so every
+file lands in one group. Building the group one tuple at a time, as `benchmark.legacy` does, copies
+the whole group on every option-argument; that reference is only timed up to 10k option-arguments.
+With linear scaling, the time per option-argument stays flat as the group grows.
+
+Example:
+    $ python -m benchmark.group_benchmark
+    optargs           seconds     ns/optarg   rebuild ns/optarg
+    10               0.000002         210.5               250.1
+    ...
+"""
+import argparse
+import timeit
+
+from benchmark import legacy
+from model.argumentarray import ArgumentArray
+from parser import bashparse
+
+
+# Option-arguments beyond which the tuple-rebuilding reference takes too long to time.
+_REBUILD_LIMIT = 10000
+
+
+def make_args(noptargs):
+    """Builds the arguments of a tar command whose -f option receives every file.
+
+    Arguments:
+        noptargs {int} -- The number of option-arguments.
+
+    Returns:
+        [list of strings] -- The Bash arguments, starting with the utility.
+    """
+    return ['tar', '-f'] + ['file{}.txt'.format(i) for i in range(noptargs)]
+
+
+def rebuild(args):
+    """Builds the option-argument group one tuple at a time, the way the original parser did.
+    """
+    group = ()
+    for value in args[2:]:
+        group = legacy._append_optionargument_group(group, value)
+    return group
+
+
+def measure(noptargs, repeat=3):
+    """Times parsing a command with one group of noptargs option-arguments.
+
+    Arguments:
+        noptargs {int} -- The number of option-arguments.
+
+    Keyword Arguments:
+        repeat {int} -- The number of timing repetitions. (default: {3})
+
+    Returns:
+        tuple -- The best time in seconds, and the best time of the tuple-rebuilding reference or None if it was skipped.
+    """
+    args = make_args(noptargs)
+    argarray = ArgumentArray.from_cmd(args)
+    limitoverrides = {'-f': None}
+    seconds = _best(lambda: bashparse.parse(argarray, limitoverrides), repeat)
+    reference = _best(lambda: rebuild(args), repeat) if noptargs <= _REBUILD_LIMIT else None
+    return seconds, reference
+
+
+def _best(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks parsing as a single option-argument group grows.")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+                        help="The numbers of option-arguments to benchmark.")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="The number of timing repetitions per size.")
+    args = parser.parse_args()
+
+    print('{:<10} {:>14} {:>13} {:>19}'.format('optargs', 'seconds', 'ns/optarg', 'rebuild ns/optarg'))
+    for size in args.sizes:
+        seconds, reference = measure(size, args.repeat)
+        rebuilt = '{:>19.1f}'.format(reference / size * 1e9) if reference is not None else '{:>19}'.format('-')
+        print('{:<10} {:>14.6f} {:>13.1f} {}'.format(size, seconds, seconds / size * 1e9, rebuilt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""legacy - Frozen copies of the original linked list and recursive parser, kept as benchmark references.
+
+These are not used by bashmap itself. They exist so the benchmarks can report how the current
+implementation compares with the one it replaced.
+"""
+
+
+class ArgumentNode:
+    """Node for an argument that contains a value, next, and previous.
+    """
+    def __init__(self, value=None):
+        self.value = value
+        self.next = None
+        self.prev = None
+
+
+class ArgumentDoublyLinkedList:
+    """A doubly linked list of ArgumentNodes.
+    """
+    def __init__(self):
+        self.head = None
+        self.tail = None
+
+    @staticmethod
+    def from_cmd(args):
+        llist = ArgumentDoublyLinkedList()
+        llist.head = ArgumentNode(value=args[0])
+
+        prev = None
+        for arg in args:
+            if not prev:
+                prev = llist.head
+                continue
+            prev.next = ArgumentNode(value=arg)
+            prev.next.prev = prev
+            prev = prev.next
+        llist.tail = prev
+        return llist
+
+
+def parse(linkedlist, limitoverrides):
+    """The original recursive implementation of `bashparse.parse`. Recurses once per argument.
+    """
+    argdict = dict()
+    _store_utility(linkedlist.head, argdict)
+    _parse_arguments(linkedlist.head.next, argdict, limitoverrides)
+    return argdict
+
+
+def _parse_arguments(argnode, argdict, limitoverrides):
+    if argnode is None:
+        return
+    if _is_option(argnode):
+        _store_option(argnode, argdict)
+        if _has_next(argnode):
+            argnode = _parse_optionarguments(argnode, argnode.next, argdict, limitoverrides.get(argnode.value, 1))
+        else:
+            return argnode
+    else:
+        _store_operand(argnode, argdict)
+    _parse_arguments(argnode.next, argdict, limitoverrides)
+
+
+def _parse_optionarguments(option_node, argnode, argdict, n):
+    if _is_optionargument(argnode):
+        _upsert_optionargument_group(option_node, argnode, -1, argdict)
+        if _is_finite(n):
+            n -= 1
+            if n <= 0:
+                return argnode
+    else:
+        return argnode.prev
+    return _parse_optionarguments(option_node, argnode.next, argdict, n)
+
+
+def _store_operand(operand_node, argdict):
+    if 'operands' in argdict:
+        argdict['operands'].append(_init_optionargument_group(operand_node.value))
+    else:
+        argdict['operands'] = [_init_optionargument_group(operand_node.value)]
+
+
+def _store_utility(utility_node, argdict):
+    argdict['utility'] = [_init_optionargument_group(utility_node.value)]
+
+
+def _store_option(option_node, argdict):
+    argdict.setdefault(option_node.value, []).append(_init_optionargument_group())
+
+
+def _upsert_optionargument_group(option_node, optionarg, index, argdict):
+    if option_node.value not in argdict:
+        argdict[option_node.value] = [_init_optionargument_group(optionarg.value)]
+    else:
+        argdict[option_node.value][index] = _append_optionargument_group(argdict[option_node.value][index], optionarg.value)
+
+
+def _init_optionargument_group(value=None):
+    if value is None:
+        return ()
+    else:
+        return (value,)
+
+
+def _append_optionargument_group(group, value):
+    return (*group, value)
+
+
+def _is_option(argnode):
+    return argnode.value[0] == '-'
+
+
+def _is_optionargument(argnode):
+    return argnode.value[0] != '-'
+
+
+def _is_finite(limit):
+    return limit is not None
+
+
+def _has_next(option_node):
+    return option_node.next is not None
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""memory_benchmark - Measures the memory held by the token store per 1k tokens.
+
+Compares `model.argumentarray.ArgumentArray` against the original doubly linked list of
+ArgumentNodes in `benchmark.legacy`. The argument strings themselves are shared by both stores
+and are not counted.
+
+Example:
+    $ python -m benchmark.memory_benchmark
+    store                          bytes/1k tokens
+    ArgumentDoublyLinkedList              ...
+    ArgumentArray                         ...
+"""
+import argparse
+import tracemalloc
+
+from benchmark import legacy
+from benchmark.parse_benchmark import make_args
+from model.argumentarray import ArgumentArray
+
+
+def measure(from_cmd, args):
+    """Returns the number of bytes allocated while building a token store from args.
+    """
+    tracemalloc.start()
+    try:
+        store = from_cmd(args)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del store
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the memory held by the token store per 1k tokens.")
+    parser.add_argument('-n', '--tokens', type=int, default=100000, help="The number of tokens to store.")
+    args = parser.parse_args()
+
+    cmdargs = make_args(args.tokens)
+    print('{:<30} {:>16}'.format('store', 'bytes/1k tokens'))
+    for name, from_cmd in (('ArgumentDoublyLinkedList', legacy.ArgumentDoublyLinkedList.from_cmd),
+                           ('ArgumentArray', ArgumentArray.from_cmd)):
+        print('{:<30} {:>16.0f}'.format(name, measure(from_cmd, cmdargs) * 1000 / len(cmdargs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""parse_benchmark - Measures bashparse throughput in tokens per second.
+
+Compares the loop-driven parser in `parser.bashparse` against a frozen copy of the original
+recursive parser in `benchmark.legacy`. The recursive parser needs one stack frame per argument,
+so it is only run for commands that fit under the interpreter's recursion limit.
+
+Example:
+    $ python -m benchmark.parse_benchmark
+    tokens     iterative tok/s   recursive tok/s
+    10               1234567.8         1034567.8
+    ...
+"""
+import argparse
+import sys
+import timeit
+
+from benchmark import legacy
+from model.argumentarray import ArgumentArray
+from parser import bashparse
+
+
+def make_args(ntokens):
+    """Builds a synthetic argument list with a mix of options, option-arguments and operands.
+
+    Arguments:
+        ntokens {int} -- The number of arguments following the utility.
+
+    Returns:
+        [list of strings] -- The Bash arguments, starting with the utility.
+    """
+    pattern = ('-v', '--output', 'out.txt', 'file.txt', '-n', '5')
+    args = ['find']
+    for i in range(ntokens):
+        args.append(pattern[i % len(pattern)])
+    # Ends on an operand so the recursive reference never runs off the end of the list.
+    args[-1] = 'last.txt'
+    return args
+
+
+def bench(parsefunc, tokens, ntokens, repeat):
+    """Returns the best observed throughput of parsefunc over its tokens in tokens per second.
+    """
+    timer = timeit.Timer(lambda: parsefunc(tokens, {}))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return ntokens / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks bashparse throughput in tokens per second.")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[10, 100, 500, 1000, 10000, 100000],
+                        help="The numbers of tokens to benchmark.")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="The number of timing repetitions per size.")
+    args = parser.parse_args()
+
+    print('{:<10} {:>18} {:>18}'.format('tokens', 'iterative tok/s', 'recursive tok/s'))
+    for size in args.sizes:
+        cmdargs = make_args(size)
+        iterative = bench(bashparse.parse, ArgumentArray.from_cmd(cmdargs), len(cmdargs), args.repeat)
+        # Leave headroom for the frames above the parser.
+        if size < sys.getrecursionlimit() - 50:
+            linkedlist = legacy.ArgumentDoublyLinkedList.from_cmd(cmdargs)
+            recursive = '{:>18.1f}'.format(bench(legacy.parse, linkedlist, len(cmdargs), args.repeat))
+        else:
+            recursive = '{:>18}'.format('RecursionError')
+        print('{:<10} {:>18.1f} {}'.format(size, iterative, recursive))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""ArgumentArray - A compact, index-addressed array of Bash arguments.
+"""
+
+
+class ArgumentArray:
+    """A compact, immutable array of Bash arguments. The parser walks it by index, so the argument
+    before or after any argument is found with index arithmetic instead of node pointers.
+    """
+    __slots__ = ('values',)
+
+    def __init__(self, values=()):
+        self.values = tuple(values)
+
+    @staticmethod
+    def from_cmd(args):
+        """Converts a list of strings into an ArgumentArray.
+
+        Arguments:
+            args {list of strings} -- The Bash arguments.
+
+        Returns:
+            [ArgumentArray] -- The array of arguments.
+        """
+        return ArgumentArray(args)
+
+    @property
+    def head(self):
+        """The first argument, which is the utility.
+
+        Returns:
+            str -- The first argument, or None if the array is empty.
+        """
+        return self.values[0] if self.values else None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
@@ -0,0 +1,129 @@
+"""bashmapcodec - A compact binary encoding for argument dictionaries.
+
+Each record starts with a string table holding every distinct key and value once, followed by the
+keys and their argument groups as varint indexes into the table. Records can be written back to back
+in a stream, each one prefixed with its varint length.
+
+Example:
+    >>> data = encode({'utility': [('curl',)], '-P': [('8080',)]})
+    >>> len(data)
+    32
+    >>> decode(data)
+    {'utility': [('curl',)], '-P': [('8080',)]}
+"""
+from utils import varint
+
+
+_VERSION = 1
+
+
+def encode(argdict):
+    """Encodes an argument dictionary.
+
+    Arguments:
+        argdict {dict} -- The argument dictionary.
+
+    Returns:
+        bytes -- The encoded record.
+    """
+    table = {}
+    body = bytearray()
+    varint.write(body, len(argdict))
+    for key, groups in argdict.items():
+        varint.write(body, table.setdefault(key, len(table)))
+        varint.write(body, len(groups))
+        for group in groups:
+            varint.write(body, len(group))
+            for value in group:
+                varint.write(body, table.setdefault(value, len(table)))
+    record = bytearray((_VERSION,))
+    varint.write(record, len(table))
+    for string in table:
+        varint.write_str(record, string)
+    record += body
+    return bytes(record)
+
+
+def decode(data, pos=0):
+    """Decodes an argument dictionary.
+
+    Arguments:
+        data {bytes} -- The encoded record.
+
+    Keyword Arguments:
+        pos {int} -- The offset of the record in data. (default: {0})
+
+    Raises:
+        ValueError: The record is truncated or has an unknown version.
+
+    Returns:
+        dict -- The argument dictionary.
+    """
+    argdict, _ = _decode(data, pos)
+    return argdict
+
+
+def _decode(data, pos):
+    if pos >= len(data) or data[pos] != _VERSION:
+        raise ValueError('Unknown record version at offset {}.'.format(pos))
+    pos += 1
+    nstrings, pos = varint.read(data, pos)
+    table = []
+    for _ in range(nstrings):
+        string, pos = varint.read_str(data, pos)
+        table.append(string)
+    argdict = {}
+    try:
+        nkeys, pos = varint.read(data, pos)
+        for _ in range(nkeys):
+            key, pos = varint.read(data, pos)
+            ngroups, pos = varint.read(data, pos)
+            groups = []
+            for _ in range(ngroups):
+                nvalues, pos = varint.read(data, pos)
+                group = []
+                for _ in range(nvalues):
+                    value, pos = varint.read(data, pos)
+                    group.append(table[value])
+                groups.append(tuple(group))
+            argdict[table[key]] = groups
+    except IndexError:
+        raise ValueError('String index out of range in record.')
+    return argdict, pos
+
+
+def write(stream, argdict):
+    """Writes an argument dictionary to a binary stream as a length-prefixed record.
+
+    Arguments:
+        stream {file} -- The binary stream.
+        argdict {dict} -- The argument dictionary.
+    """
+    record = encode(argdict)
+    prefix = bytearray()
+    varint.write(prefix, len(record))
+    stream.write(prefix)
+    stream.write(record)
+
+
+def iterdecode(data):
+    """Decodes a sequence of length-prefixed records, as written by `write`.
+
+    Arguments:
+        data {bytes} -- The encoded records.
+
+    Raises:
+        ValueError: A record is truncated or malformed.
+
+    Yields:
+        dict -- The argument dictionaries.
+    """
+    pos = 0
+    end = len(data)
+    while pos < end:
+        length, pos = varint.read(data, pos)
+        argdict, recordend = _decode(data, pos)
+        if recordend != pos + length:
+            raise ValueError('Record at offset {} has the wrong length.'.format(pos))
+        pos = recordend
+        yield argdict
@@ -0,0 +1,13 @@
+"""BatchResult - The outcome of parsing one command in a batch.
+"""
+from collections import namedtuple
+
+
+BatchResult = namedtuple('BatchResult', ['index', 'bashmap', 'error'])
+BatchResult.__doc__ = """The outcome of parsing one command in a batch.
+
+Attributes:
+    index {int} -- The position of the command in the batch's input.
+    bashmap {BashMap} -- The argument dictionary, or None if the command couldn't be parsed.
+    error {ValueError} -- The error raised while parsing the command, or None if it was parsed.
+"""
@@ -0,0 +1,250 @@
+"""CommandIndex - An inverted index over many argument dictionaries.
+
+Maps every utility, option, (option, option-argument) pair and operand to the set of command ids
+that contain it, so a query costs roughly the size of the posting lists it touches instead of a scan
+over every command.
+
+Example:
+    >>> index = CommandIndex()
+    >>> index.add(0, BashMap.fromcmd('curl --insecure www.github.com', limitoverrides={'--insecure': 0}))
+    >>> index.add(1, BashMap.fromcmd('kubectl get pods -n prod'))
+    >>> index.add(2, BashMap.fromcmd('kubectl get svc -n dev'))
+    >>> index.query(allof=[CommandIndex.utility('kubectl'), CommandIndex.optionarg('-n', 'prod')])
+    {1}
+"""
+from utils import varint
+
+
+_MAGIC = b'BMIX1\n'
+# The kinds of terms, in the order of their codes in the file format, and the number of strings each one holds.
+_KINDS = ('utility', 'option', 'optarg', 'operand')
+_ARITY = {'utility': 1, 'option': 1, 'optarg': 2, 'operand': 1}
+
+
+class CommandIndex:
+    """An inverted index from the terms of argument dictionaries to the ids of the commands they came from.
+
+    A term is a tuple whose first element is its kind:
+        ('utility', name), ('option', option), ('optarg', option, option-argument) or ('operand', operand)
+    """
+    def __init__(self):
+        self._postings = {}
+        self._documents = {}
+
+    @staticmethod
+    def utility(name):
+        """Builds the term for a utility.
+
+        Arguments:
+            name {str} -- The utility name.
+
+        Returns:
+            tuple -- The term.
+        """
+        return ('utility', name)
+
+    @staticmethod
+    def option(option):
+        """Builds the term for an option.
+
+        Arguments:
+            option {str} -- The option name.
+
+        Returns:
+            tuple -- The term.
+        """
+        return ('option', option)
+
+    @staticmethod
+    def optionarg(option, value):
+        """Builds the term for an option-argument of an option.
+
+        Arguments:
+            option {str} -- The option name.
+            value {str} -- The option-argument.
+
+        Returns:
+            tuple -- The term.
+        """
+        return ('optarg', option, value)
+
+    @staticmethod
+    def operand(value):
+        """Builds the term for an operand.
+
+        Arguments:
+            value {str} -- The operand.
+
+        Returns:
+            tuple -- The term.
+        """
+        return ('operand', value)
+
+    @staticmethod
+    def terms(bashmap):
+        """Extracts the terms of an argument dictionary.
+
+        Arguments:
+            bashmap {dict} -- The argument dictionary. Can also be a FrozenBashMap.
+
+        Returns:
+            set -- The terms.
+        """
+        terms = set()
+        for key, groups in bashmap.items():
+            if key == 'utility':
+                terms.update(('utility', value) for group in groups for value in group)
+            elif key == 'operands':
+                terms.update(('operand', value) for group in groups for value in group)
+            else:
+                terms.add(('option', key))
+                terms.update(('optarg', key, value) for group in groups for value in group)
+        return terms
+
+    def add(self, cmdid, bashmap):
+        """Adds an argument dictionary to the index, replacing any command already indexed under the id.
+
+        Arguments:
+            cmdid {int} -- The command id.
+            bashmap {dict} -- The argument dictionary. Can also be a FrozenBashMap.
+        """
+        if cmdid in self._documents:
+            self.remove(cmdid)
+        terms = self.terms(bashmap)
+        self._documents[cmdid] = tuple(terms)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(cmdid)
+
+    def addresults(self, results, offset=0):
+        """Adds the argument dictionaries from a batch, such as the results of `BashMap.fromcmds`. Commands that
+        couldn't be parsed are skipped.
+
+        Arguments:
+            results {iterable of BatchResults} -- The batch results.
+
+        Keyword Arguments:
+            offset {int} -- The id of the batch's first command. Each command's id is its index plus the offset. (default: {0})
+        """
+        for result in results:
+            if result.error is None:
+                self.add(result.index + offset, result.bashmap)
+
+    def remove(self, cmdid):
+        """Removes a command from the index.
+
+        Arguments:
+            cmdid {int} -- The command id.
+
+        Raises:
+            KeyError: The command isn't in the index.
+        """
+        for term in self._documents.pop(cmdid):
+            posting = self._postings[term]
+            posting.discard(cmdid)
+            if not posting:
+                del self._postings[term]
+
+    def lookup(self, term):
+        """Returns the ids of the commands that contain a term.
+
+        Arguments:
+            term {tuple} -- The term.
+
+        Returns:
+            frozenset -- The command ids.
+        """
+        return frozenset(self._postings.get(term, ()))
+
+    def query(self, allof=(), anyof=(), noneof=()):
+        """Returns the ids of the commands that contain every term in allof, at least one term in anyof, and no term in noneof.
+        The posting lists are intersected smallest first, so the cost follows the smallest list.
+
+        Keyword Arguments:
+            allof {iterable of tuples} -- The terms every result must contain. (default: {()})
+            anyof {iterable of tuples} -- The terms of which every result must contain at least one. (default: {()})
+            noneof {iterable of tuples} -- The terms no result may contain. (default: {()})
+
+        Returns:
+            set -- The command ids.
+        """
+        postings = [self._postings.get(term, set()) for term in allof]
+        if anyof:
+            postings.append(set().union(*(self._postings.get(term, ()) for term in anyof)))
+        if postings:
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                if not result:
+                    break
+                result.intersection_update(posting)
+        else:
+            result = set(self._documents)
+        for term in noneof:
+            result.difference_update(self._postings.get(term, ()))
+        return result
+
+    def save(self, path):
+        """Writes the index to a file. The posting lists are stored sorted, as varint-encoded gaps between ids.
+
+        Arguments:
+            path {str} -- The path of the file.
+        """
+        buffer = bytearray(_MAGIC)
+        varint.write(buffer, len(self._postings))
+        for term, posting in self._postings.items():
+            varint.write(buffer, _KINDS.index(term[0]))
+            for string in term[1:]:
+                varint.write_str(buffer, string)
+            varint.write(buffer, len(posting))
+            previous = 0
+            for cmdid in sorted(posting):
+                varint.write(buffer, cmdid - previous)
+                previous = cmdid
+        with open(path, 'wb') as fh:
+            fh.write(buffer)
+
+    @classmethod
+    def load(cls, path):
+        """Reads an index written by `save`.
+
+        Arguments:
+            path {str} -- The path of the file.
+
+        Raises:
+            ValueError: The file isn't a command index or is truncated.
+
+        Returns:
+            CommandIndex -- The index.
+        """
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        if not data.startswith(_MAGIC):
+            raise ValueError('{} is not a command index.'.format(path))
+        index = cls()
+        documents = {}
+        nterms, pos = varint.read(data, len(_MAGIC))
+        for _ in range(nterms):
+            code, pos = varint.read(data, pos)
+            kind = _KINDS[code]
+            term = [kind]
+            for _ in range(_ARITY[kind]):
+                string, pos = varint.read_str(data, pos)
+                term.append(string)
+            term = tuple(term)
+            count, pos = varint.read(data, pos)
+            posting = set()
+            cmdid = 0
+            for _ in range(count):
+                gap, pos = varint.read(data, pos)
+                cmdid += gap
+                posting.add(cmdid)
+                documents.setdefault(cmdid, []).append(term)
+            index._postings[term] = posting
+        index._documents = {cmdid: tuple(terms) for cmdid, terms in documents.items()}
+        return index
+
+    def __contains__(self, cmdid):
+        return cmdid in self._documents
+
+    def __len__(self):
+        return len(self._documents)
@@ -0,0 +1,12 @@
+"""CommandLink - One command of a compound command and the control operator linking it to the next.
+"""
+from collections import namedtuple
+
+
+CommandLink = namedtuple('CommandLink', ['bashmap', 'operator'])
+CommandLink.__doc__ = """One command of a compound command and the control operator linking it to the next.
+
+Attributes:
+    bashmap {BashMap} -- The argument dictionary of the command.
+    operator {str} -- The control operator following the command (`|`, `|&`, `&&`, `||`, `;` or `&`), or None if nothing follows it.
+"""
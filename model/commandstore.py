@@ -0,0 +1,528 @@
+"""CommandStore - A columnar store of parsed Bash commands for aggregate statistics.
+
+Commands are parsed straight into columns, without building an argument dictionary for each one.
+Every utility, option and value is dictionary-encoded as its index in one shared string table, so
+each column is a flat array of integers:
+
+    utilities     The utility of each command.
+    rowstarts     The index of each command's first row.
+    keys          The option of each row, or 'operands' for a row holding an operand.
+    valuestarts   The index of each row's first value.
+    values        The option-arguments and operands.
+
+    curl -s -P 8080 url  ->  utilities [curl]   rowstarts [0]   keys [-s, -P, operands]
+                             valuestarts [0, 0, 1]   values [8080, url]
+
+Counts are computed over whole columns with NumPy when it is installed, and with Counter otherwise.
+The rows added so far can be spilled to a file and memory-mapped back, so the store can grow larger
+than memory, and a store can be saved and loaded again without copying its columns.
+
+Example:
+    >>> store = CommandStore()
+    >>> store.extend(['curl --retry 3 url', 'curl --retry 5 url', 'wget --retry 3 url'])
+    []
+    >>> store.values('--retry').most_common()
+    [('3', 2), ('5', 1)]
+"""
+import array
+import collections
+import itertools
+import mmap
+import os
+import struct
+import sys
+
+from parser import bashparse
+from splitter import bashsplit
+from utils import varint
+
+
+# Columns are written in native byte order, which is recorded so a file from another platform is rejected.
+_MAGIC = b'BMCS1' + (b'<' if sys.byteorder == 'little' else b'>') + b'\n'
+# The columns of a segment, in file order, and the array type codes they are stored with.
+_COLUMNS = (('utilities', 'i'), ('rowstarts', 'q'), ('keys', 'i'), ('valuestarts', 'q'), ('values', 'i'))
+# The number of items in each column of a segment.
+_SEGMENT_HEADER = struct.Struct('<5Q')
+# The key of rows that hold an operand. It is always the first string of the table.
+_OPERANDS = 0
+
+
+class CommandStore:
+    """A columnar store of parsed Bash commands that counts utilities, options and option-arguments.
+
+    Keyword Arguments:
+        directory {str} -- The directory spilled segments are written to. A temporary directory is used if None. (default: {None})
+        spillrows {int} -- Spills the rows in memory once there are this many. Never spills on its own if None. (default: {None})
+    """
+    def __init__(self, directory=None, spillrows=None):
+        self._strings = []
+        self._codes = {}
+        self._code('operands')
+        self._directory = directory
+        self._tempdirectory = None
+        self._spillrows = spillrows
+        # Spilled and loaded segments, as column dictionaries of memoryviews, and the files that back them.
+        self._segments = []
+        self._maps = []
+        self._spillpaths = []
+        self._active = _new_segment()
+
+    def add(self, cmd, limitoverrides=None, strict=True, profiles=None):
+        """Parses a Bash command into the store.
+
+        Arguments:
+            cmd {string} -- The Bash command.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+        Raises:
+            ValueError: The command is empty or can't be parsed.
+        """
+        args = bashsplit.split(cmd, strict=strict, profiles=profiles, limitoverrides=limitoverrides)
+        if not args:
+            raise ValueError('Command is empty.')
+        limits, required = bashparse.resolve(args[0], limitoverrides if limitoverrides is not None else {}, profiles)
+        self._append(args, limits, required)
+
+    def extend(self, cmds, limitoverrides=None, strict=True, profiles=None):
+        """Parses many Bash commands into the store, skipping the ones that can't be parsed.
+
+        Arguments:
+            cmds {iterable of strings} -- The Bash commands.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+            strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+            profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+        Returns:
+            [list of ints] -- The positions of the commands that couldn't be parsed.
+        """
+        skipped = []
+        for index, cmd in enumerate(cmds):
+            try:
+                self.add(cmd, limitoverrides, strict, profiles)
+            except ValueError:
+                skipped.append(index)
+        return skipped
+
+    def addbashmap(self, bashmap):
+        """Adds an argument dictionary that has already been parsed, such as one from `BashMap.fromhistory`.
+
+        Arguments:
+            bashmap {dict} -- The argument dictionary. Can also be a FrozenBashMap.
+        """
+        code = self._code
+        columns = self._active
+        keys, valuestarts, values = columns['keys'], columns['valuestarts'], columns['values']
+        columns['utilities'].append(code(bashmap['utility'][0][0]))
+        columns['rowstarts'].append(len(keys))
+        for key, groups in bashmap.items():
+            if key == 'utility':
+                continue
+            keycode = code(key)
+            for group in groups:
+                keys.append(keycode)
+                valuestarts.append(len(values))
+                values.extend(code(value) for value in group)
+        self._check_spill()
+
+    def addresults(self, results):
+        """Adds the argument dictionaries from a batch, such as the results of `BashMap.fromcmds`. Commands that
+        couldn't be parsed are skipped.
+
+        Arguments:
+            results {iterable of BatchResults} -- The batch results.
+        """
+        for result in results:
+            if result.error is None:
+                self.addbashmap(result.bashmap)
+
+    def utilities(self):
+        """Counts the commands of each utility.
+
+        Returns:
+            Counter -- The number of commands keyed by utility.
+        """
+        np = _try_import_numpy()
+        if np is None:
+            counts = collections.Counter()
+            for columns in self._columns():
+                counts.update(columns['utilities'])
+            return self._decode(counts)
+        total = np.zeros(len(self._strings), dtype=np.int64)
+        for columns in self._columns():
+            total += np.bincount(_array(np, columns, 'utilities'), minlength=len(total))
+        return self._decode_array(np, total)
+
+    def options(self, utility=None):
+        """Counts how often each option occurs.
+
+        Keyword Arguments:
+            utility {str} -- Only counts the options of this utility's commands. (default: {None})
+
+        Returns:
+            Counter -- The number of occurrences keyed by option.
+        """
+        utilitycode = self._codes.get(utility)
+        if utility is not None and utilitycode is None:
+            return collections.Counter()
+        np = _try_import_numpy()
+        if np is None:
+            counts = collections.Counter()
+            for columns in self._columns():
+                if utilitycode is None:
+                    counts.update(columns['keys'])
+                    continue
+                keys = columns['keys']
+                for code, (start, end) in zip(columns['utilities'], _ranges(columns['rowstarts'], len(keys))):
+                    if code == utilitycode:
+                        counts.update(keys[start:end])
+            del counts[_OPERANDS]
+            return self._decode(counts)
+        total = np.zeros(len(self._strings), dtype=np.int64)
+        for columns in self._columns():
+            keys = _array(np, columns, 'keys')
+            if utilitycode is not None:
+                keys = keys[_row_utilities(np, columns) == utilitycode]
+            total += np.bincount(keys, minlength=len(total))
+        total[_OPERANDS] = 0
+        return self._decode_array(np, total)
+
+    def optionsbyutility(self):
+        """Counts how often each option occurs in the commands of each utility. The top options of a utility are
+        `optionsbyutility()[utility].most_common(k)`.
+
+        Returns:
+            dict -- The Counter of option occurrences keyed by utility.
+        """
+        grouped = {}
+        strings = self._strings
+        np = _try_import_numpy()
+        if np is None:
+            for columns in self._columns():
+                keys = columns['keys']
+                for code, (start, end) in zip(columns['utilities'], _ranges(columns['rowstarts'], len(keys))):
+                    if start < end:
+                        grouped.setdefault(code, collections.Counter()).update(keys[start:end])
+            result = {}
+            for code, counts in grouped.items():
+                del counts[_OPERANDS]
+                if counts:
+                    result[strings[code]] = self._decode(counts)
+            return result
+        # Each row's utility and option are combined into one integer, so a single unique call groups them both.
+        width = len(strings)
+        for columns in self._columns():
+            keys = _array(np, columns, 'keys')
+            pairs = _row_utilities(np, columns).astype(np.int64) * width + keys
+            pairs, counts = np.unique(pairs[keys != _OPERANDS], return_counts=True)
+            for pair, count in zip(pairs.tolist(), counts.tolist()):
+                utilitycounts = grouped.setdefault(strings[pair // width], collections.Counter())
+                utilitycounts[strings[pair % width]] += count
+        return grouped
+
+    def values(self, option, utility=None):
+        """Counts the option-arguments given to an option, such as the values of `--retry`. The operands are counted
+        with the option 'operands'.
+
+        Arguments:
+            option {str} -- The option.
+
+        Keyword Arguments:
+            utility {str} -- Only counts the option-arguments in this utility's commands. (default: {None})
+
+        Returns:
+            Counter -- The number of occurrences keyed by option-argument.
+        """
+        optioncode = self._codes.get(option)
+        utilitycode = self._codes.get(utility)
+        if optioncode is None or (utility is not None and utilitycode is None):
+            return collections.Counter()
+        np = _try_import_numpy()
+        if np is None:
+            counts = collections.Counter()
+            for columns in self._columns():
+                keys, values = columns['keys'], columns['values']
+                rows = range(len(keys))
+                if utilitycode is not None:
+                    rows = itertools.chain.from_iterable(
+                        range(start, end) for code, (start, end)
+                        in zip(columns['utilities'], _ranges(columns['rowstarts'], len(keys))) if code == utilitycode)
+                valuestarts = columns['valuestarts']
+                for row in rows:
+                    if keys[row] == optioncode:
+                        end = valuestarts[row + 1] if row + 1 < len(keys) else len(values)
+                        counts.update(values[valuestarts[row]:end])
+            return self._decode(counts)
+        total = np.zeros(len(self._strings), dtype=np.int64)
+        for columns in self._columns():
+            values = _array(np, columns, 'values')
+            lengths = _lengths(np, columns, 'valuestarts', len(values))
+            selected = np.repeat(_array(np, columns, 'keys') == optioncode, lengths)
+            if utilitycode is not None:
+                selected &= np.repeat(_row_utilities(np, columns) == utilitycode, lengths)
+            total += np.bincount(values[selected], minlength=len(total))
+        return self._decode_array(np, total)
+
+    def spill(self):
+        """Writes the rows held in memory to a segment file and memory-maps it back, so they no longer take up memory.
+        """
+        if not len(self._active['utilities']):
+            return
+        import tempfile
+        directory = self._directory
+        if directory is None:
+            if self._tempdirectory is None:
+                self._tempdirectory = tempfile.mkdtemp(prefix='bashmap-store-')
+            directory = self._tempdirectory
+        # A unique name, so stores spilling to the same directory never overwrite each other's segments
+        fd, path = tempfile.mkstemp(suffix='.bmcs', prefix='segment-', dir=directory)
+        with os.fdopen(fd, 'wb') as fh:
+            _write_segment(fh, self._active)
+        self._spillpaths.append(path)
+        self._segments.append(_read_segment(self._map(path), 0)[0])
+        self._active = _new_segment()
+
+    def save(self, path):
+        """Writes the store to a file: the string table followed by the columns of every segment.
+
+        Arguments:
+            path {str} -- The path of the file.
+        """
+        segments = [columns for columns in self._columns() if len(columns['utilities'])]
+        buffer = bytearray(_MAGIC)
+        varint.write(buffer, len(self._strings))
+        for string in self._strings:
+            varint.write_str(buffer, string)
+        varint.write(buffer, len(segments))
+        buffer += bytes(-len(buffer) % 8)
+        with open(path, 'wb') as fh:
+            fh.write(buffer)
+            for columns in segments:
+                _write_segment(fh, columns)
+
+    @classmethod
+    def load(cls, path, directory=None, spillrows=None):
+        """Opens a store written by `save`. The columns are memory-mapped rather than read, and new commands can be
+        added to the store.
+
+        Arguments:
+            path {str} -- The path of the file.
+
+        Keyword Arguments:
+            directory {str} -- The directory spilled segments are written to. A temporary directory is used if None. (default: {None})
+            spillrows {int} -- Spills the rows in memory once there are this many. Never spills on its own if None. (default: {None})
+
+        Raises:
+            ValueError: The file isn't a command store, was written on a platform of another byte order, or is truncated.
+
+        Returns:
+            CommandStore -- The store.
+        """
+        store = cls(directory, spillrows)
+        data = store._map(path)
+        if bytes(data[:len(_MAGIC) - 2]) != _MAGIC[:-2]:
+            store.close()
+            raise ValueError('{} is not a command store.'.format(path))
+        if bytes(data[:len(_MAGIC)]) != _MAGIC:
+            store.close()
+            raise ValueError('{} was written on a platform of another byte order.'.format(path))
+        try:
+            strings, store._segments = _read_store(data)
+        except (ValueError, struct.error):
+            strings = None
+        # Closed outside the except block, once the traceback no longer holds views into the file.
+        if strings is None:
+            store.close()
+            raise ValueError('{} is truncated.'.format(path))
+        store._strings = strings
+        store._codes = {string: code for code, string in enumerate(strings)}
+        return store
+
+    def close(self):
+        """Unmaps the spilled and loaded segments and removes the files the store spilled.
+        """
+        self._segments = []
+        for data, mapped in self._maps:
+            data.release()
+            mapped.close()
+        self._maps = []
+        for path in self._spillpaths:
+            os.unlink(path)
+        self._spillpaths = []
+        if self._tempdirectory is not None:
+            os.rmdir(self._tempdirectory)
+            self._tempdirectory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return sum(len(columns['utilities']) for columns in self._columns())
+
+    def _append(self, args, limits, required):
+        """Appends the rows of a split command, classifying each argument with `bashparse.step`.
+        """
+        codes = self._codes
+        columns = self._active
+        keys, valuestarts, values = columns['keys'], columns['valuestarts'], columns['values']
+        columns['utilities'].append(self._code(args[0]))
+        columns['rowstarts'].append(len(keys))
+        step = bashparse.step
+        state = bashparse.INITIAL_STATE
+        for index in range(1, len(args)):
+            arg = args[index]
+            code = codes.get(arg)
+            if code is None:
+                code = self._code(arg)
+            kind, _, state = step(arg, state, limits, required)
+            if kind == 'optarg':
+                values.append(code)
+            elif kind == 'option':
+                keys.append(code)
+                valuestarts.append(len(values))
+            else:
+                keys.append(_OPERANDS)
+                valuestarts.append(len(values))
+                values.append(code)
+        self._check_spill()
+
+    def _check_spill(self):
+        """Spills the rows held in memory once there are spillrows of them.
+        """
+        if self._spillrows is not None and len(self._active['keys']) >= self._spillrows:
+            self.spill()
+
+    def _code(self, string):
+        """Looks up the code of a string, adding the string to the table if it is new.
+        """
+        code = self._codes.get(string)
+        if code is None:
+            code = self._codes[string] = len(self._strings)
+            self._strings.append(string)
+        return code
+
+    def _columns(self):
+        """Returns the column dictionaries of every segment, ending with the one held in memory.
+        """
+        return self._segments + [self._active]
+
+    def _map(self, path):
+        """Memory-maps a file for as long as the store is open.
+        """
+        with open(path, 'rb') as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(mapped)
+        self._maps.append((data, mapped))
+        return data
+
+    def _decode(self, counts):
+        """Turns a Counter keyed by code into a Counter keyed by string.
+        """
+        strings = self._strings
+        return collections.Counter({strings[code]: count for code, count in counts.items() if count})
+
+    def _decode_array(self, np, total):
+        """Turns an array of counts indexed by code into a Counter keyed by string.
+        """
+        strings = self._strings
+        codes = np.flatnonzero(total)
+        return collections.Counter(dict(zip((strings[code] for code in codes.tolist()), total[codes].tolist())))
+
+
+def _new_segment():
+    """Creates the empty columns of a segment held in memory.
+    """
+    return {name: array.array(typecode) for name, typecode in _COLUMNS}
+
+
+def _read_store(data):
+    """Reads the string table and the segments of a saved store.
+
+    Returns:
+        tuple -- The list of strings and the list of column dictionaries.
+    """
+    count, pos = varint.read(data, len(_MAGIC))
+    strings = []
+    for _ in range(count):
+        string, pos = varint.read_str(data, pos)
+        strings.append(string)
+    nsegments, pos = varint.read(data, pos)
+    pos += -pos % 8
+    segments = []
+    for _ in range(nsegments):
+        columns, pos = _read_segment(data, pos)
+        segments.append(columns)
+    return strings, segments
+
+
+def _write_segment(fh, columns):
+    """Writes the columns of a segment, each padded to a multiple of eight bytes so the next one stays aligned.
+    """
+    fh.write(_SEGMENT_HEADER.pack(*(len(columns[name]) for name, _ in _COLUMNS)))
+    for name, _ in _COLUMNS:
+        data = memoryview(columns[name]).cast('B')
+        fh.write(data)
+        fh.write(bytes(-len(data) % 8))
+
+
+def _read_segment(data, pos):
+    """Reads the columns of a segment as memoryviews into data, without copying them.
+
+    Returns:
+        tuple -- The column dictionary and the offset following the segment.
+    """
+    counts = _SEGMENT_HEADER.unpack_from(data, pos)
+    pos += _SEGMENT_HEADER.size
+    columns = {}
+    for (name, typecode), count in zip(_COLUMNS, counts):
+        size = count * array.array(typecode).itemsize
+        if pos + size > len(data):
+            raise ValueError('Truncated column at offset {}.'.format(pos))
+        columns[name] = data[pos:pos + size].cast(typecode)
+        pos += size + -size % 8
+    return columns, pos
+
+
+def _ranges(starts, total):
+    """Pairs each start offset with the start of the next item, or total for the last one.
+    """
+    return zip(starts, itertools.chain(starts[1:], (total,)))
+
+
+def _array(np, columns, name):
+    """Views a column as a NumPy array without copying it.
+    """
+    return np.frombuffer(columns[name], dtype=dict(_COLUMNS)[name])
+
+
+def _lengths(np, columns, name, total):
+    """Computes the number of items each start offset of a column covers.
+    """
+    return np.diff(_array(np, columns, name), append=total)
+
+
+def _row_utilities(np, columns):
+    """Computes the utility of each row of a segment.
+    """
+    return np.repeat(_array(np, columns, 'utilities'), _lengths(np, columns, 'rowstarts', len(columns['keys'])))
+
+
+def _try_import_numpy():
+    """Imports NumPy on first use.
+
+    Returns:
+        module -- NumPy, or None if it isn't installed, in which case the counts are computed with Counter.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
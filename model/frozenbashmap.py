@@ -0,0 +1,175 @@
+"""FrozenBashMap - An immutable, hashable and compact argument dictionary.
+"""
+import sys
+from collections.abc import Mapping
+
+
+class FrozenBashMap(Mapping):
+    """An immutable, hashable argument dictionary for keeping large numbers of parsed commands in memory.
+
+    Keys and values are interned, so options such as `-n` are stored once no matter how many commands
+    use them. Argument groups are kept as tuples inside tuples and there is no per-instance `__dict__`.
+    Two FrozenBashMaps are equal when they hold the same keys and values, regardless of key order, so
+    duplicate commands collapse in a set.
+
+    Example:
+        >>> frozen = BashMap.fromcmd('kubectl get pods -n prod').freeze()
+        >>> frozen['-n']
+        (('prod',),)
+        >>> frozen == BashMap.fromcmd('kubectl -n prod get pods').freeze()
+        True
+    """
+    __slots__ = ('_keys', '_values', '_hash')
+
+    def __init__(self, argdict=()):
+        items = argdict.items() if isinstance(argdict, Mapping) else argdict
+        keys = []
+        values = []
+        for key, groups in items:
+            keys.append(sys.intern(key))
+            values.append(tuple(tuple(sys.intern(value) for value in group) for group in groups))
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+        self._hash = None
+
+    @classmethod
+    def frombashmap(cls, bashmap):
+        """Freezes an argument dictionary.
+
+        Arguments:
+            bashmap {dict} -- The argument dictionary.
+
+        Returns:
+            FrozenBashMap -- The frozen argument dictionary.
+        """
+        return cls(bashmap)
+
+    def todict(self):
+        """Thaws the argument dictionary into a plain, mutable dictionary.
+
+        Returns:
+            dict -- The argument dictionary, with a list of argument groups for each key.
+        """
+        return {key: list(groups) for key, groups in zip(self._keys, self._values)}
+
+    @property
+    def utility(self):
+        """A property that returns the utility as a tuple within a tuple.
+
+        Returns:
+            Tuple tuple -- A tuple with a single tuple containing the utility name.
+        """
+        return self['utility']
+
+    @property
+    def simpleutility(self):
+        """A property that returns the utility as a string.
+
+        Returns:
+            str -- The utility name.
+        """
+        return self.utility[0][0]
+
+    @property
+    def operands(self):
+        """A property that returns the operands in a tuple of tuples.
+
+        Returns:
+            Tuple tuple -- A tuple of tuples containing the operands.
+        """
+        return self['operands']
+
+    @property
+    def simpleoperands(self):
+        """A property that returns the operands as a tuple of strings.
+
+        Returns:
+            str tuple -- The operands.
+        """
+        return tuple(operand for operandtuple in self.operands for operand in operandtuple)
+
+    @property
+    def simpleoptions(self):
+        """A property that returns the options as a tuple of strings.
+
+        Returns:
+            str tuple -- The options.
+        """
+        return tuple(key for key in self._keys if key[:1] == '-')
+
+    @property
+    def allsimpleoptionargs(self):
+        """A property that returns all of the option-arguments in the dictionary as a tuple of strings.
+
+        Returns:
+            str tuple -- Every option-argument in the dictionary.
+        """
+        return self.simpleoptionargs(*self.simpleoptions)
+
+    def simpleoptionargs(self, *options):
+        """Loads the option-arguments for the option(s) as a tuple of strings.
+
+        Arguments:
+            option {str} -- The option's name.
+
+        Returns:
+            str tuple -- The option-arguments for the option(s). Empty tuple if option(s) DNE or option(s) have no option-arguments.
+        """
+        return tuple(optionarg for optionarg_tuple in self.vals(*options) for optionarg in optionarg_tuple)
+
+    def vals(self, *keys):
+        """Returns the values for the key(s) if they exist. Otherwise returns an empty tuple.
+
+        Arguments:
+            option {str} -- The option name.
+
+        Returns:
+            Tuple tuple -- The values for the key(s). Empty tuple if the key(s) DNE or doesn't have value.
+        """
+        arg_groups = ()
+        for key in keys:
+            if key in self._keys:
+                arg_groups += self._values[self._keys.index(key)]
+        return arg_groups
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenBashMap):
+            return NotImplemented
+        if self is other:
+            return True
+        if len(self._keys) != len(other._keys) or hash(self) != hash(other):
+            return False
+        if self._keys == other._keys:
+            return self._values == other._values
+        return set(zip(self._keys, self._values)) == set(zip(other._keys, other._values))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(zip(self._keys, self._values)))
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuilds through __init__ so the keys and values are interned again in the receiving process.
+        return (type(self), (tuple(zip(self._keys, self._values)),))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(zip(self._keys, self._values)))
@@ -0,0 +1,16 @@
+"""HistoryEntry - One command read from a shell history file.
+"""
+from collections import namedtuple
+
+
+HistoryEntry = namedtuple('HistoryEntry', ['offset', 'timestamp', 'duration', 'command', 'bashmap', 'error'])
+HistoryEntry.__doc__ = """One command read from a shell history file.
+
+Attributes:
+    offset {int} -- The byte offset in the file where the entry starts, including its timestamp line if it has one.
+    timestamp {int} -- The Unix time the command was run at, or None if the history has no timestamp for it.
+    duration {int} -- The number of seconds the command ran for, as recorded by zsh, or None.
+    command {str} -- The command.
+    bashmap {BashMap} -- The argument dictionary, or None if the command couldn't be parsed.
+    error {ValueError} -- The error raised while parsing the command, or None if it was parsed.
+"""
@@ -1,203 +1,300 @@
-"""bashparse - Parses an ArgumentDoublyLinkedList of Bash command arguments and returns the result as an argument dictionary.
+"""bashparse - Parses an ArgumentArray of Bash command arguments and returns the result as an argument dictionary.
 
-This module allows for parsing an ArgumentLinkedList of Bash command arguments. The parsed arguments are then stored and
+This module allows for parsing an ArgumentArray of Bash command arguments. The parsed arguments are then stored and
 returned in an argument dictionary.
 """
 # TODO: This file is finished.
 
-def parse(linkedlist, limitoverrides):
-    """Parses a linked list of Bash arguments and returns the argument dictionary.
-    
+def parse(argarray, limitoverrides, profiles=None):
+    """Parses an array of Bash arguments and returns the argument dictionary.
+
     Arguments:
-        linkedlist {ArgumentDoublyLinkedList} -- The linked list of ArgumentNodes representing the Bash command.
+        argarray {ArgumentArray} -- The array of arguments representing the Bash command.
         limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
-    
+
+    Keyword Arguments:
+        profiles {LimitProfiles} -- The registry to look up the utility's limits override dictionary in. (default: {None})
+
+    Raises:
+        ValueError: The array has no arguments.
+
     Returns:
         dict -- The argument dictionary.
     """
+    args = argarray.values
+    if not args:
+        raise ValueError('Command is empty.')
     argdict = dict()
     # Stores first argument as the utility
-    _store_utility(linkedlist.head, argdict)
+    _store_utility(args[0], argdict)
+    # Combines the utility's profile with the limits override dictionary
+    limitoverrides, required = resolve(args[0], limitoverrides, profiles)
     # Begins parsing arguments
-    _parse_arguments(linkedlist.head.next, argdict, limitoverrides)
+    _parse_arguments(args, 1, argdict, limitoverrides, required)
     return argdict
 
 
-def _parse_arguments(argnode, argdict, limitoverrides):
-    """Parses an ArgumentNode and stores it in the argument dictionary as either an option, option-argument, or operand.
-    
+def locate(argarray, spans, limitoverrides, profiles=None):
+    """Arranges the source offsets of a command's arguments like the argument dictionary `parse` returns for them.
+    Each option's group of offsets starts with the offsets of the option itself, followed by those of its
+    option-arguments.
+
+    Example:
+        >>> args, spans = bashsplit.split_spans('curl -P 8080 url')
+        >>> locate(ArgumentArray(args), spans, {})
+        {'utility': [((0, 4),)], '-P': [((5, 7), (8, 12))], 'operands': [((13, 16),)]}
+
+    Arguments:
+        argarray {ArgumentArray} -- The array of arguments representing the Bash command.
+        spans {list of tuples} -- The (start, end) offsets of each argument, as returned by `bashsplit.split_spans`.
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+
+    Keyword Arguments:
+        profiles {LimitProfiles} -- The registry to look up the utility's limits override dictionary in. (default: {None})
+
+    Raises:
+        ValueError: The array has no arguments.
+
+    Returns:
+        dict -- The groups of offsets keyed like the argument dictionary.
+    """
+    args = argarray.values
+    if not args:
+        raise ValueError('Command is empty.')
+    limitoverrides, required = resolve(args[0], limitoverrides, profiles)
+    spandict = {'utility': [(spans[0],)]}
+    state = INITIAL_STATE
+    # The groups of the latest option and the offsets its group has gathered so far, stored as a tuple once it ends
+    groups = group = None
+    for index in range(1, len(args)):
+        kind, key, state = step(args[index], state, limitoverrides, required)
+        if kind == 'optarg':
+            group.append(spans[index])
+            continue
+        if group is not None:
+            groups[-1] = tuple(group)
+            group = None
+        if kind == 'option':
+            groups = spandict.setdefault(key, [])
+            groups.append(None)
+            group = [spans[index]]
+        else:
+            spandict.setdefault(key, []).append((spans[index],))
+    if group is not None:
+        groups[-1] = tuple(group)
+    return spandict
+
+
+def resolve(utility, limitoverrides, profiles):
+    """Looks up the limits and the options that require their option-arguments for a utility's command.
+
+    Arguments:
+        utility {str} -- The utility.
+        limitoverrides {dict} -- The limits override dictionary given by the caller.
+        profiles {LimitProfiles} -- The registry to look up the utility's profile and option spec in, or None.
+
+    Returns:
+        tuple -- The limits to parse the command with, and the options whose option-arguments are taken as they are.
+    """
+    if profiles is None:
+        return limitoverrides, _NO_REQUIRED
+    return profiles.resolve(utility, limitoverrides), profiles.options(utility, limitoverrides)[1]
+
+
+# No option is declared by an option spec to require its option-arguments.
+_NO_REQUIRED = frozenset()
+
+
+# The parser state before the first argument following the utility: no option is waiting for option-arguments.
+INITIAL_STATE = (None, 0)
+
+
+def step(arg, state, limitoverrides, required=_NO_REQUIRED):
+    """Classifies one argument following the utility, given the parser state left by the argument before it. Lets
+    callers drive the parser one argument at a time and resume it from any saved state.
+
+    Arguments:
+        arg {str} -- The argument.
+        state {tuple} -- The parser state after the previous argument, starting with INITIAL_STATE.
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
+
+    Keyword Arguments:
+        required {frozenset} -- The options that receive their option-arguments even if they start with a dash. (default: {frozenset()})
+
+    Returns:
+        tuple -- The kind of the argument ('option', 'optarg' or 'operand'), the key it is stored under, and the new parser state.
+    """
+    option, n = state
+    if option in required and _is_finite(n) and n > 0:
+        return 'optarg', option, (option, n - 1)
+    if _is_option(arg):
+        return 'option', arg, (arg, limitoverrides.get(arg, 1))
+    if option is not None and (not _is_finite(n) or n > 0):
+        return 'optarg', option, (option, n - 1 if _is_finite(n) else n)
+    return 'operand', 'operands', INITIAL_STATE
+
+
+def _parse_arguments(args, index, argdict, limitoverrides, required=_NO_REQUIRED):
+    """Parses every argument from index onwards and stores each one in the argument dictionary as either an option,
+    option-argument, or operand. The arguments are walked in a loop, so the stack depth stays constant regardless of how
+    many arguments the command has.
+
     Arguments:
-        argnode {ArgumentNode} -- An argument from the Bash command.
+        args {tuple of strings} -- The arguments from the Bash command.
+        index {int} -- The index of the first argument to parse.
         argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
         limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive.
-    """    
-    if argnode is None:
-        return
-    # If argument is an option
-    if _is_option(argnode):
-        # Store the option
-        _store_option(argnode, argdict)
-        # If the option has potential option-arguments, parse them
-        if _has_next(argnode):
-            argnode = _parse_optionarguments(argnode, argnode.next, argdict, limitoverrides.get(argnode.value, 1))
+
+    Keyword Arguments:
+        required {frozenset} -- The options that receive their option-arguments even if they start with a dash. (default: {frozenset()})
+    """
+    end = len(args)
+    while index < end:
+        arg = args[index]
+        # If argument is an option
+        if _is_option(arg):
+            # Store the option
+            _store_option(arg, argdict)
+            # Parse the option's potential option-arguments and move onto the first argument they didn't consume
+            index = _parse_optionarguments(arg, args, index + 1, argdict, limitoverrides.get(arg, 1), arg in required)
+        # Othwerwise, argument is an operand
         else:
-            return argnode
-    # Othwerwise, argument is an operand
-    else:
-        _store_operand(argnode, argdict)
+            _store_operand(arg, argdict)
+            # Move onto next argument
+            index += 1
 
-    # Move onto next argument
-    _parse_arguments(argnode.next, argdict, limitoverrides)
 
+def _parse_optionarguments(option, args, index, argdict, n, required=False):
+    """Parses and stores for the option up to n option-arguments, starting with the argument at index. The
+    option-arguments are found first and then stored as a single group, so a group of any size is built in linear time.
 
-def _parse_optionarguments(option_node, argnode, argdict, n):
-    """Parses and stores for the option up to (n-1) argument nodes that follow the current argument node.
-    
     Arguments:
-        option_node {ArgumentNode} -- The option node.
-        argnode {ArgumentNode} -- The argument node.
+        option {str} -- The option.
+        args {tuple of strings} -- The arguments from the Bash command.
+        index {int} -- The index of the argument following the option.
         argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
-        n {int} -- The number of argument nodes to check, including the current argument node.
+        n {int} -- The maximum number of option-arguments the option can receive, or None if the limit is infinite.
+
+    Keyword Arguments:
+        required {bool} -- The option receives its n option-arguments even if they start with a dash. (default: {False})
 
     Returns:
-        ArgumentNode -- The last node that was parsed.
+        int -- The index of the first argument that wasn't consumed as an option-argument.
     """
-    # If the argument following the option is an option-argument  
-    if _is_optionargument(argnode):
-        # Store it in the option-argument group
-        _upsert_optionargument_group(option_node, argnode, -1, argdict)
-        # If n is finite
+    end = len(args)
+    start = index
+    # An option spec declares exactly how many option-arguments the option takes, so they aren't inspected
+    if required and _is_finite(n):
+        index = min(end, start + n)
+        if index > start:
+            _store_optionarguments(option, args[start:index], argdict)
+        return index
+    # While the argument following the option is an option-argument
+    while index < end and _is_optionargument(args[index]):
+        # If n is finite, stop once the option has received its limit
         if _is_finite(n):
-            n -= 1
             if n <= 0:
-                return argnode
-    else:
-        return argnode.prev
-    return _parse_optionarguments(option_node, argnode.next, argdict, n)
+                break
+            n -= 1
+        index += 1
+    # Store the option-arguments as the option's group
+    if index > start:
+        _store_optionarguments(option, args[start:index], argdict)
+    return index
 
 
-def _store_operand(operand_node, argdict):
-    """Stores operand in argument dictionary.    
-    
+def _store_operand(operand, argdict):
+    """Stores operand in argument dictionary.
+
     Arguments:
-        operand_node {ArgumentNode} -- The operand node.
+        operand {str} -- The operand.
         argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
-    """    
+    """
     # If an operand exists, append operand
     if 'operands' in argdict:
-        argdict['operands'].append(_init_optionargument_group(operand_node.value))
+        argdict['operands'].append(_init_optionargument_group(operand))
     # Otherwise, create new operand key value pair
     else:
-        argdict['operands'] = [_init_optionargument_group(operand_node.value)]
+        argdict['operands'] = [_init_optionargument_group(operand)]
 
 
-def _store_utility(utility_node, argdict):
+def _store_utility(utility, argdict):
     """Stores utility in argument dictionary.
-    
+
     Arguments:
-        utility_node {[type]} -- [description]
-        argdict {[type]} -- [description]
-    """    
-    argdict['utility'] = [_init_optionargument_group(utility_node.value)]
+        utility {str} -- The utility.
+        argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
+    """
+    argdict['utility'] = [_init_optionargument_group(utility)]
 
 
-def _store_option(option_node, argdict):
+def _store_option(option, argdict):
     """Stores option in argument dictionary.
-    
+
     Arguments:
-        option_node {ArgumentNode} -- The option node.
+        option {str} -- The option.
         argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
-    """    
-    argdict.setdefault(option_node.value, []).append(_init_optionargument_group())
+    """
+    argdict.setdefault(option, []).append(_init_optionargument_group())
+
 
+def _store_optionarguments(option, optionargs, argdict):
+    """Stores the option-arguments as the group of the option's latest occurrence.
 
-def _upsert_optionargument_group(option_node, optionarg, index, argdict):
-    """Updates or inserts the option-argument group at the given index in the list.
-    
     Arguments:
-        option_node {ArgumentNode} -- The option node.
-        optionarg {ArgumentNode} -- The option-argument node to create the group from or to add to the option-argument group.
-        index {int} -- The index of the new or already existing option-argument group in the list.
+        option {str} -- The option, which must already be stored.
+        optionargs {sequence of strings} -- The option-arguments, in order.
         argdict {dict} -- The argument dictionary containing the mapping for the Bash command.
-
-    """    
-    if option_node.value not in argdict:
-        argdict[option_node.value] = [_init_optionargument_group(optionarg.value)]
-    else:
-        argdict[option_node.value][index] = _append_optionargument_group(argdict[option_node.value][index], optionarg.value)
+    """
+    argdict[option][-1] = tuple(optionargs)
 
 
 def _init_optionargument_group(value=None):
     """Initializes an empty or valued option-argument group.
-    
+
     Keyword Arguments:
         value {string} -- The value to insert into the option-argument group (default: {None})
-    
+
     Returns:
         tuple -- The option-argument group.
-    """    
+    """
     if value is None:
         return ()
     else:
         return (value,)
 
 
-def _append_optionargument_group(group, value):
-    """Appends the value to the option-argument group.
-    
-    Arguments:
-        group {tuple} -- The option-argument group to append to.
-        value {string} -- The value to append to the option-argument group.
-    
-    Returns:
-        tuple -- The new option-argument group.
-    """    
-    return (*group, value)
-
+def _is_option(arg):
+    """Checks whether the argument is an option.
 
-def _is_option(argnode):
-    """Checks whether the ArgumentNode is an option.
-    
     Arguments:
-        argnode {ArgumentNode} -- The argument node to check.
-    
+        arg {str} -- The argument to check.
+
     Returns:
-        bool -- True if ArgumentNode is an option, False otherwise
-    """    
-    return argnode.value[0] == '-'
+        bool -- True if the argument is an option, False otherwise
+    """
+    return arg.startswith('-')
+
 
+def _is_optionargument(arg):
+    """Checks whether the argument is an option-argument.
 
-def _is_optionargument(argnode):
-    """Checks whether the ArgumentNode is an option-argument.
-    
     Arguments:
-        argnode {ArgumentNode} -- The argument node to check.
-    
+        arg {str} -- The argument to check.
+
     Returns:
-        bool -- True if ArgumentNode is an option-argument, False otherwise
-    """    
-    return argnode.value[0] != '-'
+        bool -- True if the argument is an option-argument, False otherwise
+    """
+    return not arg.startswith('-')
 
 
 def _is_finite(limit):
     """Checks whether the limit is finite.
-    
+
     Arguments:
         limit {int} -- The option-argument limit.
-    
+
     Returns:
         bool -- True if limit is finite, False otherwise (infinite).
-    """    
+    """
     return limit is not None
-
-
-def _has_next(option_node):
-    """Checks whether the ArgumentNode has a following ArgumentNode.
-    
-    Arguments:
-        option_node {ArgumentNode} -- The ArgumentNode to check for a following ArgumentNode.
-    
-    Returns:
-        bool -- True if ArgumentNode has a following ArgumentNode, False otherwise.
-    """    
-    return option_node.next is not None
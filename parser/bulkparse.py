@@ -0,0 +1,133 @@
+"""bulkparse - Parses a corpus of already tokenized Bash commands in bulk with NumPy.
+
+The commands are given as one flat sequence of tokens plus the offsets where each command starts,
+the same layout as the index pointer of a sparse matrix:
+
+    tokens  = ['curl', '-s', 'www.github.com', 'ls', '-l']
+    offsets = [0, 3, 5]
+
+Whether a token is an option depends only on its first character, and, while every option is
+limited to one option-argument, whether a token is an option-argument depends only on whether
+the token before it is an option. Both are worked out for the whole corpus at once with array
+operations, and the argument dictionaries are only built at the end. Commands that involve a
+limit other than 1 are handed to `bashparse.parse`, so the output is always identical to it.
+
+NumPy is an optional dependency and is only imported when a corpus is parsed.
+
+Example:
+    >>> parse(['curl', '-s', 'www.github.com', 'ls', '-l'], [0, 3, 5])
+    [{'utility': [('curl',)], '-s': [('www.github.com',)]}, {'utility': [('ls',)], '-l': [()]}]
+"""
+from model.argumentarray import ArgumentArray
+from parser import bashparse
+
+
+def parse(tokens, offsets, limitoverrides=None, profiles=None):
+    """Parses every command of a tokenized corpus into an argument dictionary.
+
+    Arguments:
+        tokens {sequence of strings} -- The tokens of every command, one command after the other.
+        offsets {sequence of ints} -- The index of each command's first token, followed by the number of tokens.
+
+    Keyword Arguments:
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+    Raises:
+        ImportError: NumPy isn't installed.
+        ValueError: The offsets are malformed or a command is empty.
+
+    Returns:
+        [list of dicts] -- The argument dictionary of each command, in order.
+    """
+    np = _import_numpy()
+    if limitoverrides is None:
+        limitoverrides = {}
+    tokens = tokens if isinstance(tokens, list) else list(tokens)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    ntokens = len(tokens)
+    ncmds = len(offsets) - 1
+    if ncmds < 0 or offsets[0] != 0 or offsets[-1] != ntokens or np.any(np.diff(offsets) < 0):
+        raise ValueError('Offsets must start at 0, never decrease and end at the number of tokens.')
+    if ncmds == 0:
+        return []
+    starts = offsets[:-1]
+    empty = np.flatnonzero(starts == offsets[1:])
+    if len(empty):
+        raise ValueError('Command {} is empty.'.format(empty[0]))
+
+    isutility = np.zeros(ntokens, dtype=bool)
+    isutility[starts] = True
+    isoption = np.array([token[:1] for token in tokens], dtype='U1') == '-'
+    isoption &= ~isutility
+    # With a limit of 1, a token is an option-argument exactly when it follows an option. Utilities
+    # are never options, so the shift can't carry an option over into the next command.
+    follows_option = np.zeros(ntokens, dtype=bool)
+    follows_option[1:] = isoption[:-1]
+    isoptarg = follows_option & ~isoption & ~isutility
+    takes_optarg = np.zeros(ntokens, dtype=bool)
+    takes_optarg[:-1] = isoptarg[1:]
+
+    scalar = _find_scalar_commands(np, tokens, offsets, isoption, limitoverrides, profiles)
+
+    # Every token that isn't an option-argument opens an argument group: the utility's, an option's, or an
+    # operand's. The group holds the token after an option if that is an option-argument, the operand itself, or
+    # nothing. Each group is built with a single list comprehension, so only filing them remains per token.
+    heads = np.flatnonzero(~isoptarg)
+    headoptions = isoption[heads]
+    valuepositions = np.where(headoptions, np.where(takes_optarg[heads], heads + 1, -1), heads).tolist()
+    keys = [tokens[position] if option else 'operands'
+            for position, option in zip(heads.tolist(), headoptions.tolist())]
+    groups = [(tokens[position],) if position >= 0 else () for position in valuepositions]
+    bounds = np.searchsorted(heads, offsets).tolist()
+
+    results = [None] * ncmds
+    for index in range(ncmds):
+        if index in scalar:
+            continue
+        start, end = bounds[index], bounds[index + 1]
+        argdict = results[index] = {'utility': [groups[start]]}
+        for key, group in zip(keys[start + 1:end], groups[start + 1:end]):
+            existing = argdict.get(key)
+            if existing is None:
+                argdict[key] = [group]
+            else:
+                existing.append(group)
+
+    for index in scalar:
+        args = ArgumentArray(tokens[offsets[index]:offsets[index + 1]])
+        results[index] = bashparse.parse(args, limitoverrides, profiles)
+    return results
+
+
+def _find_scalar_commands(np, tokens, offsets, isoption, limitoverrides, profiles):
+    """Finds the commands that can't take the vectorized path, because one of their options has a limit other than 1.
+
+    Returns:
+        set -- The indexes of the commands.
+    """
+    scalar = set()
+    special = {option for option, limit in limitoverrides.items() if limit != 1}
+    if special:
+        positions = np.flatnonzero(isoption)
+        hits = [position for position in positions.tolist() if tokens[position] in special]
+        if hits:
+            scalar.update((np.searchsorted(offsets, hits, side='right') - 1).tolist())
+    if profiles is not None and len(profiles):
+        for index, start in enumerate(offsets[:-1].tolist()):
+            if index not in scalar and profiles.limits(tokens[start]):
+                scalar.add(index)
+    return scalar
+
+
+def _import_numpy():
+    """Imports NumPy on first use.
+
+    Raises:
+        ImportError: NumPy isn't installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('Bulk parsing requires the numpy package.')
+    return numpy
@@ -0,0 +1,205 @@
+"""incrementalparse - Keeps the argument dictionary of a command line up to date as it is edited.
+
+Meant for interactive use, where the command line is re-parsed on every keystroke. Only the words from
+the last one that ends before the edit onwards are tokenized and parsed again; everything before
+them is kept, along with the parser state it left behind. Every word after the edit is read again, so
+typing at the end of the command line is cheap, while an edit near its start costs about a full parse.
+
+Example:
+    >>> parser = IncrementalParser('curl -s')
+    >>> parser.insert(7, 'P 8080 www.github.com')
+    {'utility': [('curl',)], '-s': [()], '-P': [('8080',)], 'operands': [('www.github.com',)]}
+    >>> parser.delete(7, 1)
+    {'utility': [('curl',)], '-s': [('8080',)], 'operands': [('www.github.com',)]}
+"""
+from bisect import bisect_left
+
+from parser import bashparse
+from splitter import bashsplit
+
+
+class IncrementalParser:
+    """Parses a command line and re-parses it incrementally after each edit.
+
+    While the command line is incomplete, such as inside an unclosed quotation, `error` holds the
+    ValueError raised for it and the argument dictionary covers the words before the error.
+
+    An edit re-reads every word from the edit to the end of the command line, so only appends and edits
+    near the end are cheap. An edit near the start of a long command line costs about as much as parsing
+    it from scratch.
+    """
+    def __init__(self, cmd='', limitoverrides=None, strict=True, profiles=None):
+        self._limitoverrides = limitoverrides if limitoverrides is not None else {}
+        self._strict = strict
+        self._profiles = profiles
+        self._limits = self._limitoverrides
+        # The option spec of the utility, if it has one.
+        self._arity = None
+        self._required = bashparse._NO_REQUIRED
+        self._text = ''
+        # Per word: the end offset and the total number of arguments up to and including the word.
+        self._ends = []
+        self._argtotals = []
+        # Per argument: the argument, how it was stored, and the parser state it left behind.
+        self._args = []
+        self._actions = []
+        self._states = []
+        self._argdict = {}
+        # The option whose group is still receiving option-arguments, and the index of its first option-argument.
+        self._open = None
+        self.error = None
+        self.edit(0, 0, cmd)
+
+    @property
+    def text(self):
+        """The current command line.
+        """
+        return self._text
+
+    @property
+    def argdict(self):
+        """The argument dictionary of the current command line. It is updated in place by later edits, so copy it
+        before keeping or mutating it.
+        """
+        return self._argdict
+
+    @property
+    def args(self):
+        """The arguments of the current command line, as `bashsplit.split` would return them.
+        """
+        return list(self._args)
+
+    def insert(self, offset, text):
+        """Inserts text into the command line.
+
+        Arguments:
+            offset {int} -- The offset to insert at.
+            text {str} -- The text to insert.
+
+        Returns:
+            dict -- The updated argument dictionary.
+        """
+        return self.edit(offset, 0, text)
+
+    def delete(self, offset, length):
+        """Deletes text from the command line.
+
+        Arguments:
+            offset {int} -- The offset of the first character to delete.
+            length {int} -- The number of characters to delete.
+
+        Returns:
+            dict -- The updated argument dictionary.
+        """
+        return self.edit(offset, length, '')
+
+    def edit(self, offset, length, text):
+        """Replaces length characters at offset with text and re-parses the command line from the last word that ends
+        before the edit.
+
+        Arguments:
+            offset {int} -- The offset of the edit.
+            length {int} -- The number of characters to replace.
+            text {str} -- The replacement text.
+
+        Raises:
+            IndexError: The edit lies outside the command line.
+
+        Returns:
+            dict -- The updated argument dictionary.
+        """
+        if offset < 0 or length < 0 or offset + length > len(self._text):
+            raise IndexError('Edit at {} of length {} is outside the command line.'.format(offset, length))
+        self._text = self._text[:offset] + text + self._text[offset + length:]
+
+        # Words that end before the edit are followed by unchanged whitespace, so they are unaffected.
+        stable = bisect_left(self._ends, offset)
+        keepargs = self._argtotals[stable - 1] if stable else 0
+        self._truncate(stable, keepargs)
+        self.error = None
+
+        pos = self._ends[-1] if stable else 0
+        try:
+            while True:
+                arity = self._arity
+                # The option before pos may still be owed option-arguments that its option spec declares.
+                option, n = self._states[-1] if self._states else bashparse.INITIAL_STATE
+                pending = n if option in self._required else 0
+                for args, _, end in bashsplit.iterwords(self._text, pos, self._strict, arity, pending):
+                    for arg in args:
+                        self._parse(arg)
+                    self._ends.append(end)
+                    self._argtotals.append(len(self._args))
+                    # Once the utility turns out to have an option spec, the words after it are read with the spec.
+                    if self._arity is not arity:
+                        pos = end
+                        break
+                else:
+                    break
+        except ValueError as error:
+            self.error = error
+        self._store_open_group()
+        return self._argdict
+
+    def _truncate(self, nwords, nargs):
+        """Drops every word after the first nwords, undoing the parse of their arguments in reverse order.
+        """
+        del self._ends[nwords:]
+        del self._argtotals[nwords:]
+        argdict = self._argdict
+        while len(self._args) > nargs:
+            self._args.pop()
+            self._states.pop()
+            kind, key = self._actions.pop()
+            # The group an option-argument belongs to is stored again below, once the words are dropped
+            if kind == 'optarg':
+                continue
+            groups = argdict[key]
+            groups.pop()
+            if not groups:
+                del argdict[key]
+        self._open = None
+        if not self._args:
+            self._limits = self._limitoverrides
+            self._arity = None
+            self._required = bashparse._NO_REQUIRED
+            return
+        # Reopens the group of the option that the last remaining argument is or belongs to
+        index = len(self._args) - 1
+        while self._actions[index][0] == 'optarg':
+            index -= 1
+        kind, key = self._actions[index]
+        if kind == 'option':
+            self._open = (key, index + 1)
+
+    def _parse(self, arg):
+        """Parses the next argument, resuming from the parser state left by the previous one.
+        """
+        argdict = self._argdict
+        if not self._args:
+            bashparse._store_utility(arg, argdict)
+            if self._profiles is not None:
+                self._limits = self._profiles.resolve(arg, self._limitoverrides)
+                self._arity, self._required = self._profiles.options(arg, self._limitoverrides)
+            kind, key, state = 'utility', 'utility', bashparse.INITIAL_STATE
+        else:
+            kind, key, state = bashparse.step(arg, self._states[-1], self._limits, self._required)
+            if kind != 'optarg':
+                self._store_open_group()
+                if kind == 'option':
+                    bashparse._store_option(arg, argdict)
+                    self._open = (arg, len(self._args) + 1)
+                else:
+                    bashparse._store_operand(arg, argdict)
+                    self._open = None
+        self._args.append(arg)
+        self._actions.append((kind, key))
+        self._states.append(state)
+
+    def _store_open_group(self):
+        """Stores the option-arguments the open group has received as the group of its option. The option-arguments
+        are only gathered into a tuple here, so a group of any size is built in linear time.
+        """
+        if self._open is not None:
+            option, start = self._open
+            self._argdict[option][-1] = tuple(self._args[start:])
@@ -0,0 +1,98 @@
+"""iterparse - Parses a Bash command into a stream of events while it is being tokenized.
+
+Meant for filters that only need part of a command, such as its utility or whether it has some option.
+Each argument is tokenized, classified and handed to the caller before the next one is read, so once the
+caller stops iterating, the rest of the command is never tokenized, checked for invalid syntax or parsed.
+
+Example:
+    >>> list(iterparse('curl -sP 8080 www.github.com'))
+    [('utility', 'curl'), ('option', '-s'), ('option', '-P'), ('optarg', '8080'), ('operand', 'www.github.com')]
+    >>> next(iterparse('curl "unclosed'))
+    ('utility', 'curl')
+"""
+from parser import bashparse
+from splitter import bashsplit
+
+
+def iterparse(cmd, limitoverrides=None, strict=True, profiles=None):
+    """Parses a Bash command one argument at a time, yielding an event for each argument as soon as it is read.
+    An option-argument belongs to the option of the latest option event.
+
+    Arguments:
+        cmd {string} -- The Bash command.
+
+    Keyword Arguments:
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+        strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+        profiles {LimitProfiles} -- The registry to look up the utility's limits override dictionary and option spec in. (default: {None})
+
+    Raises:
+        ValueError: The command is empty, has an unclosed quotation or contains invalid syntax. Raised when the
+        offending argument is reached.
+
+    Yields:
+        tuple -- The kind of the argument ('utility', 'option', 'optarg' or 'operand'), and the argument.
+    """
+    if limitoverrides is None:
+        limitoverrides = {}
+    words = bashsplit.iterwords(cmd, 0, strict)
+    for args, _, end in words:
+        break
+    else:
+        raise ValueError('Command is empty.')
+
+    utility = args[0]
+    yield 'utility', utility
+    limits, required = bashparse.resolve(utility, limitoverrides, profiles)
+    step = bashparse.step
+    state = bashparse.INITIAL_STATE
+    # The rest of the first word, if the utility was read from a cluster
+    for arg in args[1:]:
+        kind, _, state = step(arg, state, limits, required)
+        yield kind, arg
+    # Once the utility turns out to have an option spec, the words after it are read with the spec
+    if profiles is not None:
+        arity = profiles.options(utility, limitoverrides)[0]
+        if arity is not None:
+            words = bashsplit.iterwords(cmd, end, strict, arity)
+    for args, _, _ in words:
+        for arg in args:
+            kind, _, state = step(arg, state, limits, required)
+            yield kind, arg
+
+
+def collect(events):
+    """Builds the argument dictionary of a command from its events, as `bashparse.parse` would return it.
+
+    Example:
+        >>> collect(iterparse('curl -P 8080 url'))
+        {'utility': [('curl',)], '-P': [('8080',)], 'operands': [('url',)]}
+
+    Arguments:
+        events {iterable of tuples} -- The events of the command, as yielded by `iterparse`.
+
+    Returns:
+        dict -- The argument dictionary.
+    """
+    argdict = {}
+    # The groups of the latest option, and the option-arguments it has received so far. They are stored as the
+    # option's group once, when they end, so a group of any size is built in linear time.
+    groups = optargs = None
+    for kind, arg in events:
+        if kind == 'optarg':
+            optargs.append(arg)
+            continue
+        if optargs:
+            groups[-1] = tuple(optargs)
+        optargs = None
+        if kind == 'option':
+            groups = argdict.setdefault(arg, [])
+            groups.append(())
+            optargs = []
+        elif kind == 'operand':
+            argdict.setdefault('operands', []).append((arg,))
+        else:
+            bashparse._store_utility(arg, argdict)
+    if optargs:
+        groups[-1] = tuple(optargs)
+    return argdict
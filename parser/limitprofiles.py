@@ -0,0 +1,219 @@
+"""limitprofiles - A registry of limits override dictionaries keyed by utility.
+
+Lets a mixed corpus of commands be parsed without picking the limits override dictionary for each
+command by hand. The parser looks up the profile for the command's utility itself.
+
+Example profile file (JSON):
+    {
+        "sips": {"-s": 2, "--setProperty": 2},
+        "rm": {"-f": 0, "-r": 0}
+    }
+
+Example profile file (TOML):
+    [sips]
+    "-s" = 2
+
+    [find]
+    "-exec" = "inf"
+
+A profile can also declare every option of its utility as an option spec, with a getopt string and
+long option names. The spec's option-argument counts become the profile's limits, and explicit
+limits in the same profile take precedence over them:
+    {
+        "curl": {"getopt": "sSP:o:", "longopts": ["retry=", "silent"], "-H": 1}
+    }
+"""
+from collections import ChainMap
+
+from parser.optionspec import OptionSpec, requiredoptions
+
+
+# Values that mark an infinite limit in profile files that can't express None, such as TOML.
+_INFINITE = frozenset(('inf', 'infinite', '*'))
+# The profile entries that declare an option spec rather than a limit.
+_SPEC_ENTRIES = frozenset(('getopt', 'longopts'))
+# The options of a utility without an option spec.
+_NO_OPTIONS = (None, frozenset())
+
+
+class LimitProfiles:
+    """A registry of limits override dictionaries keyed by utility. Every profile is validated and
+    compiled into a plain dictionary when it is registered, so resolving a profile while parsing is
+    a single dictionary lookup.
+
+    Example:
+        >>> profiles = LimitProfiles({'sips': {'-s': 2}})
+        >>> BashMap.fromcmd('sips -s format jpeg infile', profiles=profiles)
+        {'utility': [('sips',)], '-s': [('format', 'jpeg')], 'operands': [('infile',)]}
+    """
+    def __init__(self, profiles=None):
+        self._profiles = {}
+        self._specs = {}
+        self._options = {}
+        for utility, limits in (profiles or {}).items():
+            self.register(utility, limits)
+
+    @classmethod
+    def fromfile(cls, path):
+        """Loads the profiles from a JSON or TOML file, chosen by the file's extension.
+
+        Arguments:
+            path {str} -- The path of the profile file.
+
+        Raises:
+            ValueError: The file contains an invalid limit.
+
+        Returns:
+            LimitProfiles -- The registry of profiles.
+        """
+        if path.endswith('.toml'):
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ImportError('Loading TOML profiles requires Python 3.11 or the tomli package.')
+            with open(path, 'rb') as fh:
+                return cls(tomllib.load(fh))
+        import json
+        with open(path) as fh:
+            return cls(json.load(fh))
+
+    def register(self, utility, limits):
+        """Compiles and registers the limits override dictionary for a utility, replacing any existing profile.
+        Argument dictionaries already stored in a ParseCache aren't updated.
+
+        Arguments:
+            utility {str} -- The utility name.
+            limits {dict or OptionSpec} -- The limits override dictionary indicating how many option-arguments an option can receive, optionally with `getopt` and `longopts` entries, or an option spec.
+
+        Raises:
+            ValueError: A limit isn't a non-negative integer or infinite, or the option spec is malformed.
+        """
+        spec = None
+        if isinstance(limits, OptionSpec):
+            spec, limits = limits, {}
+        elif 'getopt' in limits or 'longopts' in limits:
+            spec = OptionSpec.fromprofile(limits)
+            limits = {option: limit for option, limit in limits.items() if option not in _SPEC_ENTRIES}
+        profile = dict(spec.arity) if spec is not None else {}
+        profile.update((option, _compile_limit(utility, option, limit)) for option, limit in limits.items())
+        self._profiles[utility] = profile
+        if spec is not None:
+            self._specs[utility] = spec
+            # The spec's options take as many option-arguments as the profile's limits allow them
+            arity = {option: profile[option] for option in spec.arity}
+            self._options[utility] = (arity, requiredoptions(arity))
+        else:
+            self._specs.pop(utility, None)
+            self._options.pop(utility, None)
+
+    def limits(self, utility):
+        """Looks up the compiled limits override dictionary for a utility. A utility given as a path, such as
+        `/usr/bin/curl`, falls back to the profile for its name.
+
+        Arguments:
+            utility {str} -- The utility name.
+
+        Returns:
+            dict -- The limits override dictionary, or an empty dictionary if the utility has no profile.
+        """
+        profile = self._profiles.get(utility)
+        if profile is None:
+            profile = self._profiles.get(utility.rpartition('/')[2], {})
+        return profile
+
+    def spec(self, utility):
+        """Looks up the option spec for a utility, falling back to the spec for its name like `limits` does.
+
+        Arguments:
+            utility {str} -- The utility name.
+
+        Returns:
+            OptionSpec -- The option spec, or None if the utility has none.
+        """
+        if not self._specs:
+            return None
+        spec = self._specs.get(utility)
+        if spec is None and utility not in self._profiles:
+            spec = self._specs.get(utility.rpartition('/')[2])
+        return spec
+
+    def options(self, utility, limitoverrides=None):
+        """Looks up the options of a utility's option spec along with the limits they are parsed with, so that
+        splitting and parsing a command agree on how many option-arguments each option takes. An explicit limit
+        in the profile or in the limits override dictionary takes precedence over the spec's count.
+
+        Example:
+            >>> profiles = LimitProfiles({'curl': {'getopt': 'sP:', '-P': 2}})
+            >>> profiles.options('curl', {'-s': 1})
+            ({'-s': 1, '-P': 2}, frozenset({'-s', '-P'}))
+
+        Arguments:
+            utility {str} -- The utility name.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary given by the caller. (default: {None})
+
+        Returns:
+            tuple -- The number of option-arguments each option of the spec takes keyed by option, and the options
+            that take them whatever they look like. None and an empty set if the utility has no option spec.
+        """
+        if not self._options:
+            return _NO_OPTIONS
+        options = self._options.get(utility)
+        if options is None:
+            if utility in self._profiles:
+                return _NO_OPTIONS
+            options = self._options.get(utility.rpartition('/')[2], _NO_OPTIONS)
+        arity = options[0]
+        if limitoverrides and arity is not None and not arity.keys().isdisjoint(limitoverrides):
+            arity = {option: limitoverrides.get(option, count) for option, count in arity.items()}
+            return arity, requiredoptions(arity)
+        return options
+
+    def resolve(self, utility, limitoverrides):
+        """Combines the profile for a utility with a limits override dictionary. The limits override dictionary takes
+        precedence over the profile.
+
+        Arguments:
+            utility {str} -- The utility name.
+            limitoverrides {dict} -- The limits override dictionary given by the caller.
+
+        Returns:
+            dict -- The limits to parse the utility's command with.
+        """
+        profile = self.limits(utility)
+        if not limitoverrides:
+            return profile
+        if not profile:
+            return limitoverrides
+        return ChainMap(limitoverrides, profile)
+
+    def __contains__(self, utility):
+        return utility in self._profiles
+
+    def __len__(self):
+        return len(self._profiles)
+
+
+def _compile_limit(utility, option, limit):
+    """Validates a limit from a profile and converts it into the form the parser uses.
+
+    Arguments:
+        utility {str} -- The utility the limit belongs to.
+        option {str} -- The option the limit belongs to.
+        limit {int} -- The option-argument limit, None or one of the infinite markers.
+
+    Raises:
+        ValueError: The limit isn't a non-negative integer or infinite.
+
+    Returns:
+        int -- The limit, or None if the limit is infinite.
+    """
+    if limit is None or (isinstance(limit, str) and limit.lower() in _INFINITE):
+        return None
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+        raise ValueError('Limit {!r} for option "{}" of "{}" is invalid.'.format(limit, option, utility))
+    return limit
@@ -0,0 +1,117 @@
+"""optionspec - Declares which options a utility accepts and how many option-arguments each one takes.
+
+A spec replaces guesswork for the utilities it is registered for. Clusters such as `-sSP8080` are
+expanded by looking each letter up, so `-P` takes `8080` because the spec says it takes an argument,
+not because `8080` starts with a digit. An option that takes arguments receives them even when they
+start with a dash, and `--retry=5` is split into `--retry` and `5`.
+
+Specs are registered per utility in a LimitProfiles registry, either directly or from a profile file:
+
+    {"curl": {"getopt": "sSP:o:", "longopts": ["retry=", "silent"], "-H": 1}}
+
+Example:
+    >>> profiles = LimitProfiles({'grep': OptionSpec('ie:', ['regexp='])})
+    >>> BashMap.fromcmd('grep -ie -foo file', profiles=profiles)
+    {'utility': [('grep',)], '-i': [()], '-e': [('-foo',)], 'operands': [('file',)]}
+"""
+
+
+class OptionSpec:
+    """The options of a utility, compiled into a table of option-argument counts keyed by option.
+
+    Arguments:
+        shortopts {str} -- A getopt string: each letter is a short option, and a letter followed by `:` takes an argument. (default: {''})
+        longopts {iterable of strings} -- Long option names, with or without the leading `--`. A name ending in `=` takes an argument. (default: {()})
+
+    Raises:
+        ValueError: The getopt string or a long option name is malformed.
+    """
+    __slots__ = ('arity', 'required')
+
+    def __init__(self, shortopts='', longopts=()):
+        arity = {}
+        # Leading `+` and `:` only change how getopt reports errors.
+        shortopts = shortopts.lstrip('+:')
+        index = 0
+        while index < len(shortopts):
+            letter = shortopts[index]
+            if letter == ':' or letter == '-' or letter.isspace():
+                raise ValueError('Getopt string "{}" is malformed at "{}".'.format(shortopts, letter))
+            takesarg = shortopts[index + 1:index + 2] == ':'
+            if takesarg and shortopts[index + 2:index + 3] == ':':
+                raise ValueError('Optional option-arguments ("{}::") are not supported.'.format(letter))
+            arity['-' + letter] = 1 if takesarg else 0
+            index += 2 if takesarg else 1
+        for name in longopts:
+            takesarg = name.endswith('=')
+            name = name.rstrip('=')
+            if not name.lstrip('-'):
+                raise ValueError('Long option "{}" is malformed.'.format(name))
+            arity[name if name.startswith('--') else '--' + name] = 1 if takesarg else 0
+        self._compile(arity)
+
+    @classmethod
+    def fromtable(cls, table):
+        """Creates a spec from a table of option-argument counts, such as `{'-s': 0, '-P': 1, '--data': 2}`.
+
+        Arguments:
+            table {dict} -- The number of option-arguments keyed by option, or None for options that take any number.
+
+        Raises:
+            ValueError: An option doesn't start with a dash or has an invalid count.
+
+        Returns:
+            OptionSpec -- The spec.
+        """
+        spec = cls()
+        arity = {}
+        for option, count in table.items():
+            if not option.startswith('-') or option == '-':
+                raise ValueError('Option "{}" must start with a dash.'.format(option))
+            if count is not None and (isinstance(count, bool) or not isinstance(count, int) or count < 0):
+                raise ValueError('Option-argument count {!r} for "{}" is invalid.'.format(count, option))
+            arity[option] = count
+        spec._compile(arity)
+        return spec
+
+    @classmethod
+    def fromprofile(cls, profile):
+        """Creates a spec from the `getopt` and `longopts` entries of a profile.
+
+        Arguments:
+            profile {dict} -- The profile.
+
+        Returns:
+            OptionSpec -- The spec.
+        """
+        return cls(profile.get('getopt', ''), profile.get('longopts', ()))
+
+    def _compile(self, arity):
+        self.arity = arity
+        self.required = requiredoptions(arity)
+
+    def __contains__(self, option):
+        return option in self.arity
+
+    def __len__(self):
+        return len(self.arity)
+
+    def __eq__(self, other):
+        if not isinstance(other, OptionSpec):
+            return NotImplemented
+        return self.arity == other.arity
+
+    def __repr__(self):
+        return 'OptionSpec.fromtable({!r})'.format(self.arity)
+
+
+def requiredoptions(arity):
+    """Picks the options that take a fixed number of option-arguments, which receive them whatever they look like.
+
+    Arguments:
+        arity {dict} -- The number of option-arguments each option takes keyed by option, or None if it takes any number.
+
+    Returns:
+        frozenset -- The options that take at least one option-argument, but not any number.
+    """
+    return frozenset(option for option, count in arity.items() if count is not None and count > 0)
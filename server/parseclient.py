@@ -0,0 +1,127 @@
+"""parseclient - A thin client for the bashmap parse daemon.
+
+Sends Bash commands to a running `bashmap --serve` daemon over its Unix domain socket and reads
+back the argument dictionaries. Only the standard library's socket and json modules are imported,
+so forwarding a command costs far less than parsing it in a freshly started interpreter.
+
+Example:
+    >>> with ParseClient() as client:
+    ...     client.parse('curl -s www.github.com')
+    {'utility': [('curl',)], '-s': [('www.github.com',)]}
+"""
+import json
+import os
+import socket
+
+
+def default_path():
+    """Picks the socket path shared by the daemon and its clients: $BASHMAP_SOCKET if set, otherwise bashmap.sock in
+    $XDG_RUNTIME_DIR, otherwise a per-user file in /tmp.
+
+    Returns:
+        str -- The socket path.
+    """
+    path = os.environ.get('BASHMAP_SOCKET')
+    if path:
+        return path
+    runtimedir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtimedir:
+        return os.path.join(runtimedir, 'bashmap.sock')
+    return '/tmp/bashmap-{}.sock'.format(os.getuid())
+
+
+class ParseClient:
+    """A connection to the parse daemon. Requests can be pipelined with `parsemany`.
+
+    Raises OSError from the constructor if no daemon is listening on the socket.
+    """
+    def __init__(self, path=None, timeout=5.0):
+        self.path = path or default_path()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(self.path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._reader = self._socket.makefile('rb')
+
+    def parse(self, cmd, limitoverrides=None, strict=True):
+        """Converts a Bash command into an argument dictionary on the daemon.
+
+        Arguments:
+            cmd {string} -- The Bash command.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {None})
+            strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+
+        Raises:
+            ValueError: The daemon couldn't parse the command.
+            OSError: The connection to the daemon failed.
+
+        Returns:
+            dict -- The argument dictionary.
+        """
+        return next(self.parsemany([cmd], limitoverrides, strict))
+
+    def parsemany(self, cmds, limitoverrides=None, strict=True):
+        """Sends every command before reading any of the replies, so the round trips overlap.
+
+        Arguments:
+            cmds {list of strings} -- The Bash commands.
+
+        Keyword Arguments:
+            limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {None})
+            strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+
+        Raises:
+            ValueError: The daemon couldn't parse a command.
+            OSError: The connection to the daemon failed.
+
+        Yields:
+            dict -- The argument dictionary for each command, in order.
+        """
+        cmds = list(cmds)
+        payload = b''.join(_encode_request(cmd, limitoverrides, strict) for cmd in cmds)
+        self._socket.sendall(payload)
+        for _ in cmds:
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionError('The daemon closed the connection.')
+            yield _decode_reply(line)
+
+    def close(self):
+        """Closes the connection.
+        """
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _encode_request(cmd, limitoverrides, strict):
+    """Encodes a request as a line of JSON.
+    """
+    request = {'command': cmd}
+    if limitoverrides:
+        request['limitoverrides'] = limitoverrides
+    if not strict:
+        request['strict'] = False
+    return json.dumps(request).encode() + b'\n'
+
+
+def _decode_reply(line):
+    """Decodes a reply line, turning the JSON lists of each argument group back into tuples.
+
+    Raises:
+        ValueError: The reply holds an error.
+    """
+    reply = json.loads(line)
+    if 'error' in reply:
+        raise ValueError(reply['error'])
+    return {key: [tuple(group) for group in groups] for key, groups in reply['bashmap'].items()}
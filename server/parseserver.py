@@ -0,0 +1,152 @@
+"""parseserver - An asyncio daemon that parses Bash commands sent over a Unix domain socket.
+
+The daemon keeps the parser imported and warm, and shares one ParseCache between all of its
+clients, so shell hooks that parse a command on every prompt skip the interpreter startup.
+
+Every request and reply is one line of JSON. Requests are answered in the order they arrive on a
+connection, so a client can pipeline as many as it likes before reading the replies:
+
+    -> {"command": "sips -s format jpeg", "limitoverrides": {"-s": 2}}
+    <- {"bashmap": {"utility": [["sips"]], "-s": [["format", "jpeg"]]}}
+    -> {"command": "curl \\"www.github.com"}
+    <- {"error": "No closing quotation"}
+
+Example:
+    >>> serve('/tmp/bashmap.sock', profiles=LimitProfiles.fromfile('profiles.toml'))
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+
+from bashmap import BashMap
+from utils.parsecache import ParseCache
+
+
+# The longest request line, in bytes, the daemon accepts.
+_MAX_REQUEST = 1 << 24
+
+
+class ParseServer:
+    """Serves argument dictionaries for the Bash commands its clients send. Connections are handled concurrently.
+    """
+    def __init__(self, path, profiles=None, cache=None):
+        self.path = path
+        self.profiles = profiles
+        self.cache = cache if cache is not None else ParseCache(maxsize=4096)
+        self._server = None
+
+    async def start(self):
+        """Starts listening on the socket, replacing a stale socket file left behind by a daemon that is gone.
+
+        Raises:
+            OSError: Another daemon is already listening on the socket.
+        """
+        _remove_stale_socket(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path, limit=_MAX_REQUEST)
+        os.chmod(self.path, 0o600)
+
+    async def serve_forever(self):
+        """Starts the daemon if needed and serves until it is cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stops listening and removes the socket file.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def respond(self, line):
+        """Answers one request.
+
+        Arguments:
+            line {bytes} -- The request line.
+
+        Returns:
+            bytes -- The reply line.
+        """
+        try:
+            request = json.loads(line)
+            bashmap = BashMap.fromcmd(request['command'], request.get('limitoverrides'), request.get('strict', True),
+                                      cache=self.cache, profiles=self.profiles)
+            reply = {'bashmap': bashmap}
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            reply = {'error': str(error) if not isinstance(error, KeyError) else 'Request has no command.'}
+        return json.dumps(reply).encode() + b'\n'
+
+    async def _handle(self, reader, writer):
+        """Answers the requests of one connection in order until the client disconnects.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({'error': 'Request is too long.'}).encode() + b'\n')
+                    break
+                if not line:
+                    break
+                writer.write(self.respond(line))
+                # Only waits on the client when the write buffer is full, so pipelined requests are answered in bulk.
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def serve(path, profiles=None, cachesize=4096):
+    """Runs the daemon until it is interrupted or terminated.
+
+    Arguments:
+        path {str} -- The socket path.
+
+    Keyword Arguments:
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+        cachesize {int} -- The number of argument dictionaries to keep cached. (default: {4096})
+    """
+    server = ParseServer(path, profiles, ParseCache(cachesize))
+    try:
+        asyncio.run(_serve_until_terminated(server))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve_until_terminated(server):
+    """Serves until SIGTERM arrives, then shuts down cleanly so the socket file is removed.
+    """
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+
+
+def _remove_stale_socket(path):
+    """Removes the socket file if nothing is listening on it.
+
+    Raises:
+        OSError: A daemon is listening on the socket.
+    """
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError('A daemon is already listening on {}.'.format(path))
+    finally:
+        probe.close()
@@ -1,66 +1,413 @@
 """bashsplit - Splits a Bash command string into its separate arguments.
 
+The command is tokenized in a single pass with the same quoting and escaping rules as
+`shlex.split` in POSIX mode. Each argument is checked for invalid syntax and, if it is a
+cluster of short options, expanded as soon as it has been read. Clusters are expanded by guessing
+which letters are options, unless an option spec is registered for the command's utility, in which
+case each letter is looked up in the spec.
+
 Example:
     >>> split('curl -s -SP 8080')
     ['curl', '-s', '-S' '-P', '8080']
 """
-import shlex
 import re
 
 
-def split(command):
+# Characters that separate arguments, matching shlex's default whitespace.
+_WHITESPACE = ' \t\r\n'
+# Whitespace between arguments.
+_SEPARATOR = re.compile(r'[ \t\r\n]*')
+# One piece of an argument: an unquoted run, a single-quoted string, a double-quoted string or an escaped character.
+# The double-quoted alternative is written as an unrolled loop so an unterminated quote fails in linear time.
+_PIECE = re.compile(r'''([^ \t\r\n'"\\]+)|'([^']*)'|"([^"\\]*(?:\\.[^"\\]*)*)"|\\(.)''', re.DOTALL)
+# The pieces of an argument in a compound command, where an unquoted control operator also ends the argument.
+# `>&` and `&>` are redirections rather than operators, so they stay part of the argument.
+_COMPOUND_PIECE = re.compile(r'''((?:>&|&>|[^ \t\r\n'"\\|&;])+)|'([^']*)'|"([^"\\]*(?:\\.[^"\\]*)*)"|\\(.)''', re.DOTALL)
+# Control operators that separate the commands of a compound command.
+_CONTROL_OPERATOR = re.compile(r'\|\||&&|\|&|[|;]|&(?!>)')
+# Operators that must be followed by another command.
+_BINARY_OPERATORS = frozenset(('|', '|&', '&&', '||'))
+# Escape sequences that are honored inside double quotes.
+_DOUBLEQUOTE_ESCAPE = re.compile(r'\\(["\\])')
+# Two explicit options without a space between them.
+_CONCATENATED_OPTIONS = re.compile(r'-\w-')
+# Long option and option-argument without a space between them.
+_CONCATENATED_LONGOPTION = re.compile(r'--\w+-\w+\d')
+
+# Characters that make a word's arguments differ from its source text.
+_QUOTING = re.compile(r'[\'"\\]')
+# The short options expanded from clusters, shared between commands rather than built for every letter.
+_SHORTOPTIONS = {letter: '-' + letter for letter in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'}
+
+_PLAIN, _SINGLEQUOTED, _DOUBLEQUOTED, _ESCAPED = 1, 2, 3, 4
+
+
+def split(command, strict=True, profiles=None, limitoverrides=None):
     """Splits a Bash command string into its separate arguments.
-    
+
     Example:
         >>> split('curl -s -SP 8080')
         ['curl', '-s', '-S' '-P', '8080']
 
     Arguments:
         command {string} -- The Bash command.
-    
+
+    Keyword Arguments:
+        strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+        profiles {LimitProfiles} -- The registry to look up the utility's option spec in. (default: {None})
+        limitoverrides {dict} -- The limits override dictionary the command is parsed with, which takes precedence over the counts of the option spec. (default: {None})
+
+    Raises:
+        ValueError: The command has an unclosed quotation or contains invalid syntax.
+
     Returns:
         [list of strings] -- The list of Bash arguments.
-    """    
+    """
+    return _split(command, strict, profiles, limitoverrides, None)
+
+
+def split_spans(command, strict=True, profiles=None, limitoverrides=None):
+    """Splits a Bash command string into its separate arguments like `split`, and locates each argument in the
+    command, so an argument can be highlighted without scanning the command again.
+
+    Example:
+        >>> split_spans('curl -sP8080 "a b"')
+        (['curl', '-s', '-P', '8080', 'a b'], [(0, 4), (5, 7), (7, 8), (8, 12), (13, 18)])
+
+    Arguments:
+        command {string} -- The Bash command.
+
+    Keyword Arguments:
+        strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+        profiles {LimitProfiles} -- The registry to look up the utility's option spec in. (default: {None})
+        limitoverrides {dict} -- The limits override dictionary the command is parsed with, which takes precedence over the counts of the option spec. (default: {None})
+
+    Raises:
+        ValueError: The command has an unclosed quotation or contains invalid syntax.
+
+    Returns:
+        tuple -- The list of Bash arguments and the list of their (start, end) offsets in the command. An option
+        expanded from a cluster is located at its letter, and every argument of a quoted word at the whole word.
+    """
+    spans = []
+    return _split(command, strict, profiles, limitoverrides, spans), spans
+
+
+def _split(command, strict, profiles, limitoverrides, spans):
+    """Splits a Bash command string into its separate arguments, appending their offsets to spans unless it is None.
+    """
     # Creates list of arguments found in the command
     args = []
+    arity = None
+    pending = 0
 
     # Splits the command into its individual parts
-    for arg in shlex.split(command):
+    for arg, start, end in _scan(command):
+        first = len(args)
+        # Takes the option-arguments an option spec declares for the previous option as they are
+        if pending:
+            args.append(arg)
+            pending -= 1
+            if spans is not None:
+                spans.append((start, end))
+            continue
         # Checks for subset of illegal syntaxes
-        _check_syntax(arg)
+        if strict:
+            _check_syntax(arg)
+        # If the utility has an option spec, expands options by looking them up
+        if arity is not None and arg[:1] == '-':
+            pending = _expand_with_spec(arg, args, arity)
         # If arg starts with a single dash but is concatenated with other arguments
-        if arg[0] == '-' and arg[1] != '-' and len(arg) > 2:
-            # Stores the initial option 
-            args.append(arg[0:2])
-            # Parses the rest of argument for options and option-arguments
-            for i,option in enumerate(arg[2:]):
-                # Stores value if number
-                if str.isdigit(option):
-                    args.append(arg[2 + i:])
-                    break
-                # Stores option
-                else:
-                    args.append('-' + option)   
+        elif len(arg) > 2 and arg[0] == '-' and arg[1] != '-':
+            _expand_shortoptions(arg, args)
         else:
             args.append(arg)
+        if spans is not None:
+            _locate(command, start, end, args, first, spans)
+        # Looks up the option spec once the utility has been read
+        if profiles is not None:
+            arity = profiles.options(args[0], limitoverrides)[0]
+            profiles = None
     return args
 
 
+def iterwords(command, pos=0, strict=True, arity=None, pending=0):
+    """Reads the arguments of a Bash command one shell word at a time. A short option cluster is a single word that
+    expands into several arguments.
+
+    Example:
+        >>> list(iterwords('curl -sP8080'))
+        [(['curl'], 0, 4), (['-s', '-P', '8080'], 5, 12)]
+
+    Arguments:
+        command {string} -- The Bash command.
+
+    Keyword Arguments:
+        pos {int} -- The offset to start reading from. Must not be inside a word. (default: {0})
+        strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+        arity {dict} -- The option-argument counts of the utility's option spec to expand options with, as returned by `LimitProfiles.options`. (default: {None})
+        pending {int} -- The number of option-arguments the option spec still declares for the option before pos. (default: {0})
+
+    Raises:
+        ValueError: The command has an unclosed quotation or contains invalid syntax.
+
+    Yields:
+        tuple -- The list of arguments the word expands into, and the start and end offsets of the word in the command.
+    """
+    for arg, start, end in _scan(command, pos):
+        if pending:
+            pending -= 1
+            yield [arg], start, end
+            continue
+        if strict:
+            _check_syntax(arg)
+        if arity is not None and arg[:1] == '-':
+            args = []
+            pending = _expand_with_spec(arg, args, arity)
+        elif len(arg) > 2 and arg[0] == '-' and arg[1] != '-':
+            args = []
+            _expand_shortoptions(arg, args)
+        else:
+            args = [arg]
+        yield args, start, end
+
+
+def split_compound(command, strict=True, profiles=None, limitoverrides=None):
+    """Splits a compound Bash command into the arguments of each of its commands, along with the control operator
+    (`|`, `|&`, `&&`, `||`, `;` or `&`) that follows each one. The command is read in a single pass.
+
+    Example:
+        >>> split_compound('cat f | grep -i x && curl -s url')
+        [(['cat', 'f'], '|'), (['grep', '-i', 'x'], '&&'), (['curl', '-s', 'url'], None)]
+
+    Arguments:
+        command {string} -- The compound Bash command.
+
+    Keyword Arguments:
+        strict {bool} -- Checks every argument for invalid syntax. Can be disabled for trusted input. (default: {True})
+        profiles {LimitProfiles} -- The registry to look up the option spec of each command's utility in. (default: {None})
+        limitoverrides {dict} -- The limits override dictionary the commands are parsed with, which takes precedence over the counts of the option specs. (default: {None})
+
+    Raises:
+        ValueError: The command has an unclosed quotation, contains invalid syntax, or an operator is missing a command.
+
+    Returns:
+        [list of tuples] -- The list of arguments of each command and the operator following it, or None for the last command.
+    """
+    commands = []
+    args = []
+    arity = None
+    pending = 0
+    for arg, operator in _scan_compound(command):
+        if operator is None:
+            if pending:
+                args.append(arg)
+                pending -= 1
+                continue
+            if strict:
+                _check_syntax(arg)
+            if arity is not None and arg[:1] == '-':
+                pending = _expand_with_spec(arg, args, arity)
+            elif len(arg) > 2 and arg[0] == '-' and arg[1] != '-':
+                _expand_shortoptions(arg, args)
+            else:
+                args.append(arg)
+            if profiles is not None and len(args) == 1:
+                arity = profiles.options(args[0], limitoverrides)[0]
+            continue
+        if not args:
+            raise ValueError('Syntax error near unexpected token \"{}\".'.format(operator))
+        commands.append((args, operator))
+        args = []
+        arity = None
+        pending = 0
+    if args:
+        commands.append((args, None))
+    elif commands and commands[-1][1] in _BINARY_OPERATORS:
+        raise ValueError('Missing command after \"{}\".'.format(commands[-1][1]))
+    return commands
+
+
+def _scan_compound(command):
+    """Reads the unexpanded arguments and control operators of a compound Bash command one at a time.
+
+    Arguments:
+        command {string} -- The compound Bash command.
+
+    Raises:
+        ValueError: The command has an unclosed quotation or ends with an escape character.
+
+    Yields:
+        tuple -- The argument and None, or None and the control operator.
+    """
+    end = len(command)
+    pos = 0
+    while True:
+        pos = _SEPARATOR.match(command, pos).end()
+        if pos >= end:
+            return
+        match = _CONTROL_OPERATOR.match(command, pos)
+        if match is not None:
+            pos = match.end()
+            yield None, match.group()
+            continue
+        arg = ''
+        while pos < end and command[pos] not in _WHITESPACE:
+            match = _COMPOUND_PIECE.match(command, pos)
+            if match is None:
+                if command[pos] in '|&;':
+                    break
+                raise ValueError('No escaped character' if command[pos] == '\\' else 'No closing quotation')
+            kind = match.lastindex
+            if kind == _DOUBLEQUOTED:
+                piece = match.group(kind)
+                arg += _DOUBLEQUOTE_ESCAPE.sub(r'\1', piece) if '\\' in piece else piece
+            else:
+                arg += match.group(kind)
+            pos = match.end()
+        yield arg, None
+
+
+def _scan(command, pos=0):
+    """Reads the unexpanded arguments of a Bash command one at a time, removing quotes and escapes.
+
+    Arguments:
+        command {string} -- The Bash command.
+
+    Keyword Arguments:
+        pos {int} -- The offset to start reading from. Must not be inside an argument. (default: {0})
+
+    Raises:
+        ValueError: The command has an unclosed quotation or ends with an escape character.
+
+    Yields:
+        tuple -- The argument, and the start and end offsets of its source text in the command.
+    """
+    end = len(command)
+    while True:
+        pos = _SEPARATOR.match(command, pos).end()
+        if pos >= end:
+            return
+        start = pos
+        arg = ''
+        while pos < end and command[pos] not in _WHITESPACE:
+            match = _PIECE.match(command, pos)
+            if match is None:
+                raise ValueError('No escaped character' if command[pos] == '\\' else 'No closing quotation')
+            kind = match.lastindex
+            if kind == _DOUBLEQUOTED:
+                piece = match.group(kind)
+                arg += _DOUBLEQUOTE_ESCAPE.sub(r'\1', piece) if '\\' in piece else piece
+            else:
+                arg += match.group(kind)
+            pos = match.end()
+        yield arg, start, pos
+
+
+def _expand_shortoptions(arg, args):
+    """Expands a cluster of short options, such as `-sSP8080`, into separate options and option-arguments.
+
+    Arguments:
+        arg {string} -- The short option cluster.
+        args {list of strings} -- The list of Bash arguments to append to.
+    """
+    # Stores the initial option
+    args.append(_SHORTOPTIONS.get(arg[1]) or arg[0:2])
+    # Parses the rest of argument for options and option-arguments
+    for i in range(2, len(arg)):
+        option = arg[i]
+        # Stores value if number
+        if option.isdigit():
+            args.append(arg[i:])
+            break
+        # Stores option
+        else:
+            args.append(_SHORTOPTIONS.get(option) or '-' + option)
+
+
+def _expand_with_spec(arg, args, arity):
+    """Expands an option as declared by an option spec. In a cluster such as `-sSP8080`, every letter is an option
+    until one that takes an argument, which receives the rest of the cluster. A long option that takes an argument is
+    split from an attached `=value`. Once a letter isn't in the spec, the rest of the cluster is expanded by guessing,
+    though an option of the spec that ends it still takes its option-arguments as they are.
+
+    Arguments:
+        arg {string} -- The option.
+        args {list of strings} -- The list of Bash arguments to append to.
+        arity {dict} -- The number of option-arguments each option of the spec takes, keyed by option.
+
+    Returns:
+        int -- The number of option-arguments the last option still takes from the arguments that follow.
+    """
+    if len(arg) <= 2 or arg[1] == '-':
+        option, equals, value = arg.partition('=')
+        count = arity.get(option, 0)
+        if equals and count != 0:
+            args.append(option)
+            args.append(value)
+            return count - 1 if count is not None else 0
+        args.append(arg)
+        return arity.get(arg) or 0
+    for i in range(1, len(arg)):
+        option = _SHORTOPTIONS.get(arg[i]) or '-' + arg[i]
+        if option not in arity:
+            rest = '-' + arg[i:]
+            if len(rest) > 2:
+                _expand_shortoptions(rest, args)
+            else:
+                args.append(rest)
+            # A guessed cluster can still end with an option of the spec, which takes its option-arguments as usual
+            return arity.get(args[-1]) or 0
+        args.append(option)
+        count = arity[option]
+        if count != 0:
+            if i + 1 == len(arg):
+                return count or 0
+            args.append(arg[i + 1:])
+            return count - 1 if count is not None else 0
+    return 0
+
+
+def _locate(command, start, end, args, first, spans):
+    """Appends the offsets in the command of the arguments a word expanded into.
+
+    Arguments:
+        command {string} -- The Bash command.
+        start {int} -- The offset of the word.
+        end {int} -- The offset following the word.
+        args {list of strings} -- The list of Bash arguments, ending with the ones the word expanded into.
+        first {int} -- The index of the word's first argument.
+        spans {list of tuples} -- The list of offsets to append to.
+    """
+    if len(args) - first == 1 or _QUOTING.search(command, start, end):
+        spans.extend((start, end) for _ in range(first, len(args)))
+        return
+    # The word starts with its first argument as it is: an option, or the long option split from its value
+    pos = start + len(args[first])
+    spans.append((start, pos))
+    for index in range(first + 1, len(args) - 1):
+        # Every argument between the first and the last is a letter of a cluster, whose dash is the cluster's
+        spans.append((pos, pos + 1))
+        pos += 1
+    # The last argument covers the rest of the word, after the `=` that separates a long option's value
+    if command[pos:pos + 1] == '=' and args[first].startswith('--'):
+        pos += 1
+    spans.append((pos, end))
+
+
 def _check_syntax(arg):
     """Checks for a subset of invalid Bash command syntax.
-    
+
     Arguments:
         arg {string} -- The argument to check for valid syntax.
-    
+
     Raises:
         ValueError: The argument contains invalid syntax.
-    """    
-    error = False
-    # Checks for two explicit options without a space between them.
-    if re.match(r'^-\w-', arg):
-        error = True
-    # Checks for long option and option-argument without a space between them.
-    if re.match(r'--\w+-\w+\d', arg):
-        error = True
-    if error:
+    """
+    # Only options can contain the invalid syntaxes.
+    if arg[:1] != '-':
+        return
+    # Checks for two explicit options without a space between them, then for long option and option-argument
+    # without a space between them.
+    if _CONCATENATED_OPTIONS.match(arg) or _CONCATENATED_LONGOPTION.match(arg):
         raise ValueError('Argument \"{}\" is invalid syntax.'.format(arg))
@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import io
+import pickle
 import unittest
-from bashmap import BashMap
+from unittest import mock
+from bashmap import BashMap, _read_cmds
+from utils.cpucount import cpucount
+from utils.parsecache import ParseCache
 
 
 # TODO swap arg1 and arg2 for most of these tests.
@@ -103,6 +108,28 @@ class BashMapTest(unittest.TestCase):
         self.assertEqual(bashmap['operands'], [('infile',)])
         self.assertEqual(bashmap['--out'], [('outfile',)])
     
+    def test_infinite_limitoverride_at_end_of_command(self):
+        cmd = 'rm -f infile1 infile2'
+        limitOverrides = {'-f': None}
+        bashmap = BashMap.fromcmd(cmd, limitoverrides=limitOverrides)
+        self.assertEqual(bashmap['utility'], [('rm',)])
+        self.assertEqual(bashmap['-f'], [('infile1', 'infile2')])
+        self.assertNotIn('operands', bashmap)
+
+    def test_zero_limitoverride(self):
+        cmd = 'curl -s www.github.com'
+        limitOverrides = {'-s': 0}
+        bashmap = BashMap.fromcmd(cmd, limitoverrides=limitOverrides)
+        self.assertEqual(bashmap['-s'], [()])
+        self.assertEqual(bashmap['operands'], [('www.github.com',)])
+
+    def test_many_arguments_without_recursion_error(self):
+        operands = ['file{}'.format(i) for i in range(100000)]
+        cmd = 'rm -v ' + ' '.join(operands)
+        bashmap = BashMap.fromcmd(cmd, limitoverrides={'-v': 0})
+        self.assertEqual(bashmap['-v'], [()])
+        self.assertEqual(bashmap.simpleoperands, operands)
+
     def test_shortoption_and_longoption_combined_exception(self):
         cmd = 'curl -s--basic'
         self.assertRaises(ValueError, BashMap.fromcmd, cmd)
@@ -115,6 +142,55 @@ class BashMapTest(unittest.TestCase):
         cmd = 'curl -s-S someurl'
         self.assertRaises(ValueError, BashMap.fromcmd, cmd)
     
+    def test_fromcmds(self):
+        cmds = ['curl -s www.github.com', 'curl -s-S someurl', 'sips -s format jpeg infile']
+        results = list(BashMap.fromcmds(cmds, limitoverrides={'-s': 2}, workers=2, chunksize=1))
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        self.assertEqual(BashMap.fromcmd(cmds[0], limitoverrides={'-s': 2}), results[0].bashmap)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].bashmap)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual([('format', 'jpeg')], results[2].bashmap['-s'])
+
+    def test_fromcmds_unordered(self):
+        cmds = ['curl -P {} someurl'.format(i) for i in range(50)]
+        results = BashMap.fromcmds(cmds, workers=2, chunksize=4, ordered=False)
+        ports = {result.index: result.bashmap.simpleoptionargs('-P') for result in results}
+        self.assertEqual({i: [str(i)] for i in range(50)}, ports)
+
+    @mock.patch('concurrent.futures.ProcessPoolExecutor', side_effect=AssertionError('A pool was started.'))
+    def test_fromcmds_parses_small_batches_in_process(self, _):
+        cmds = ['curl -P {} someurl'.format(i) for i in range(50)]
+        expected = [BashMap.fromcmd(cmd) for cmd in cmds]
+        self.assertEqual(expected, [result.bashmap for result in BashMap.fromcmds(cmds, workers=4, chunksize=64)])
+        self.assertGreaterEqual(cpucount(), 1)
+        with mock.patch('utils.cpucount.cpucount', return_value=1):
+            self.assertEqual(expected, [result.bashmap for result in BashMap.fromcmds(cmds, chunksize=4)])
+
+    def test_cache(self):
+        cache = ParseCache(maxsize=2)
+        first = BashMap.fromcmd('git status', cache=cache)
+        first['operands'].append(('log',))
+        first['-v'] = [()]
+        second = BashMap.fromcmd('git status', cache=cache)
+        self.assertEqual({'utility': [('git',)], 'operands': [('status',)]}, second)
+        BashMap.fromcmd('sips -s format jpeg', cache=cache)
+        BashMap.fromcmd('sips -s format jpeg', limitoverrides={'-s': 2}, cache=cache)
+        info = cache.info()
+        self.assertEqual((1, 3, 1, 2), (info.hits, info.misses, info.evictions, info.currsize))
+
+    def test_read_cmds(self):
+        self.assertEqual(['ls -l', 'curl -s x'], list(_read_cmds(io.StringIO('ls -l\n\ncurl -s x\r\n'), '\n')))
+        self.assertEqual(['ls -l', 'echo "a\nb"'], list(_read_cmds(io.StringIO('ls -l\0echo "a\nb"\0'), '\0')))
+
+    def test_empty_command_exception(self):
+        self.assertRaises(ValueError, BashMap.fromcmd, '')
+        self.assertRaises(ValueError, BashMap.fromcmd, '   ')
+
+    def test_empty_and_lone_dash_arguments(self):
+        bashmap = BashMap.fromcmd('cat - ""')
+        self.assertEqual([('',)], bashmap['-'])
+
     def test_utility(self):
         cmd = 'curl www.github.com www.pypi.org -P 8080'
         bashmap = BashMap.fromcmd(cmd)
@@ -160,6 +236,69 @@ class BashMapTest(unittest.TestCase):
         self.assertEqual([], bashmap.simpleoptionargs('-s'))
         self.assertEqual([], bashmap.simpleoptionargs('-A'))
 
+    def test_fromcompound(self):
+        links = BashMap.fromcompound('sips -s format jpeg in | grep -i x && curl -s url', {'-s': 2})
+        self.assertEqual(['|', '&&', None], [link.operator for link in links])
+        self.assertEqual([('format', 'jpeg')], links[0].bashmap['-s'])
+        self.assertEqual(BashMap.fromcmd('grep -i x'), links[1].bashmap)
+        self.assertEqual([('url',)], links[2].bashmap['-s'])
+        self.assertIsInstance(links[2].bashmap, BashMap)
+        self.assertRaises(ValueError, BashMap.fromcompound, 'ls &&')
+
+    def test_views_follow_mutations(self):
+        bashmap = BashMap.fromcmd('curl -s -P 8080 www.github.com')
+        self.assertEqual(['-s', '-P'], bashmap.simpleoptions)
+        self.assertEqual(['8080'], bashmap.allsimpleoptionargs)
+        bashmap['-x'] = [('POST',)]
+        self.assertEqual(['-s', '-P', '-x'], bashmap.simpleoptions)
+        self.assertEqual(['8080', 'POST'], bashmap.allsimpleoptionargs)
+        del bashmap['-P']
+        self.assertEqual(['-s', '-x'], bashmap.simpleoptions)
+        bashmap.update(operands=[('www.pypi.org',)], utility=[('wget',)])
+        self.assertEqual(['www.pypi.org'], bashmap.simpleoperands)
+        self.assertEqual('wget', bashmap.simpleutility)
+        bashmap.pop('-s')
+        bashmap |= {'-o': [('out',)]}
+        self.assertEqual(['-x', '-o'], bashmap.simpleoptions)
+        bashmap.setdefault('-v', [()])
+        self.assertEqual(['-x', '-o', '-v'], bashmap.simpleoptions)
+        bashmap.clear()
+        self.assertEqual([], bashmap.simpleoptions)
+
+    def test_spans(self):
+        cmd = 'curl -sP 8080 "www.github.com" --retry 5'
+        bashmap = BashMap.fromcmd(cmd, spans=True)
+        self.assertEqual(BashMap.fromcmd(cmd), bashmap)
+        self.assertEqual(bashmap.keys(), bashmap.spans.keys())
+        self.assertEqual([((0, 4),)], bashmap.spans['utility'])
+        self.assertEqual([((5, 7),)], bashmap.spans['-s'])
+        self.assertEqual([((7, 8), (9, 13))], bashmap.spans['-P'])
+        self.assertEqual(['"www.github.com"'], [cmd[start:end] for (start, end), in bashmap.spans['operands']])
+        self.assertEqual(['--retry', '5'], [cmd[start:end] for start, end in bashmap.spans['--retry'][0]])
+        self.assertIsNone(BashMap.fromcmd(cmd).spans)
+
+        cmd = 'find --exec ' + ' '.join(['arg'] * 20000) + ' -p x'
+        bashmap = BashMap.fromcmd(cmd, {'--exec': None}, spans=True)
+        self.assertEqual(20001, len(bashmap.spans['--exec'][0]))
+        self.assertEqual([((len(cmd) - 4, len(cmd) - 2), (len(cmd) - 1, len(cmd)))], bashmap.spans['-p'])
+
+    def test_spans_pickled_and_dropped_on_mutation(self):
+        bashmap = BashMap.fromcmd('curl -P 8080 url', spans=True)
+        unpickled = pickle.loads(pickle.dumps(bashmap))
+        self.assertEqual(bashmap, unpickled)
+        self.assertEqual(bashmap.spans, unpickled.spans)
+
+        for mutate in (lambda b: b.__setitem__('-s', [()]), lambda b: b.pop('-P'), lambda b: b.update(x=[()]),
+                       lambda b: b.setdefault('-v', [()]), lambda b: b.__delitem__('operands'), BashMap.clear):
+            bashmap = pickle.loads(pickle.dumps(unpickled))
+            mutate(bashmap)
+            self.assertIsNone(bashmap.spans)
+
+    def test_views_loaded_once(self):
+        bashmap = BashMap.fromcmd('curl -s -P 8080 www.github.com')
+        self.assertIs(bashmap.simpleoptions, bashmap.simpleoptions)
+        self.assertIs(bashmap.allsimpleoptionargs, bashmap.allsimpleoptionargs)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import pickle
+import unittest
+from bashmap import BashMap
+from model import bashmapcodec
+
+
+class BashMapCodecTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        cmd = 'curl -s -P 8080 --url www.github.com --url www.pypi.org --data "ü=1" someurl'
+        bashmap = BashMap.fromcmd(cmd, limitoverrides={'-s': 0})
+        decoded = BashMap.from_bytes(bashmap.to_bytes())
+        self.assertIsInstance(decoded, BashMap)
+        self.assertEqual(bashmap, decoded)
+        self.assertEqual(list(bashmap), list(decoded))
+
+    def test_repeated_strings_are_stored_once(self):
+        bashmap = BashMap.fromcmd('kubectl -n prod get pods -n prod')
+        self.assertEqual(1, bashmap.to_bytes().count(b'prod'))
+
+    def test_stream(self):
+        bashmaps = [BashMap.fromcmd('curl -s x'), BashMap.fromcmd('ls -l'), BashMap.fromcmd('git status')]
+        stream = io.BytesIO()
+        for bashmap in bashmaps:
+            bashmapcodec.write(stream, bashmap)
+        self.assertEqual(bashmaps, list(bashmapcodec.iterdecode(stream.getvalue())))
+
+    def test_truncated_record_exception(self):
+        data = BashMap.fromcmd('curl -s x').to_bytes()
+        self.assertRaises(ValueError, bashmapcodec.decode, data[:-3])
+        self.assertRaises(ValueError, bashmapcodec.decode, b'\x09' + data[1:])
+
+    def test_pickle_drops_cached_properties(self):
+        bashmap = BashMap.fromcmd('curl -s -P 8080 someurl')
+        bashmap.simpleoptions
+        self.assertIn('simpleoptions', bashmap._views)
+        unpickled = pickle.loads(pickle.dumps(bashmap))
+        self.assertEqual(bashmap, unpickled)
+        self.assertEqual({}, unpickled.__dict__)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
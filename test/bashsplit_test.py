@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 import unittest
 import itertools
-from splitter.bashsplit import split
+import random
+import re
+import shlex
+from splitter.bashsplit import split, split_compound, split_spans
 
 
 class BashSplitTest(unittest.TestCase):
@@ -60,13 +63,112 @@ class BashSplitTest(unittest.TestCase):
         args = split(cmd)
         self.assertEqual(["curl", "-s", "-S", "-P", "8080", "www.github.com"], args)
     
+    def test_quoted_and_escaped_arguments(self):
+        cmd = """curl -H 'X-Id: 5' --data "a=\\"b\\" \\$c" some\\ url ''"""
+        args = split(cmd)
+        self.assertEqual(["curl", "-H", "X-Id: 5", "--data", 'a="b" \\$c', "some url", ""], args)
+
+    def test_unclosed_quotation_exception(self):
+        self.assertRaises(ValueError, split, "curl 'www.github.com")
+        self.assertRaises(ValueError, split, 'curl "www.github.com')
+        self.assertRaises(ValueError, split, "curl www.github.com\\")
+
+    def test_lenient_skips_syntax_check(self):
+        cmd = "curl --ftp-port8084"
+        self.assertRaises(ValueError, split, cmd)
+        self.assertEqual(["curl", "--ftp-port8084"], split(cmd, strict=False))
+
+    def test_matches_shlex_split(self):
+        rnd = random.Random(0)
+        alphabet = ["a", "1", "-", "--", " ", "\t", "'", '"', "\\", "_", "="]
+        for _ in range(5000):
+            cmd = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 12)))
+            try:
+                expected = _shlex_split(cmd)
+            except ValueError:
+                self.assertRaises(ValueError, split, cmd)
+                continue
+            except IndexError:
+                # The shlex implementation can't handle empty or lone dash arguments.
+                continue
+            self.assertEqual(expected, split(cmd), cmd)
+
+    def test_split_compound(self):
+        cmd = "cat f | grep -i 'a|b' && curl -sP 8080 url; ls 2>&1 &>out &"
+        self.assertEqual([(["cat", "f"], "|"),
+                          (["grep", "-i", "a|b"], "&&"),
+                          (["curl", "-s", "-P", "8080", "url"], ";"),
+                          (["ls", "2>&1", "&>out"], "&")], split_compound(cmd))
+        self.assertEqual([(["a"], "||"), (["b"], "|&"), (["c"], None)], split_compound("a||b|&c"))
+        self.assertEqual([], split_compound("  "))
+
+    def test_split_compound_missing_command(self):
+        for cmd in ["| ls", "ls &&", "ls && && b", "ls ;; b", "ls |"]:
+            self.assertRaises(ValueError, split_compound, cmd)
+        self.assertRaises(ValueError, split_compound, 'ls "a | b')
+
+    def test_split_compound_matches_split_without_operators(self):
+        rnd = random.Random(1)
+        alphabet = ["a", "1", "-", "--", " ", "'", '"', "\\", "_", "=", "|", "&"]
+        for _ in range(2000):
+            cmd = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 12)))
+            try:
+                commands = split_compound(cmd, strict=False)
+            except ValueError:
+                continue
+            if len(commands) == 1 and commands[0][1] is None:
+                self.assertEqual(split(cmd, strict=False), commands[0][0], cmd)
+
+    def test_split_spans(self):
+        cmd = 'curl -sSP8080 "www.github.com" --retry=5'
+        args, spans = split_spans(cmd)
+        self.assertEqual(split(cmd), args)
+        self.assertEqual(['curl', '-s', 'S', 'P', '8080', '"www.github.com"', '--retry=5'],
+                         [cmd[start:end] for start, end in spans])
+
+    def test_split_spans_match_split(self):
+        rnd = random.Random(2)
+        alphabet = ["a", "1", "-", "--", " ", "'", '"', "\\", "_", "="]
+        for _ in range(2000):
+            cmd = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 12)))
+            try:
+                args, spans = split_spans(cmd, strict=False)
+            except ValueError:
+                continue
+            self.assertEqual(split(cmd, strict=False), args, cmd)
+            self.assertEqual(len(args), len(spans), cmd)
+            for arg, (start, end) in zip(args, spans):
+                self.assertTrue(0 <= start < end <= len(cmd), cmd)
+                quoted = any(char in cmd[start:end] for char in '\'"\\')
+                self.assertTrue(quoted or arg.lstrip('-') in cmd[start:end], cmd)
+
     def _test_permutations(self, utility, permutables, expected=None):
         for permutationTuple in itertools.permutations(permutables):
             expected = [utility]
             for i in permutationTuple:
                 expected.extend(i.split(" "))
             self.assertEqual(expected, split(" ".join(expected)))
-    
+
+
+def _shlex_split(command):
+    """The original shlex based implementation of `split`, used as the reference for the tokenizer.
+    """
+    args = []
+    for arg in shlex.split(command):
+        if re.match(r'^-\w-', arg) or re.match(r'--\w+-\w+\d', arg):
+            raise ValueError(arg)
+        if arg[0] == '-' and arg[1] != '-' and len(arg) > 2:
+            args.append(arg[0:2])
+            for i, option in enumerate(arg[2:]):
+                if str.isdigit(option):
+                    args.append(arg[2 + i:])
+                    break
+                else:
+                    args.append('-' + option)
+        else:
+            args.append(arg)
+    return args
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+from unittest import mock
+from bashmap import BashMap
+from benchmark.__main__ import compare
+from benchmark.corpus import CORPORA, generate
+from benchmark import group_benchmark
+from parser import bashparse
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_corpora_are_seeded_and_parse(self):
+        for corpus in CORPORA:
+            commands = generate(corpus, 5, seed=1)
+            self.assertEqual(commands, generate(corpus, 5, seed=1))
+            for cmd, limitoverrides in commands:
+                BashMap.fromcmd(cmd, limitoverrides)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'mixed': {'split': {'tokens_per_sec': 1000.0}, 'parse': {'tokens_per_sec': 1000.0}}}
+        results = {'mixed': {'split': {'tokens_per_sec': 850.0}, 'parse': {'tokens_per_sec': 950.0}}}
+        self.assertEqual([('mixed', 'split', 1000.0, 850.0)], compare(results, baseline, 0.1))
+
+    def test_group_accumulation_scales_linearly(self):
+        # Counts the groups stored rather than timing the parse: a linear build stores each group exactly once.
+        args = group_benchmark.make_args(50000)
+        with mock.patch('parser.bashparse._store_optionarguments', wraps=bashparse._store_optionarguments) as store:
+            bashmap = BashMap.fromcmd(' '.join(args), {'-f': None})
+        self.assertEqual(1, store.call_count)
+        self.assertEqual(50000, len(bashmap['-f'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+from bashmap import BashMap
+from benchmark import corpus
+from parser.limitprofiles import LimitProfiles
+from splitter import bashsplit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from parser import bulkparse
+
+
+def tokenize(cmds):
+    tokens, offsets = [], [0]
+    for cmd in cmds:
+        tokens.extend(bashsplit.split(cmd))
+        offsets.append(len(tokens))
+    return tokens, offsets
+
+
+@unittest.skipUnless(numpy, 'numpy is not installed')
+class BulkParseTest(unittest.TestCase):
+
+    def assertMatchesScalar(self, cmds, limitoverrides=None, profiles=None):
+        tokens, offsets = tokenize(cmds)
+        results = bulkparse.parse(tokens, offsets, limitoverrides, profiles)
+        for cmd, result in zip(cmds, results):
+            expected = BashMap.fromcmd(cmd, limitoverrides, profiles=profiles)
+            self.assertEqual(list(expected.items()), list(result.items()), cmd)
+        self.assertEqual(len(cmds), len(results))
+
+    def test_matches_scalar_on_corpora(self):
+        for name in corpus.CORPORA:
+            size = 3 if name == 'long' else 300
+            self.assertMatchesScalar([cmd for cmd, _ in corpus.generate(name, size, seed=1)])
+
+    def test_edge_cases(self):
+        self.assertMatchesScalar([
+            'ls', '-x -y', 'ls -l', 'ls -l -a dir', 'curl -s a b c', 'ls ""', 'ls -l ""', 'cmd - x', 'a -b c -d'])
+
+    def test_overridden_limits_use_scalar_path(self):
+        cmds = ['sips -s format jpeg infile', 'curl -s www.github.com', 'tar -x -f a b', 'git log --all x']
+        self.assertMatchesScalar(cmds, {'-s': 2})
+        self.assertMatchesScalar(cmds, {'-s': 0, '--all': None})
+
+    def test_profiles(self):
+        profiles = LimitProfiles({'sips': {'-s': 2}, 'curl': {'-s': 0}})
+        self.assertMatchesScalar(['sips -s format jpeg', 'curl -s www.github.com', 'ls -s x y'], profiles=profiles)
+
+    def test_fromtokens(self):
+        results = BashMap.fromtokens(['curl', '-s', 'www.github.com', 'ls', '-l'], [0, 3, 5])
+        self.assertEqual([BashMap.fromcmd('curl -s www.github.com'), BashMap.fromcmd('ls -l')], results)
+        self.assertIsInstance(results[0], BashMap)
+
+    def test_malformed_offsets(self):
+        self.assertEqual([], bulkparse.parse([], [0]))
+        with self.assertRaisesRegex(ValueError, 'Command 1 is empty'):
+            bulkparse.parse(['ls', 'pwd'], [0, 1, 1, 2])
+        with self.assertRaises(ValueError):
+            bulkparse.parse(['ls', 'pwd'], [0, 1])
+        with self.assertRaises(ValueError):
+            bulkparse.parse(['ls', 'pwd'], [0, 2, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+from bashmap import BashMap
+from model.commandindex import CommandIndex
+
+
+class CommandIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        cmds = [
+            'curl --insecure -s www.github.com',
+            'kubectl get pods -n prod',
+            'kubectl get svc -n dev',
+            'curl -s www.pypi.org',
+            'kubectl -n prod logs web',
+        ]
+        self.index = CommandIndex()
+        self.index.addresults(BashMap.fromcmds(cmds, limitoverrides={'--insecure': 0, '-s': 0}, workers=1))
+
+    def test_lookup(self):
+        self.assertEqual({0}, self.index.lookup(CommandIndex.option('--insecure')))
+        self.assertEqual({0, 3}, self.index.lookup(CommandIndex.utility('curl')))
+        self.assertEqual({1, 2}, self.index.lookup(CommandIndex.operand('get')))
+        self.assertEqual(frozenset(), self.index.lookup(CommandIndex.utility('wget')))
+
+    def test_query(self):
+        kubectl = CommandIndex.utility('kubectl')
+        prod = CommandIndex.optionarg('-n', 'prod')
+        self.assertEqual({1, 4}, self.index.query(allof=[kubectl, prod]))
+        self.assertEqual({1, 2, 4}, self.index.query(anyof=[prod, CommandIndex.optionarg('-n', 'dev')]))
+        self.assertEqual({1}, self.index.query(allof=[kubectl, prod], noneof=[CommandIndex.operand('logs')]))
+        self.assertEqual({0, 1, 2, 3, 4}, self.index.query())
+
+    def test_add_and_remove(self):
+        self.index.remove(1)
+        self.assertEqual({4}, self.index.query(allof=[CommandIndex.optionarg('-n', 'prod')]))
+        self.index.add(4, BashMap.fromcmd('kubectl -n dev logs web'))
+        self.assertEqual(set(), self.index.query(allof=[CommandIndex.optionarg('-n', 'prod')]))
+        self.assertEqual(4, len(self.index))
+        self.assertRaises(KeyError, self.index.remove, 1)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'commands.idx')
+            self.index.save(path)
+            loaded = CommandIndex.load(path)
+        self.assertEqual(len(self.index), len(loaded))
+        self.assertEqual({1, 4}, loaded.query(allof=[CommandIndex.utility('kubectl'), CommandIndex.optionarg('-n', 'prod')]))
+        loaded.remove(4)
+        self.assertEqual({1}, loaded.lookup(CommandIndex.optionarg('-n', 'prod')))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import collections
+import os
+import tempfile
+import unittest
+from unittest import mock
+from bashmap import BashMap
+from model.commandstore import CommandStore
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+CMDS = [
+    'curl --retry 3 -s www.github.com',
+    'curl --retry 5 -o out www.pypi.org',
+    'kubectl get pods -n prod',
+    'wget --retry 3 www.github.com',
+    'curl --retry 3 -sSP8080 www.github.com',
+    'kubectl -n dev logs web',
+    'curl "unclosed',
+]
+
+
+def expected_counts(cmds):
+    """Counts the utilities, options and option-arguments of the commands from their argument dictionaries.
+    """
+    utilities = collections.Counter()
+    options = {}
+    values = {}
+    for cmd in cmds:
+        try:
+            bashmap = BashMap.fromcmd(cmd)
+        except ValueError:
+            continue
+        utility = bashmap['utility'][0][0]
+        utilities[utility] += 1
+        for key, groups in bashmap.items():
+            if key == 'utility':
+                continue
+            if key != 'operands':
+                options.setdefault(utility, collections.Counter())[key] += len(groups)
+            for group in groups:
+                values.setdefault((utility, key), collections.Counter()).update(group)
+    return utilities, options, values
+
+
+class CommandStoreTest(unittest.TestCase):
+    """Runs the queries with Counter, as when NumPy isn't installed."""
+
+    def setUp(self):
+        patcher = mock.patch('model.commandstore._try_import_numpy', return_value=self.numpy())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = CommandStore()
+        self.addCleanup(self.store.close)
+        self.assertEqual([6], self.store.extend(CMDS))
+
+    def numpy(self):
+        return None
+
+    def assertCounts(self, store, cmds):
+        utilities, options, values = expected_counts(cmds)
+        self.assertEqual(len(cmds) - 1, len(store))
+        self.assertEqual(utilities, store.utilities())
+        self.assertEqual(options, store.optionsbyutility())
+        self.assertEqual(sum(options.values(), collections.Counter()), store.options())
+        for utility in utilities:
+            self.assertEqual(options.get(utility, collections.Counter()), store.options(utility))
+        for (utility, key), counts in values.items():
+            self.assertEqual(counts, store.values(key, utility))
+
+    def test_counts(self):
+        self.assertCounts(self.store, CMDS)
+        self.assertEqual([('3', 3), ('5', 1)], self.store.values('--retry').most_common())
+        self.assertEqual([('curl', 3)], self.store.utilities().most_common(1))
+        self.assertEqual(collections.Counter(), self.store.options('ls'))
+        self.assertEqual(collections.Counter(), self.store.values('--insecure'))
+
+    def test_limitoverrides(self):
+        store = CommandStore()
+        store.add('curl -s www.github.com', limitoverrides={'-s': 0})
+        self.assertEqual(collections.Counter({'www.github.com': 1}), store.values('operands'))
+        self.assertEqual(collections.Counter(), store.values('-s'))
+        self.assertRaises(ValueError, store.add, '')
+
+    def test_addresults_matches_add(self):
+        store = CommandStore()
+        store.addresults(BashMap.fromcmds(CMDS, workers=1))
+        self.assertCounts(store, CMDS)
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = CommandStore(directory, spillrows=4)
+            store.extend(CMDS)
+            self.assertTrue(os.listdir(directory))
+            self.assertCounts(store, CMDS)
+            store.close()
+            self.assertEqual([], os.listdir(directory))
+
+    def test_stores_share_spill_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = CommandStore(directory, spillrows=4)
+            second = CommandStore(directory, spillrows=4)
+            first.extend(CMDS)
+            second.extend(CMDS[::-1] + ['ls -l'])
+            self.assertCounts(first, CMDS)
+            self.assertCounts(second, CMDS[::-1] + ['ls -l'])
+            first.close()
+            self.assertCounts(second, CMDS[::-1] + ['ls -l'])
+            second.close()
+            self.assertEqual([], os.listdir(directory))
+
+    def test_save_and_load(self):
+        self.store.spill()
+        self.store.add('ls -l')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'store.bmcs')
+            self.store.save(path)
+            with CommandStore.load(path) as store:
+                self.assertCounts(store, CMDS + ['ls -l'])
+                store.add('curl --retry 5 url')
+                self.assertEqual(collections.Counter({'3': 3, '5': 2}), store.values('--retry'))
+
+            with open(path, 'r+b') as fh:
+                fh.truncate(os.path.getsize(path) - 8)
+            self.assertRaises(ValueError, CommandStore.load, path)
+            with open(path, 'wb') as fh:
+                fh.write(b'not a store')
+            self.assertRaises(ValueError, CommandStore.load, path)
+
+
+@unittest.skipUnless(numpy, 'NumPy is not installed.')
+class NumpyCommandStoreTest(CommandStoreTest):
+    """Runs the queries with NumPy."""
+
+    def numpy(self):
+        return numpy
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pickle
+import unittest
+from bashmap import BashMap
+from model.frozenbashmap import FrozenBashMap
+
+
+class TaggedFrozenBashMap(FrozenBashMap):
+    __slots__ = ()
+
+
+class FrozenBashMapTest(unittest.TestCase):
+
+    def test_read_api(self):
+        cmd = 'curl -s -P 8080 --url www.github.com --url www.pypi.org someurl'
+        bashmap = BashMap.fromcmd(cmd, limitoverrides={'-s': 0})
+        frozen = bashmap.freeze()
+        self.assertEqual((('curl',),), frozen.utility)
+        self.assertEqual('curl', frozen.simpleutility)
+        self.assertEqual((('someurl',),), frozen.operands)
+        self.assertEqual(('someurl',), frozen.simpleoperands)
+        self.assertEqual(('-s', '-P', '--url'), frozen.simpleoptions)
+        self.assertEqual(('8080', 'www.github.com', 'www.pypi.org'), frozen.allsimpleoptionargs)
+        self.assertEqual(('www.github.com', 'www.pypi.org'), frozen.simpleoptionargs('--url'))
+        self.assertEqual(((),), frozen.vals('-s', '-A'))
+        self.assertEqual(bashmap, frozen.todict())
+        self.assertRaises(KeyError, frozen.__getitem__, '-A')
+
+    def test_equality_and_hash_ignore_key_order(self):
+        first = BashMap.fromcmd('kubectl get pods -n prod').freeze()
+        second = BashMap.fromcmd('kubectl -n prod get pods').freeze()
+        third = BashMap.fromcmd('kubectl -n dev get pods').freeze()
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, third)
+        self.assertEqual(2, len({first, second, third}))
+
+    def test_interned_and_compact(self):
+        first = BashMap.fromcmd('kubectl get pods --namespace prod').freeze()
+        second = BashMap.fromcmd('kubectl get svc --namespace prod').freeze()
+        self.assertIs(list(first)[2], list(second)[2])
+        self.assertIs(first['--namespace'][0][0], second['--namespace'][0][0])
+        self.assertFalse(hasattr(first, '__dict__'))
+
+    def test_mapping_views(self):
+        bashmap = BashMap.fromcmd('curl -s -P 8080 url')
+        frozen = bashmap.freeze()
+        self.assertEqual(bashmap.keys(), frozen.keys())
+        self.assertEqual({'-s', '-P'}, frozen.keys() & {'-s', '-P', '-A'})
+        self.assertEqual([tuple(groups) for groups in bashmap.values()], list(frozen.values()))
+        self.assertIn(('-P', (('8080',),)), frozen.items())
+        self.assertEqual(bashmap, {key: list(groups) for key, groups in frozen.items()})
+
+    def test_pickle(self):
+        frozen = BashMap.fromcmd('curl -s -P 8080').freeze()
+        self.assertEqual(frozen, pickle.loads(pickle.dumps(frozen)))
+        subclassed = pickle.loads(pickle.dumps(TaggedFrozenBashMap(frozen)))
+        self.assertIs(TaggedFrozenBashMap, type(subclassed))
+        self.assertEqual(frozen, subclassed)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
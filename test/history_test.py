@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+from bashmap import BashMap
+
+
+BASH_HISTORY = b"""ls -l
+#1700000000
+curl -s www.github.com
+#1700000005
+git commit -m "msg"
+
+curl -s-S
+"""
+
+ZSH_HISTORY = b""": 1700000000:0;ls -l
+: 1700000003:12;git commit -m "one\\
+two"
+: 1700000020:0;echo \x83\xa3
+: 1700000030:1;curl -s www.github.com
+"""
+
+
+class HistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def write(self, data, repeat=1):
+        path = os.path.join(self.directory, 'history')
+        with open(path, 'wb') as fh:
+            fh.write(data * repeat)
+        return path
+
+    def test_bash_history(self):
+        path = self.write(BASH_HISTORY)
+        entries = list(BashMap.fromhistory(path, workers=1))
+        self.assertEqual(['ls -l', 'curl -s www.github.com', 'git commit -m "msg"', 'curl -s-S'],
+                         [entry.command for entry in entries])
+        self.assertEqual([None, 1700000000, 1700000005, None], [entry.timestamp for entry in entries])
+        self.assertEqual([0, 6, 41, 74], [entry.offset for entry in entries])
+        self.assertEqual(BashMap.fromcmd('curl -s www.github.com'), entries[1].bashmap)
+        self.assertIsNone(entries[3].bashmap)
+        self.assertIsInstance(entries[3].error, ValueError)
+
+    def test_zsh_history(self):
+        path = self.write(ZSH_HISTORY)
+        entries = list(BashMap.fromhistory(path, workers=1))
+        self.assertEqual(['ls -l', 'git commit -m "one\ntwo"', 'echo \x83', 'curl -s www.github.com'],
+                         [entry.command.replace('�', '\x83') for entry in entries])
+        self.assertEqual([1700000000, 1700000003, 1700000020, 1700000030], [entry.timestamp for entry in entries])
+        self.assertEqual([0, 12, 0, 1], [entry.duration for entry in entries])
+        self.assertEqual([('one\ntwo',)], entries[1].bashmap['-m'])
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        for entry in entries:
+            self.assertTrue(data[entry.offset:].startswith(b': '))
+
+    def test_chunks_align_to_entries(self):
+        for history, format in ((BASH_HISTORY, 'bash'), (ZSH_HISTORY, 'zsh')):
+            path = self.write(history, repeat=20)
+            expected = list(BashMap.fromhistory(path, format, workers=1))
+            for chunksize in (1, 7, 16, 50):
+                entries = list(BashMap.fromhistory(path, format, workers=1, chunksize=chunksize))
+                self.assertEqual([entry[:4] for entry in expected], [entry[:4] for entry in entries])
+
+    def test_parallel_workers(self):
+        path = self.write(ZSH_HISTORY, repeat=50)
+        expected = list(BashMap.fromhistory(path, workers=1))
+        entries = list(BashMap.fromhistory(path, workers=2, chunksize=256))
+        self.assertEqual(200, len(entries))
+        self.assertEqual([entry[:5] for entry in expected], [entry[:5] for entry in entries])
+
+    def test_empty_file_and_unknown_format(self):
+        self.assertEqual([], list(BashMap.fromhistory(self.write(b''))))
+        with self.assertRaises(ValueError):
+            list(BashMap.fromhistory(self.write(BASH_HISTORY), format='fish'))
+
+
+if __name__ == '__main__':
+    unittest.main()
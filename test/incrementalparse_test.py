@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import unittest
+from bashmap import BashMap
+from parser.incrementalparse import IncrementalParser
+from parser.limitprofiles import LimitProfiles
+
+
+class IncrementalParserTest(unittest.TestCase):
+
+    def assertMatchesFullParse(self, parser, limitoverrides=None, profiles=None):
+        try:
+            expected = BashMap.fromcmd(parser.text, limitoverrides, profiles=profiles)
+        except ValueError:
+            self.assertTrue(parser.error is not None or not parser.text.strip())
+            return
+        self.assertIsNone(parser.error)
+        self.assertEqual(expected, parser.argdict)
+        self.assertEqual(list(expected.items()), list(parser.argdict.items()))
+
+    def test_typing_one_character_at_a_time(self):
+        cmd = 'curl -sSP 8080 --header "Accept: */*" www.github.com'
+        parser = IncrementalParser()
+        for i, char in enumerate(cmd):
+            parser.insert(i, char)
+            self.assertEqual(cmd[:i + 1], parser.text)
+            self.assertMatchesFullParse(parser)
+
+    def test_backspacing_to_empty(self):
+        parser = IncrementalParser('sips -s format jpeg infile --out outfile', {'-s': 2})
+        while parser.text:
+            parser.delete(len(parser.text) - 1, 1)
+            self.assertMatchesFullParse(parser, {'-s': 2})
+        self.assertEqual({}, parser.argdict)
+
+    def test_edit_in_the_middle(self):
+        parser = IncrementalParser('curl -s www.github.com -o out')
+        parser.edit(5, 2, '--silent')
+        self.assertEqual('curl --silent www.github.com -o out', parser.text)
+        self.assertMatchesFullParse(parser)
+
+    def test_unclosed_quotation_keeps_prefix(self):
+        parser = IncrementalParser('curl -H "Accept')
+        self.assertIsInstance(parser.error, ValueError)
+        self.assertEqual({'utility': [('curl',)], '-H': [()]}, parser.argdict)
+        parser.insert(len(parser.text), '"')
+        self.assertIsNone(parser.error)
+        self.assertEqual([('Accept',)], parser.argdict['-H'])
+
+    def test_changing_utility_switches_profile(self):
+        profiles = LimitProfiles({'sips': {'-s': 2}})
+        parser = IncrementalParser('sips -s format jpeg', profiles=profiles)
+        self.assertEqual([('format', 'jpeg')], parser.argdict['-s'])
+        parser.edit(0, 4, 'curl')
+        self.assertMatchesFullParse(parser, profiles=profiles)
+
+    def test_edit_outside_command_raises(self):
+        parser = IncrementalParser('curl')
+        with self.assertRaises(IndexError):
+            parser.insert(5, 'x')
+        with self.assertRaises(IndexError):
+            parser.delete(2, 3)
+
+    def test_random_edits_match_full_parse(self):
+        rng = random.Random(0)
+        alphabet = ['a', 'b', '1', '-', '--', ' ', ' ', '"', "'", '\\']
+        limitoverrides = {'-a': 2, '--b': None, '-1': 0}
+        parser = IncrementalParser('', limitoverrides, strict=False)
+        for _ in range(2000):
+            text = parser.text
+            offset = rng.randint(0, len(text))
+            length = rng.randint(0, min(3, len(text) - offset))
+            insert = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+            parser.edit(offset, length, insert)
+            try:
+                expected = BashMap.fromcmd(parser.text, limitoverrides, strict=False)
+            except ValueError:
+                self.assertTrue(parser.error is not None or not parser.text.strip())
+                continue
+            self.assertEqual(list(expected.items()), list(parser.argdict.items()), parser.text)
+
+    def test_random_edits_with_spec_match_full_parse(self):
+        profiles = LimitProfiles({'a': {'getopt': 'ab:'}, 'b': {'getopt': 'b:', '-b': 2}})
+        # Clusters that are guessed once a letter isn't in the spec, but end with an option of it.
+        for cmd, strict in (('a b -a-ab -b--1-', False), ('  "a" a1b a -1a-b -1-- -', True)):
+            parser = IncrementalParser('', strict=strict, profiles=profiles)
+            for offset, char in enumerate(cmd):
+                parser.insert(offset, char)
+            self.assertEqual(BashMap.fromcmd(cmd, strict=strict, profiles=profiles), parser.argdict)
+            self.assertIsNone(parser.error)
+        alphabet = ['a', 'b', '1', '-', '--', ' ', ' ', '"']
+        for strict in (False, True):
+            rng = random.Random(1)
+            parser = IncrementalParser('', strict=strict, profiles=profiles)
+            for _ in range(3000):
+                text = parser.text
+                offset = rng.randint(0, len(text))
+                length = rng.randint(0, min(3, len(text) - offset))
+                parser.edit(offset, length, ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 3))))
+                try:
+                    expected = BashMap.fromcmd(parser.text, strict=strict, profiles=profiles)
+                except ValueError:
+                    self.assertTrue(parser.error is not None or not parser.text.strip(), parser.text)
+                    continue
+                self.assertIsNone(parser.error, parser.text)
+                self.assertEqual(list(expected.items()), list(parser.argdict.items()), parser.text)
+
+    def test_long_group(self):
+        parser = IncrementalParser('find . --exec', {'--exec': None})
+        for i in range(3000):
+            parser.insert(len(parser.text), ' arg{}'.format(i))
+        self.assertEqual(3000, len(parser.argdict['--exec'][0]))
+        middle = parser.text.index(' arg1500 ')
+        parser.edit(middle, 1, ' -print ')
+        self.assertEqual(BashMap.fromcmd(parser.text, {'--exec': None}), parser.argdict)
+        parser.delete(middle, len(parser.text) - middle)
+        self.assertEqual(BashMap.fromcmd(parser.text, {'--exec': None}), parser.argdict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import tracemalloc
+import unittest
+from bashmap import BashMap
+from utils.instrumentation import instrumentation
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_by_default(self):
+        BashMap.fromcmd('curl -s www.github.com')
+        self.assertEqual({}, instrumentation.stats())
+
+    def test_stage_counters(self):
+        instrumentation.enable()
+        BashMap.fromcmd('curl -sSP8080 www.github.com')
+        BashMap.fromcmd('git status')
+        stats = instrumentation.stats()
+        self.assertEqual(['split', 'array', 'parse'], list(stats))
+        self.assertEqual(2, stats['split'].calls)
+        self.assertEqual(8, stats['parse'].tokens)
+        self.assertEqual(0, stats['parse'].allocated)
+        self.assertIn('split', instrumentation.summary())
+
+    def test_hooks_and_allocations(self):
+        measurements = []
+        hook = lambda *measurement: measurements.append(measurement)
+        instrumentation.add_hook(hook)
+        try:
+            instrumentation.enable(track_allocations=True)
+            BashMap.fromcmd('curl -s www.github.com')
+        finally:
+            instrumentation.remove_hook(hook)
+        self.assertEqual(['split', 'array', 'parse'], [measurement[0] for measurement in measurements])
+        self.assertTrue(all(measurement[3] > 0 for measurement in measurements))
+
+    def test_leaves_callers_tracing_running(self):
+        tracemalloc.start()
+        try:
+            instrumentation.enable(track_allocations=True)
+            instrumentation.disable()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        instrumentation.enable(track_allocations=True)
+        instrumentation.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_worker_stats_are_merged(self):
+        instrumentation.enable()
+        list(BashMap.fromcmds(['curl -s x', 'git status', 'ls -l'], workers=2, chunksize=1))
+        self.assertEqual(3, instrumentation.stats()['parse'].calls)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
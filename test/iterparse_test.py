@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import itertools
+import unittest
+from unittest import mock
+from bashmap import BashMap
+from parser.iterparse import collect, iterparse
+from parser.limitprofiles import LimitProfiles
+from parser.optionspec import OptionSpec
+
+
+CMDS = [
+    'curl -sSP8080 www.github.com www.pypi.org',
+    'curl -o -out --retry=5 --silent url',
+    'sips -s format jpeg image.png',
+    'grep -ie -a -b file',
+    'tool -d1 -2 -3 --data=a -b c -a p q -r',
+    '-abc -d x',
+    'cat - ""',
+    'git',
+]
+
+
+class IterParseTest(unittest.TestCase):
+
+    def test_events(self):
+        events = list(iterparse('curl -s "a b" -P 8080 --url x', {'-s': 0}))
+        self.assertEqual([('utility', 'curl'), ('option', '-s'), ('operand', 'a b'), ('option', '-P'),
+                          ('optarg', '8080'), ('option', '--url'), ('optarg', 'x')], events)
+
+    def test_collect_matches_fromcmd(self):
+        profiles = LimitProfiles({
+            'curl': OptionSpec('sSP:o:', ['retry=', 'silent']),
+            'grep': {'getopt': 'ie:', '-e': 2},
+            'tool': OptionSpec.fromtable({'-d': 2, '--data': 2, '-a': None}),
+            'sips': {'-s': 2},
+        })
+        for cmd in CMDS:
+            for limitoverrides, registry in itertools.product((None, {'-s': 0}), (None, profiles)):
+                self.assertEqual(BashMap.fromcmd(cmd, limitoverrides, profiles=registry),
+                                 collect(iterparse(cmd, limitoverrides, profiles=registry)), cmd)
+
+    def test_collect_long_group(self):
+        cmd = 'find . --exec ' + ' '.join('arg{}'.format(i) for i in range(50000)) + ' -print'
+        self.assertEqual(BashMap.fromcmd(cmd, {'--exec': None}), collect(iterparse(cmd, {'--exec': None})))
+
+    def test_stops_early(self):
+        self.assertEqual(('utility', 'curl'), next(iterparse('curl -s-S "unclosed')))
+        events = iterparse('curl -s -P 8080 -s-S')
+        self.assertIn(('option', '-P'), itertools.islice(events, 3))
+        self.assertRaises(ValueError, list, events)
+
+        with mock.patch('splitter.bashsplit._check_syntax') as check:
+            events = iterparse(' '.join(['ls'] + ['-l'] * 1000))
+            self.assertEqual([('utility', 'ls'), ('option', '-l')], list(itertools.islice(events, 2)))
+            self.assertLessEqual(check.call_count, 3)
+
+    def test_empty_command_exception(self):
+        self.assertRaises(ValueError, list, iterparse(''))
+        self.assertRaises(ValueError, list, iterparse('   '))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+from bashmap import BashMap
+from parser.limitprofiles import LimitProfiles
+
+
+class LimitProfilesTest(unittest.TestCase):
+
+    def test_profile_picked_from_utility(self):
+        profiles = LimitProfiles({'sips': {'-s': 2}, 'curl': {'-s': 0}})
+        bashmap = BashMap.fromcmd('sips -s format jpeg infile', profiles=profiles)
+        self.assertEqual([('format', 'jpeg')], bashmap['-s'])
+        bashmap = BashMap.fromcmd('curl -s www.github.com', profiles=profiles)
+        self.assertEqual([()], bashmap['-s'])
+        self.assertEqual([('www.github.com',)], bashmap['operands'])
+
+    def test_utility_path_uses_profile(self):
+        profiles = LimitProfiles({'curl': {'-s': 0}})
+        bashmap = BashMap.fromcmd('/usr/bin/curl -s www.github.com', profiles=profiles)
+        self.assertEqual([()], bashmap['-s'])
+
+    def test_limitoverrides_take_precedence(self):
+        profiles = LimitProfiles({'sips': {'-s': 2, '--out': 0}})
+        bashmap = BashMap.fromcmd('sips -s format jpeg --out outfile', limitoverrides={'-s': 1}, profiles=profiles)
+        self.assertEqual([('format',)], bashmap['-s'])
+        self.assertEqual([()], bashmap['--out'])
+        self.assertEqual([('jpeg',), ('outfile',)], bashmap['operands'])
+
+    def test_invalid_limit_exception(self):
+        self.assertRaises(ValueError, LimitProfiles, {'sips': {'-s': -1}})
+        self.assertRaises(ValueError, LimitProfiles, {'sips': {'-s': 'two'}})
+
+    def test_fromfile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            jsonpath = os.path.join(directory, 'profiles.json')
+            with open(jsonpath, 'w') as fh:
+                fh.write('{"sips": {"-s": 2}, "rm": {"-f": null}}')
+            profiles = LimitProfiles.fromfile(jsonpath)
+            self.assertEqual({'-s': 2}, profiles.limits('sips'))
+            self.assertEqual({'-f': None}, profiles.limits('rm'))
+            self.assertEqual({}, profiles.limits('curl'))
+
+            tomlpath = os.path.join(directory, 'profiles.toml')
+            with open(tomlpath, 'w') as fh:
+                fh.write('[sips]\n"-s" = 2\n\n[rm]\n"-f" = "inf"\n')
+            try:
+                profiles = LimitProfiles.fromfile(tomlpath)
+            except ImportError:
+                self.skipTest('No TOML parser available.')
+            self.assertEqual({'-s': 2}, profiles.limits('sips'))
+            self.assertEqual({'-f': None}, profiles.limits('rm'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
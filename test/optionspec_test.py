@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+from bashmap import BashMap
+from parser.incrementalparse import IncrementalParser
+from parser.limitprofiles import LimitProfiles
+from parser.optionspec import OptionSpec
+from splitter import bashsplit
+
+
+class OptionSpecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiles = LimitProfiles({
+            'curl': OptionSpec('sSP:o:', ['retry=', 'silent']),
+            'grep': {'getopt': 'ie:', '-e': 2},
+            'tool': OptionSpec.fromtable({'-d': 2, '--data': 2, '-a': None}),
+        })
+
+    def test_compile(self):
+        spec = OptionSpec('+sSP:', ['retry=', '--silent'])
+        self.assertEqual({'-s': 0, '-S': 0, '-P': 1, '--retry': 1, '--silent': 0}, spec.arity)
+        self.assertEqual(frozenset(('-P', '--retry')), spec.required)
+        self.assertEqual(spec, OptionSpec.fromtable(spec.arity))
+
+    def test_malformed_spec_exception(self):
+        self.assertRaises(ValueError, OptionSpec, 'o::')
+        self.assertRaises(ValueError, OptionSpec, 's-P')
+        self.assertRaises(ValueError, OptionSpec, '', ['='])
+        self.assertRaises(ValueError, OptionSpec.fromtable, {'d': 1})
+        self.assertRaises(ValueError, OptionSpec.fromtable, {'-d': -1})
+
+    def test_cluster_expanded_by_spec(self):
+        args = bashsplit.split('curl -sSP8080 -Po -sq9 url', profiles=self.profiles)
+        self.assertEqual(['curl', '-s', '-S', '-P', '8080', '-P', 'o', '-s', '-q', '9', 'url'], args)
+
+    def test_declared_optionarguments_taken_as_they_are(self):
+        bashmap = BashMap.fromcmd('curl -o -out --retry=5 --silent url', profiles=self.profiles)
+        self.assertEqual([('-out',)], bashmap['-o'])
+        self.assertEqual([('5',)], bashmap['--retry'])
+        self.assertEqual([()], bashmap['--silent'])
+        self.assertEqual([('url',)], bashmap['operands'])
+
+        bashmap = BashMap.fromcmd('grep -ie -a -b file', profiles=self.profiles)
+        self.assertEqual([('-a', '-b')], bashmap['-e'])
+        self.assertEqual([('file',)], bashmap['operands'])
+
+    def test_multiple_optionarguments(self):
+        bashmap = BashMap.fromcmd('tool -d1 -2 -3 --data=a -b c -a p q -r', profiles=self.profiles)
+        self.assertEqual([('1', '-2')], bashmap['-d'])
+        self.assertEqual([('a', '-b')], bashmap['--data'])
+        self.assertEqual([('p', 'q')], bashmap['-a'])
+        self.assertEqual([('c',)], bashmap['operands'])
+
+    def test_utility_without_spec_keeps_heuristics(self):
+        cmd = 'wget -sSP8080 -o -out --retry=5'
+        self.assertEqual(BashMap.fromcmd(cmd), BashMap.fromcmd(cmd, profiles=self.profiles))
+        self.assertEqual([('-out',)], BashMap.fromcmd('/usr/bin/curl -o -out', profiles=self.profiles)['-o'])
+
+    def test_limits_take_precedence_over_spec(self):
+        profiles = LimitProfiles({'grep': {'getopt': 'ie:', '-e': 2}, 'curl': OptionSpec('sSP:')})
+        self.assertEqual(({'-i': 0, '-e': 2}, frozenset(('-e',))), profiles.options('grep'))
+        self.assertEqual(({'-s': 0, '-S': 0, '-P': 0}, frozenset()), profiles.options('curl', {'-P': 0}))
+
+        bashmap = BashMap.fromcmd('grep -e foo -ie bar', profiles=profiles)
+        self.assertEqual([('foo', '-ie')], bashmap['-e'])
+        self.assertEqual([('bar',)], bashmap['operands'])
+
+        bashmap = BashMap.fromcmd('curl -P -sS url', {'-P': 0}, profiles=profiles)
+        self.assertEqual({'utility': [('curl',)], '-P': [()], '-s': [()], '-S': [()], 'operands': [('url',)]}, bashmap)
+        bashmap = BashMap.fromcmd('curl -P -sS url', {'-P': 2}, profiles=profiles)
+        self.assertEqual({'utility': [('curl',)], '-P': [('-sS', 'url')]}, bashmap)
+
+        for cmd, limitoverrides in (('grep -e foo -ie bar', None), ('curl -P -sS url', {'-P': 0}),
+                                    ('curl -sP8080 -x -sS', {'-P': 2}), ('curl -P -sS url', {'-s': 1})):
+            expected = BashMap.fromcmd(cmd, limitoverrides, profiles=profiles)
+            parser = IncrementalParser(limitoverrides=limitoverrides, profiles=profiles)
+            for offset, char in enumerate(cmd):
+                parser.insert(offset, char)
+            self.assertEqual(expected, parser.argdict, cmd)
+            self.assertEqual([expected], [link.bashmap for link in BashMap.fromcompound(cmd, limitoverrides, profiles=profiles)])
+
+    def test_guessed_cluster_ending_with_spec_option(self):
+        profiles = LimitProfiles({'curl': {'getopt': 'sSP:'}})
+        for cmd in ('curl -P -sS url', 'curl -vP -sS url', 'curl -vqP -sS url'):
+            bashmap = BashMap.fromcmd(cmd, profiles=profiles)
+            self.assertEqual([('-sS',)], bashmap['-P'], cmd)
+            self.assertEqual([('url',)], bashmap['operands'], cmd)
+            parser = IncrementalParser(profiles=profiles)
+            for offset, char in enumerate(cmd):
+                parser.insert(offset, char)
+            self.assertEqual(bashmap, parser.argdict, cmd)
+
+    def test_compound_and_incremental_agree(self):
+        links = BashMap.fromcompound('grep -ie -x f | curl -sP8080', profiles=self.profiles)
+        self.assertEqual([('-x', 'f')], links[0].bashmap['-e'])
+        self.assertEqual([('8080',)], links[1].bashmap['-P'])
+
+        cmd = 'curl -sSP8080 -o -out --retry=5 url'
+        parser = IncrementalParser(profiles=self.profiles)
+        for offset, char in enumerate(cmd):
+            parser.insert(offset, char)
+        self.assertEqual(bashsplit.split(cmd, profiles=self.profiles), parser.args)
+        self.assertEqual(BashMap.fromcmd(cmd, profiles=self.profiles), parser.argdict)
+        parser.edit(0, 4, 'wget')
+        self.assertEqual(BashMap.fromcmd('wget' + cmd[4:]), parser.argdict)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
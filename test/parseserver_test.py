@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from bashmap import BashMap
+from server.parseclient import ParseClient
+from server.parseserver import ParseServer
+
+
+class ParseServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bashmap.sock')
+        self.server = ParseServer(self.path)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        shutil.rmtree(self.directory)
+
+    def test_parse(self):
+        with ParseClient(self.path) as client:
+            self.assertEqual(BashMap.fromcmd('curl -sSP 8080 www.github.com'), client.parse('curl -sSP 8080 www.github.com'))
+            self.assertEqual([('format', 'jpeg')], client.parse('sips -s format jpeg', {'-s': 2})['-s'])
+            self.assertEqual([('jpeg',)], client.parse('sips -s format jpeg')['operands'])
+
+    def test_error_reply_keeps_connection(self):
+        with ParseClient(self.path) as client:
+            with self.assertRaisesRegex(ValueError, 'No closing quotation'):
+                client.parse('curl "www.github.com')
+            self.assertEqual([('ls',)], client.parse('ls')['utility'])
+
+    def test_pipelined_requests_answered_in_order(self):
+        cmds = ['git commit -m "msg {}"'.format(i) for i in range(500)]
+        with ParseClient(self.path) as client:
+            results = list(client.parsemany(cmds))
+        self.assertEqual([BashMap.fromcmd(cmd) for cmd in cmds], results)
+
+    def test_concurrent_clients_share_cache(self):
+        errors = []
+
+        def run(n):
+            try:
+                with ParseClient(self.path) as client:
+                    for i in range(50):
+                        cmd = 'ls -l dir{}'.format(i % 10)
+                        if client.parse(cmd) != BashMap.fromcmd(cmd):
+                            errors.append(cmd)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        info = self.server.cache.info()
+        self.assertEqual(10, info.misses)
+        self.assertEqual(390, info.hits)
+
+    def test_malformed_request(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(self.path)
+            conn.sendall(b'not json\n{"cmd": "ls"}\n')
+            reader = conn.makefile('rb')
+            self.assertIn(b'"error"', reader.readline())
+            self.assertIn(b'Request has no command.', reader.readline())
+
+    def test_second_daemon_refused(self):
+        with self.assertRaises(OSError):
+            asyncio.run(ParseServer(self.path).start())
+
+
+class ParseClientTest(unittest.TestCase):
+
+    def test_no_daemon_raises_oserror(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(OSError):
+                ParseClient(os.path.join(directory, 'missing.sock'))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import ast
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that importing bashmap loads on top of a bare interpreter.
+MODULE_BUDGET = 40
+# Seconds spent importing bashmap in the fastest of IMPORT_RUNS runs. The import takes a few milliseconds, so the
+# budget only trips when something heavy is imported, not when the machine is busy.
+IMPORT_TIME_BUDGET = 0.5
+IMPORT_RUNS = 5
+
+# Reports back with repr rather than json, which must not be imported before the checks run.
+PROBE = """
+import sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+import bashmap
+elapsed = time.perf_counter() - started
+sys.argv = ['bashmap'] + {argv!r}
+if {argv!r}:
+    try:
+        bashmap.main()
+    except SystemExit:
+        pass
+print(repr({{'elapsed': elapsed, 'new': sorted(set(sys.modules) - before), 'loaded': sorted(sys.modules)}}), file=sys.stderr)
+"""
+
+
+def probe(*argv):
+    process = subprocess.run([sys.executable, '-c', PROBE.format(argv=list(argv))], cwd=ROOT,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return ast.literal_eval(process.stderr.splitlines()[-1])
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_import_within_budget(self):
+        result = min((probe() for _ in range(IMPORT_RUNS)), key=lambda result: result['elapsed'])
+        self.assertLessEqual(len(result['new']), MODULE_BUDGET, result['new'])
+        self.assertLess(result['elapsed'], IMPORT_TIME_BUDGET)
+
+    def test_import_skips_cli_modules(self):
+        loaded = set(probe()['loaded'])
+        for module in ('argparse', 'ast', 'json', 'pprint', 'concurrent.futures', 'tracemalloc', 'asyncio'):
+            self.assertNotIn(module, loaded)
+
+    def test_single_command_loads_only_its_path(self):
+        loaded = set(probe('curl -s www.github.com')['loaded'])
+        self.assertIn('argparse', loaded)
+        for module in ('ast', 'json', 'pprint', 'concurrent.futures', 'model.bashmapcodec', 'parser.limitprofiles'):
+            self.assertNotIn(module, loaded)
+        self.assertIn('ast', probe('-l', "{'-s': 0}", 'curl -s www.github.com')['loaded'])
+        self.assertIn('pprint', probe('-p', 'curl -s www.github.com')['loaded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
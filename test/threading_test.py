@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+from bashmap import BashMap
+from utils.instrumentation import instrumentation
+from utils.parsecache import ParseCache
+
+
+THREADS = 8
+
+
+def make_corpus(count, seed=0):
+    """Builds a seeded corpus of cmds, with repeats so that a shared cache gets hits.
+    """
+    rng = random.Random(seed)
+    utilities = ['curl', 'git', 'ls', 'sips', 'kubectl']
+    options = ['-s', '-S', '-P', '-sSP', '--retry', '--url=x', '-n', '-l']
+    cmds = []
+    for _ in range(count):
+        words = [rng.choice(utilities)]
+        for _ in range(rng.randrange(6)):
+            words.append(rng.choice(options))
+            if rng.random() < 0.5:
+                words.append(str(rng.randrange(20)))
+        cmds.append(' '.join(words))
+    cmds.append('curl -s-S')
+    return cmds
+
+
+def run_threads(target, threads=THREADS):
+    """Starts the threads together and waits for them, re-raising the first error any of them hit.
+    """
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def run(number):
+        barrier.wait()
+        try:
+            target(number)
+        except BaseException as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=run, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+def parse(cmd, cache=None):
+    try:
+        return BashMap.fromcmd(cmd, cache=cache)
+    except ValueError as error:
+        return str(error)
+
+
+class ThreadingTest(unittest.TestCase):
+
+    def setUp(self):
+        # Switches threads as often as possible to shake out races under the GIL.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        self.cmds = make_corpus(400)
+        self.expected = [parse(cmd) for cmd in self.cmds]
+
+    def test_shared_cache(self):
+        cache = ParseCache(maxsize=256, shards=8)
+        results = [None] * THREADS
+
+        def target(number):
+            # Each thread walks the corpus from a different place so they contend on the same keys.
+            offset = number * len(self.cmds) // THREADS
+            order = list(range(offset, len(self.cmds))) + list(range(offset))
+            parsed = [None] * len(self.cmds)
+            for index in order:
+                parsed[index] = parse(self.cmds[index], cache)
+            results[number] = parsed
+
+        run_threads(target)
+        for parsed in results:
+            self.assertEqual(self.expected, parsed)
+        info = cache.info()
+        self.assertEqual(THREADS * len(self.cmds), info.hits + info.misses)
+        self.assertLessEqual(info.currsize, cache.maxsize)
+        self.assertEqual(info.currsize, len(cache))
+
+    def test_shared_bashmaps(self):
+        bashmaps = [bashmap for bashmap in self.expected if isinstance(bashmap, BashMap)]
+        expected = [(bashmap.simpleutility, bashmap.simpleoptions, bashmap.allsimpleoptionargs) for bashmap in bashmaps]
+        shared = [BashMap(bashmap) for bashmap in bashmaps]
+        seen = [None] * THREADS
+
+        def target(number):
+            seen[number] = [(bashmap.simpleutility, bashmap.simpleoptions, bashmap.allsimpleoptionargs) for bashmap in shared]
+
+        run_threads(target)
+        for views in seen:
+            self.assertEqual(expected, views)
+            # Every thread gets the same list for each view, loaded once.
+            for mine, first in zip(views, seen[0]):
+                self.assertIs(first[1], mine[1])
+                self.assertIs(first[2], mine[2])
+
+    def test_instrumentation(self):
+        instrumentation.reset()
+        instrumentation.enable()
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+        run_threads(lambda number: [parse(cmd) for cmd in self.cmds[:50]])
+        self.assertEqual(THREADS * 50, instrumentation.stats()['split'].calls)
+
+    def test_fromcmds_threads(self):
+        results = list(BashMap.fromcmds(self.cmds, workers=4, chunksize=16, executor='thread'))
+        self.assertEqual(list(range(len(self.cmds))), [result.index for result in results])
+        self.assertEqual(self.expected, [result.bashmap if result.error is None else str(result.error) for result in results])
+
+        unordered = BashMap.fromcmds(self.cmds, workers=4, chunksize=16, ordered=False, executor='thread')
+        self.assertEqual(len(self.cmds), len({result.index for result in unordered}))
+        self.assertRaises(ValueError, list, BashMap.fromcmds(self.cmds, executor='fiber'))
+
+    @unittest.skipUnless(getattr(sys, '_is_gil_enabled', lambda: True)() is False and (os.cpu_count() or 1) >= 2,
+                         'Threads only parse in parallel on a free-threaded build with several CPUs.')
+    def test_throughput_scales(self):
+        cmds = make_corpus(4000)
+
+        def elapsed(threads):
+            share = len(cmds) // threads
+            start = time.perf_counter()
+            run_threads(lambda number: [parse(cmd) for cmd in cmds[number * share:(number + 1) * share]], threads)
+            return time.perf_counter() - start
+
+        sys.setswitchinterval(0.005)
+        elapsed(1)
+        threads = min(4, os.cpu_count())
+        self.assertLess(elapsed(threads), elapsed(1) / (threads / 2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,22 @@
+"""cpucount - Counts the CPUs the current process may run on.
+
+Used to pick the default number of workers for batch parsing. Unlike `os.cpu_count`, the count
+honors the process's CPU affinity where the platform reports it, such as under `taskset`.
+
+Example:
+    >>> cpucount()
+    4
+"""
+import os
+
+
+def cpucount():
+    """Counts the CPUs the current process may run on.
+
+    Returns:
+        int -- The number of CPUs in the process's affinity mask if the platform reports it, otherwise the number
+        of CPUs in the system, and at least 1.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
@@ -0,0 +1,223 @@
+"""history - Reads and parses bash and zsh history files in parallel.
+
+The file is memory-mapped and cut into chunks that each start at the beginning of an entry, so
+every chunk can be read and parsed by a worker process on its own. Both history formats are
+understood:
+
+    bash, with optional HISTTIMEFORMAT timestamps:   #1700000000
+                                                     curl -s www.github.com
+    zsh EXTENDED_HISTORY, with continuation lines:   : 1700000000:0;git commit -m "one\\
+                                                     two"
+
+Example:
+    >>> for entry in read('~/.zsh_history', BashMap):
+    ...     print(entry.offset, entry.timestamp, entry.bashmap)
+    0 1700000000 {'utility': [('curl',)], '-s': [('www.github.com',)]}
+"""
+import itertools
+import mmap
+import os
+import re
+
+
+# A zsh extended history entry: `: <start time>:<elapsed seconds>;<command>`.
+_ZSH_ENTRY = re.compile(rb': *(\d+):(\d+);(.*)', re.DOTALL)
+# A bash timestamp line, written before its command when HISTTIMEFORMAT is set.
+_BASH_TIMESTAMP = re.compile(rb'#(\d+)')
+# zsh escapes bytes that clash with its tokens as this marker followed by the byte xor 32.
+_ZSH_META = 0x83
+
+
+def read(path, cls, format=None, limitoverrides=None, workers=None, chunksize=1 << 22, strict=True, profiles=None):
+    """Reads every command of a history file and converts it into an argument dictionary. The entries are yielded in
+    file order while later chunks are still being parsed.
+
+    Arguments:
+        path {str} -- The path of the history file.
+        cls {type} -- The BashMap class to create.
+
+    Keyword Arguments:
+        format {str} -- The history format, 'bash' or 'zsh'. Detected from the start of the file if None. (default: {None})
+        limitoverrides {dict} -- The limits override dictionary indicating how many option-arguments an option can receive. (default: {dict()})
+        workers {int} -- The number of worker processes. Parses in the calling process if 1. (default: {the number of CPUs the process may run on})
+        chunksize {int} -- The approximate number of bytes parsed by a worker at a time. (default: {4 MiB})
+        strict {bool} -- Checks every argument for invalid syntax. (default: {True})
+        profiles {LimitProfiles} -- The registry of limits override dictionaries keyed by utility. (default: {None})
+
+    Raises:
+        ValueError: The format is unknown.
+
+    Yields:
+        HistoryEntry -- The entries of the file, in order.
+    """
+    if format not in (None, 'bash', 'zsh'):
+        raise ValueError('Unknown history format "{}".'.format(format))
+    if limitoverrides is None:
+        limitoverrides = {}
+    if workers is None:
+        from utils.cpucount import cpucount
+        workers = cpucount()
+    path = os.path.expanduser(path)
+
+    with open(path, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if format is None:
+                format = 'zsh' if _ZSH_ENTRY.match(data[:64]) else 'bash'
+            bounds = _chunk_bounds(data, size, chunksize, format == 'zsh')
+
+    chunks = [(path, start, end, format == 'zsh', cls, limitoverrides, strict, profiles)
+              for start, end in zip(bounds, bounds[1:])]
+    if workers <= 1 or len(chunks) == 1:
+        for chunk in chunks:
+            yield from _read_chunk(*chunk)
+        return
+
+    import collections
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keeps a bounded number of chunks in flight, so a huge file is never held in memory all at once.
+        pending = collections.deque()
+        chunks = iter(chunks)
+        for chunk in itertools.islice(chunks, workers * 2):
+            pending.append(executor.submit(_read_chunk, *chunk))
+        while pending:
+            done = pending.popleft()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_read_chunk, *chunk))
+            yield from done.result()
+
+
+def _chunk_bounds(data, size, chunksize, zsh):
+    """Picks the offsets that cut the file into chunks of about chunksize bytes, each starting at an entry.
+
+    Returns:
+        [list of ints] -- The offsets, starting with 0 and ending with the file size.
+    """
+    bounds = [0]
+    pos = chunksize
+    while pos < size:
+        pos = _align(data, pos, size, zsh, bounds[-1])
+        if pos >= size:
+            break
+        bounds.append(pos)
+        pos += chunksize
+    bounds.append(size)
+    return bounds
+
+
+def _align(data, pos, size, zsh, floor):
+    """Moves an offset to the start of the first entry at or after it that begins after floor.
+
+    Returns:
+        int -- The offset of the entry, or size if there is none.
+    """
+    while True:
+        newline = data.find(b'\n', pos - 1)
+        if newline < 0:
+            return size
+        pos = newline + 1
+        if pos >= size:
+            return size
+        if zsh:
+            # A line ending in a backslash continues on the next line.
+            if newline == 0 or data[newline - 1] != ord('\\'):
+                return pos
+            pos += 1
+            continue
+        # A bash timestamp line belongs to the command after it.
+        linestart = data.rfind(b'\n', 0, newline) + 1
+        if _BASH_TIMESTAMP.fullmatch(data[linestart:newline]) is None:
+            return pos
+        if linestart > floor:
+            return linestart
+        pos += 1
+
+
+def _read_chunk(path, start, end, zsh, cls, limitoverrides, strict, profiles):
+    """Reads and parses the entries of one chunk of a history file. Runs inside the worker processes of `read`.
+
+    Returns:
+        [list of HistoryEntries] -- The entries of the chunk, in order.
+    """
+    from model.historyentry import HistoryEntry
+    with open(path, 'rb') as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunk = data[start:end]
+    entries = []
+    for offset, timestamp, duration, raw in (_zsh_entries if zsh else _bash_entries)(chunk):
+        command = raw.decode('utf-8', 'replace')
+        if not command.strip():
+            continue
+        try:
+            bashmap = cls.fromcmd(command, limitoverrides, strict, profiles=profiles)
+            entries.append(HistoryEntry(start + offset, timestamp, duration, command, bashmap, None))
+        except ValueError as error:
+            entries.append(HistoryEntry(start + offset, timestamp, duration, command, None, error))
+    return entries
+
+
+def _bash_entries(chunk):
+    """Splits a chunk of bash history into its entries.
+
+    Yields:
+        tuple -- The offset of the entry in the chunk, its timestamp, None, and the command as bytes.
+    """
+    timestamp = None
+    entrystart = 0
+    pos = 0
+    for line in chunk.split(b'\n'):
+        linestart, pos = pos, pos + len(line) + 1
+        match = _BASH_TIMESTAMP.fullmatch(line)
+        if match is not None:
+            timestamp, entrystart = int(match.group(1)), linestart
+            continue
+        yield (linestart if timestamp is None else entrystart), timestamp, None, line
+        timestamp = None
+
+
+def _zsh_entries(chunk):
+    """Splits a chunk of zsh history into its entries, joining continuation lines and undoing zsh's byte escaping.
+
+    Yields:
+        tuple -- The offset of the entry in the chunk, its timestamp, its duration, and the command as bytes.
+    """
+    lines = chunk.split(b'\n')
+    index = 0
+    pos = 0
+    while index < len(lines):
+        entrystart = pos
+        parts = [lines[index]]
+        pos += len(lines[index]) + 1
+        index += 1
+        while parts[-1].endswith(b'\\') and index < len(lines):
+            parts[-1] = parts[-1][:-1]
+            parts.append(lines[index])
+            pos += len(lines[index]) + 1
+            index += 1
+        entry = b'\n'.join(parts)
+        if _ZSH_META in entry:
+            entry = _unmetafy(entry)
+        match = _ZSH_ENTRY.match(entry)
+        if match is None:
+            yield entrystart, None, None, entry
+        else:
+            yield entrystart, int(match.group(1)), int(match.group(2)), match.group(3)
+
+
+def _unmetafy(entry):
+    """Undoes zsh's escaping of bytes that clash with its internal tokens.
+    """
+    out = bytearray()
+    escaped = False
+    for byte in entry:
+        if escaped:
+            out.append(byte ^ 32)
+            escaped = False
+        elif byte == _ZSH_META:
+            escaped = True
+        else:
+            out.append(byte)
+    return bytes(out)
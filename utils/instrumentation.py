@@ -0,0 +1,174 @@
+"""instrumentation - Opt-in timing and counting of the stages of `BashMap.fromcmd`.
+
+Instrumentation is off by default and costs a single attribute check per command while it is off.
+Once enabled, every stage (`split`, `array`, `parse`) records its wall time, call count and token
+count in the module-level `instrumentation` registry, and optionally the bytes it allocated, as
+traced by `tracemalloc`. Callbacks can be hooked in to receive every measurement as it happens.
+
+Example:
+    >>> from utils.instrumentation import instrumentation
+    >>> instrumentation.enable()
+    >>> BashMap.fromcmd('curl -s www.github.com')
+    {'utility': [('curl',)], '-s': [('www.github.com',)]}
+    >>> instrumentation.stats()['split'].calls
+    1
+"""
+import threading
+import time
+from collections import namedtuple
+
+
+StageStats = namedtuple('StageStats', ['calls', 'seconds', 'tokens', 'allocated'])
+StageStats.__doc__ = """The totals recorded for one stage.
+
+Attributes:
+    calls {int} -- The number of times the stage ran.
+    seconds {float} -- The wall time spent in the stage.
+    tokens {int} -- The number of tokens the stage produced or consumed.
+    allocated {int} -- The peak bytes allocated by the stage, summed over its calls. 0 unless allocations are tracked.
+"""
+
+
+class Instrumentation:
+    """A registry of per-stage counters, plus the callbacks that are notified of every measurement. Measurements can
+    be recorded from many threads at once. Hooks are called outside the registry's lock, from the thread that took
+    the measurement.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self._hooks = []
+        self._stats = {}
+        self._lock = threading.Lock()
+        # Whether enable started tracemalloc, rather than finding it already started by the application.
+        self._started_tracing = False
+
+    def enable(self, track_allocations=False):
+        """Starts recording measurements.
+
+        Keyword Arguments:
+            track_allocations {bool} -- Also records the bytes allocated by each stage with tracemalloc, which slows parsing down considerably. (default: {False})
+        """
+        self.track_allocations = track_allocations
+        if track_allocations:
+            # Only imported when allocations are tracked, since it pulls in pickle and linecache.
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording measurements. The recorded totals are kept until `reset`. Stops tracemalloc only if
+        `enable` started it.
+        """
+        self.enabled = False
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.track_allocations = False
+
+    def reset(self):
+        """Discards the recorded totals.
+        """
+        with self._lock:
+            self._stats = {}
+
+    def add_hook(self, callback):
+        """Registers a callback that receives every measurement.
+
+        Arguments:
+            callback {callable} -- Called as callback(stage, seconds, tokens, allocated).
+        """
+        self._hooks.append(callback)
+
+    def remove_hook(self, callback):
+        """Unregisters a callback.
+
+        Arguments:
+            callback {callable} -- The callback to remove.
+        """
+        self._hooks.remove(callback)
+
+    def measure(self, stage, tokens, func, *args):
+        """Runs one stage and records its measurement.
+
+        Arguments:
+            stage {str} -- The stage name.
+            tokens {int} -- The number of tokens the stage consumes, or None to count the items it returns.
+            func {callable} -- The stage.
+            args -- The arguments to call func with.
+
+        Returns:
+            object -- The value func returns.
+        """
+        tracking = False
+        if self.track_allocations:
+            import tracemalloc
+            tracking = tracemalloc.is_tracing()
+        if tracking:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - started
+        allocated = 0
+        if tracking:
+            _, peak = tracemalloc.get_traced_memory()
+            allocated = max(0, peak - before)
+        self.record(stage, seconds, len(result) if tokens is None else tokens, allocated)
+        return result
+
+    def record(self, stage, seconds, tokens, allocated=0):
+        """Adds a measurement to the stage's totals and notifies the hooks.
+
+        Arguments:
+            stage {str} -- The stage name.
+            seconds {float} -- The wall time spent in the stage.
+            tokens {int} -- The number of tokens the stage handled.
+
+        Keyword Arguments:
+            allocated {int} -- The bytes allocated by the stage. (default: {0})
+        """
+        with self._lock:
+            calls, total, totaltokens, totalallocated = self._stats.get(stage, (0, 0.0, 0, 0))
+            self._stats[stage] = StageStats(calls + 1, total + seconds, totaltokens + tokens, totalallocated + allocated)
+        for callback in self._hooks:
+            callback(stage, seconds, tokens, allocated)
+
+    def merge(self, stats):
+        """Adds totals recorded elsewhere, such as in a worker process, to this registry's totals. Hooks aren't notified.
+
+        Arguments:
+            stats {dict} -- The StageStats keyed by stage, as returned by `stats`.
+        """
+        with self._lock:
+            for stage, other in stats.items():
+                mine = self._stats.get(stage, StageStats(0, 0.0, 0, 0))
+                self._stats[stage] = StageStats(*(a + b for a, b in zip(mine, other)))
+
+    def stats(self):
+        """Returns the recorded totals.
+
+        Returns:
+            dict -- The StageStats keyed by stage.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def summary(self):
+        """Formats the recorded totals as a table.
+
+        Returns:
+            str -- The summary.
+        """
+        lines = ['{:<8} {:>10} {:>12} {:>12} {:>14} {:>14}'.format('stage', 'calls', 'seconds', 'tokens', 'tokens/s', 'allocated')]
+        for stage, stats in self.stats().items():
+            rate = stats.tokens / stats.seconds if stats.seconds else 0.0
+            lines.append('{:<8} {:>10} {:>12.6f} {:>12} {:>14.0f} {:>14}'.format(
+                stage, stats.calls, stats.seconds, stats.tokens, rate, stats.allocated))
+        return '\n'.join(lines)
+
+
+instrumentation = Instrumentation()
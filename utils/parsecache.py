@@ -0,0 +1,165 @@
+"""parsecache - A bounded least recently used cache of parsed Bash commands.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class ParseCache:
+    """A bounded least recently used cache of argument dictionaries, keyed on the Bash command and the
+    limits override dictionary it was parsed with.
+
+    The cache keeps its own copy of every argument dictionary and hands out a fresh copy on every
+    lookup, so callers are free to mutate what they get back.
+
+    The cache can be shared between threads. Its entries are split over `shards` independently
+    locked least recently used lists picked by the key's hash, so threads looking up different
+    commands rarely wait on each other. Each shard holds up to maxsize / shards entries.
+
+    Example:
+        >>> cache = ParseCache(maxsize=1024)
+        >>> BashMap.fromcmd('git status', cache=cache)
+        {'utility': [('git',)], 'operands': [('status',)]}
+        >>> BashMap.fromcmd('git status', cache=cache)
+        {'utility': [('git',)], 'operands': [('status',)]}
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, evictions=0, maxsize=1024, currsize=1)
+    """
+    def __init__(self, maxsize=1024, shards=1):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive, got {}.'.format(maxsize))
+        if shards <= 0 or shards > maxsize:
+            raise ValueError('shards must be between 1 and maxsize, got {}.'.format(shards))
+        self.maxsize = maxsize
+        # Spreads maxsize over the shards, the first ones taking the remainder.
+        self._shards = [_Shard(maxsize // shards + (index < maxsize % shards)) for index in range(shards)]
+
+    @staticmethod
+    def key(cmd, limitoverrides, *extra):
+        """Builds the cache key for a Bash command.
+
+        Arguments:
+            cmd {string} -- The Bash command.
+            limitoverrides {dict} -- The limits override dictionary the command is parsed with.
+            extra -- Any other hashable settings that change the parse result.
+
+        Returns:
+            tuple -- The cache key.
+        """
+        return (cmd, frozenset(limitoverrides.items()) if limitoverrides else frozenset()) + extra
+
+    def get(self, key):
+        """Looks up the argument dictionary for a key and marks it as most recently used.
+
+        Arguments:
+            key {tuple} -- The cache key.
+
+        Returns:
+            dict -- A copy of the cached argument dictionary, or None if the key isn't cached.
+        """
+        shard = self._shard(key)
+        with shard.lock:
+            try:
+                argdict = shard.entries[key]
+            except KeyError:
+                shard.misses += 1
+                return None
+            shard.entries.move_to_end(key)
+            shard.hits += 1
+        # Cached argument dictionaries are never mutated, so they can be copied outside the lock.
+        return _copy(argdict)
+
+    def put(self, key, argdict):
+        """Caches a copy of the argument dictionary, evicting the least recently used entry if the cache is full.
+
+        Arguments:
+            key {tuple} -- The cache key.
+            argdict {dict} -- The argument dictionary.
+        """
+        argdict = _copy(argdict)
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries[key] = argdict
+            shard.entries.move_to_end(key)
+            if len(shard.entries) > shard.maxsize:
+                shard.entries.popitem(last=False)
+                shard.evictions += 1
+
+    def info(self):
+        """Reports the cache statistics, summed over the shards.
+
+        Returns:
+            CacheInfo -- The hit, miss and eviction counts, and the maximum and current number of entries.
+        """
+        hits = misses = evictions = currsize = 0
+        for shard in self._shards:
+            with shard.lock:
+                hits += shard.hits
+                misses += shard.misses
+                evictions += shard.evictions
+                currsize += len(shard.entries)
+        return CacheInfo(hits, misses, evictions, self.maxsize, currsize)
+
+    @property
+    def hits(self):
+        """The number of lookups that found their key.
+        """
+        return self.info().hits
+
+    @property
+    def misses(self):
+        """The number of lookups that didn't find their key.
+        """
+        return self.info().misses
+
+    @property
+    def evictions(self):
+        """The number of entries evicted to make room for newer ones.
+        """
+        return self.info().evictions
+
+    def clear(self):
+        """Removes every entry and resets the statistics.
+        """
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.hits = shard.misses = shard.evictions = 0
+
+    def _shard(self, key):
+        """Picks the shard that holds a key.
+        """
+        shards = self._shards
+        return shards[hash(key) % len(shards)] if len(shards) > 1 else shards[0]
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+class _Shard:
+    """One independently locked least recently used list of a ParseCache, with its own statistics.
+    """
+    __slots__ = ('lock', 'entries', 'maxsize', 'hits', 'misses', 'evictions')
+
+    def __init__(self, maxsize):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def _copy(argdict):
+    """Copies an argument dictionary deep enough that mutating the copy can't affect the original. The
+    argument groups are tuples, so only the lists holding them need copying.
+
+    Arguments:
+        argdict {dict} -- The argument dictionary.
+
+    Returns:
+        dict -- The copy.
+    """
+    return {key: list(groups) for key, groups in argdict.items()}
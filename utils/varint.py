@@ -0,0 +1,89 @@
+"""varint - Encodes and decodes unsigned integers as LEB128 variable-length byte sequences.
+
+Small integers, such as string lengths and the gaps between sorted ids, take a single byte.
+
+Example:
+    >>> buffer = bytearray()
+    >>> write(buffer, 300)
+    >>> bytes(buffer)
+    b'\\xac\\x02'
+    >>> read(buffer, 0)
+    (300, 2)
+"""
+
+
+def write(buffer, value):
+    """Appends an unsigned integer to the buffer.
+
+    Arguments:
+        buffer {bytearray} -- The buffer to append to.
+        value {int} -- The non-negative integer.
+
+    Raises:
+        ValueError: The integer is negative.
+    """
+    if value < 0:
+        raise ValueError('Cannot encode negative integer {}.'.format(value))
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read(data, pos):
+    """Reads an unsigned integer from the data.
+
+    Arguments:
+        data {bytes} -- The encoded data.
+        pos {int} -- The offset of the integer's first byte.
+
+    Raises:
+        ValueError: The data ends in the middle of the integer.
+
+    Returns:
+        tuple -- The integer and the offset of the byte following it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise ValueError('Truncated varint at offset {}.'.format(pos))
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def write_str(buffer, string):
+    """Appends a length-prefixed UTF-8 string to the buffer.
+
+    Arguments:
+        buffer {bytearray} -- The buffer to append to.
+        string {str} -- The string.
+    """
+    encoded = string.encode('utf-8', 'surrogatepass')
+    write(buffer, len(encoded))
+    buffer += encoded
+
+
+def read_str(data, pos):
+    """Reads a length-prefixed UTF-8 string from the data.
+
+    Arguments:
+        data {bytes} -- The encoded data.
+        pos {int} -- The offset of the string's length prefix.
+
+    Raises:
+        ValueError: The data ends in the middle of the string.
+
+    Returns:
+        tuple -- The string and the offset of the byte following it.
+    """
+    length, pos = read(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise ValueError('Truncated string at offset {}.'.format(pos))
+    return bytes(data[pos:end]).decode('utf-8', 'surrogatepass'), end